@@ -0,0 +1,68 @@
+import pytest
+
+from project.apsp import floyd_warshall
+from project.bfs import Direction, bfs
+from project.csr import CSRGraph, dijkstra_csr
+from project.msbfs import msbfs, msbfs_bitwise
+from project.mssp import mssp
+from project.sssp import bellman_ford, delta_stepping
+from project.triangles import (
+    Algo,
+    count_triangles_in_graph,
+    count_triangles_per_each_vertex,
+)
+
+SOURCES = 64
+
+
+def _sources(adj_matrix, count=SOURCES):
+    return list(range(0, adj_matrix.nrows, max(adj_matrix.nrows // count, 1)))[:count]
+
+
+def test_bfs(benchmark, graph):
+    benchmark(bfs, graph, 0, output="numpy")
+
+
+def test_bfs_auto(benchmark, graph):
+    benchmark(bfs, graph, 0, direction=Direction.AUTO, output="numpy")
+
+
+def test_msbfs(benchmark, graph):
+    benchmark(msbfs, graph, _sources(graph), output="numpy")
+
+
+def test_msbfs_bitwise(benchmark, graph):
+    benchmark(msbfs_bitwise, graph, _sources(graph), output="numpy")
+
+
+def test_count_triangles_sandia(benchmark, undirected_graph):
+    benchmark(count_triangles_in_graph, undirected_graph, algo=Algo.SANDIA)
+
+
+def test_count_triangles_cohen(benchmark, undirected_graph):
+    benchmark(count_triangles_in_graph, undirected_graph, algo=Algo.COHEN)
+
+
+def test_count_triangles_per_each_vertex(benchmark, undirected_graph):
+    benchmark(count_triangles_per_each_vertex, undirected_graph)
+
+
+def test_bellman_ford(benchmark, weighted_graph):
+    benchmark(bellman_ford, weighted_graph, 0, output="numpy")
+
+
+def test_delta_stepping(benchmark, weighted_graph):
+    benchmark(delta_stepping, weighted_graph, 0, output="numpy")
+
+
+def test_mssp(benchmark, weighted_graph):
+    benchmark(mssp, weighted_graph, _sources(weighted_graph, 16), output="numpy")
+
+
+@pytest.mark.max_size(1000)
+def test_floyd_warshall(benchmark, weighted_graph):
+    benchmark(floyd_warshall, weighted_graph, output="numpy")
+
+
+def test_dijkstra(benchmark, weighted_graph):
+    benchmark(dijkstra_csr, CSRGraph.from_matrix(weighted_graph), 0)
@@ -0,0 +1,58 @@
+from functools import lru_cache
+
+import pytest
+
+from project.bench import MATRIX_KINDS, generate_matrix
+
+# размеры графов для каждого уровня --bench-scale
+SCALES = {
+    "small": [1000],
+    "medium": [1000, 10000],
+    "large": [1000, 10000, 100000],
+}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-scale",
+        choices=tuple(SCALES),
+        default="small",
+        help="Размеры графов в замерах",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "max_size(n): не запускать замер на графах больше n вершин"
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "n" in metafunc.fixturenames:
+        sizes = SCALES[metafunc.config.getoption("--bench-scale")]
+        marker = metafunc.definition.get_closest_marker("max_size")
+        if marker is not None:
+            sizes = [n for n in sizes if n <= marker.args[0]]
+        metafunc.parametrize("n", sizes)
+    if "kind" in metafunc.fixturenames:
+        metafunc.parametrize("kind", MATRIX_KINDS)
+
+
+@lru_cache(maxsize=16)
+def _matrix(kind: str, n: int, weighted: bool, symmetric: bool):
+    return generate_matrix(kind, n, seed=42, weighted=weighted, symmetric=symmetric)
+
+
+@pytest.fixture
+def graph(kind, n):
+    return _matrix(kind, n, False, False)
+
+
+@pytest.fixture
+def undirected_graph(kind, n):
+    return _matrix(kind, n, False, True)
+
+
+@pytest.fixture
+def weighted_graph(kind, n):
+    return _matrix(kind, n, True, False)
@@ -0,0 +1,21 @@
+import importlib
+
+__all__ = [
+    "get_runtime",
+    "set_runtime",
+    "runtime",
+    "runtime_descriptor",
+    "run_concurrently",
+]
+
+
+def __getattr__(name):
+    # runtime_config импортирует pygraphblas, поэтому загружается только
+    # при обращении к project.runtime и т.п., а не при любом импорте project.*
+    if name in __all__:
+        return getattr(importlib.import_module("project.runtime_config"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,18 +1,40 @@
-from typing import List, Tuple
+import math
+from typing import Iterator, List, Optional, Tuple, Union
 
 import pygraphblas as pgb
 import numpy as np
 
+from project.bulk import check_output, dense_rows, matrix_to_dense
+from project.diagonal import with_zero_diagonal
+from project.mssp import mssp_distances
+from project.sssp import has_negative_cycle
 
-def floyd_warshall(adj_matrix: pgb.Matrix) -> List[Tuple[int, List[int]]]:
+__all__ = ["floyd_warshall", "blocked_apsp"]
+
+# оценка числа байт на один элемент блока: плотный результат float64
+# и разреженные матрицы расстояний на текущей и следующей итерации
+_BYTES_PER_BLOCK_ELEMENT = 3 * 8
+
+
+def floyd_warshall(
+    adj_matrix: pgb.Matrix, output: str = "list", inplace: bool = False
+) -> Union[List[Tuple[int, List[int]]], np.ndarray]:
     """
-    Алгоритм Флойда–Уоршелла поиска длин кратчайших путей между всеми парами вершин во
-    взвешенном ориентированном графе.
+    Поиск длин кратчайших путей между всеми парами вершин во
+    взвешенном ориентированном графе как замыкания матрицы смежности над min_plus полукольцом.
+
+    Матрица возводится в квадрат, пока очередное возведение не перестанет менять значения,
+    но не более ceil(log2(n)) раз: после k возведений учтены все пути из не более чем 2^k рёбер.
 
     Parameters
     ----------
     adj_matrix: Matrix
         Матрица смежности данного графа
+    output: str
+        Формат результата: "list" - список пар, "numpy" - двумерный массив float64 размера n на n
+    inplace: bool
+        Если True, результат накапливается прямо в adj_matrix (экономит память).
+        По умолчанию adj_matrix не изменяется
 
     Raises
     ------
@@ -21,51 +43,107 @@ def floyd_warshall(adj_matrix: pgb.Matrix) -> List[Tuple[int, List[int]]]:
 
     Returns
     -------
-    distances: List[Tuple[int, List[int]]]
+    distances: Union[List[Tuple[int, List[int]]], np.ndarray]
         Массив пар: вершина, и массив, где для каждой вершины указано расстояние до неё из указанной.
-        Если вершина не достижима, то значение соответствующей ячейки равно -1.
+        Если вершина не достижима, то значение соответствующей ячейки равно inf.
     """
-    # todo надо просто посчитать транзитивное замыкание матрицы над min_plus полукольцом?
     _check_conditions(adj_matrix)
-    _prepare_matrix(adj_matrix)
-
-    old_nvals = -1
-    while adj_matrix.nvals != old_nvals:
-        old_nvals = adj_matrix.nvals
-        adj_matrix.mxm(
-            adj_matrix,
-            semiring=adj_matrix.type.min_plus,
-            out=adj_matrix,
-            accum=adj_matrix.type.min,
-        )
+    check_output(output)
+    closure = with_zero_diagonal(adj_matrix, inplace=inplace)
 
-    for i in range(adj_matrix.nrows):
-        if adj_matrix[i, i] < 0:
-            raise ValueError("В графе есть цикл с отрицательным весом")
-
-    return [
-        (
-            i,
-            [
-                adj_matrix.get(i, j, default=float("inf"))
-                for j in range(adj_matrix.ncols)
-            ],
-        )
-        for i in range(adj_matrix.nrows)
-    ]
+    for _ in range(_max_squarings(closure.nrows)):
+        squared = closure.mxm(closure, semiring=closure.type.min_plus)
+        if squared.iseq(closure):
+            break
+        if inplace:
+            closure.eadd(squared, closure.type.SECOND, out=closure)
+        else:
+            closure = squared
+
+    if closure.diag().select("<0").nvals > 0:
+        raise ValueError("В графе есть цикл с отрицательным весом")
+
+    if output == "numpy":
+        return matrix_to_dense(closure, fill=np.inf, dtype=np.float64)
 
+    return list(enumerate(dense_rows(closure, fill=np.inf, dtype=np.float64)))
 
-def _prepare_matrix(adj_matrix: pgb.Matrix):
+
+def blocked_apsp(
+    adj_matrix: pgb.Matrix,
+    block_size: Optional[int] = None,
+    memory_budget: Optional[int] = None,
+) -> Iterator[Tuple[int, np.ndarray]]:
     """
-    Заполняет главную диагональ матрицы нулями
+    Поиск длин кратчайших путей между всеми парами вершин по блокам строк.
+    Для каждого блока из block_size стартовых вершин расстояния вычисляются
+    итерациями Бэлмана-Форда до сходимости, поэтому в памяти одновременно находятся
+    только матрица смежности и один блок результата размера block_size на n.
 
     Parameters
     ----------
     adj_matrix: Matrix
-       Матрица смежности
+        Матрица смежности данного графа. Не изменяется
+    block_size: Optional[int]
+        Число строк результата в одном блоке
+    memory_budget: Optional[int]
+        Ограничение в байтах на память под один блок, используется для выбора
+        block_size, если он не указан. Если не указано ни то, ни другое,
+        результат вычисляется одним блоком
+
+    Raises
+    ------
+    ValueError
+        Если размер блока или ограничение памяти не положительны,
+        или если в графе есть цикл с отрицательным весом. Проверка выполняется
+        до того, как будет возвращён первый блок
+
+    Returns
+    -------
+    blocks: Iterator[Tuple[int, np.ndarray]]
+        Пары (номер первой строки блока, массив float64 размера block_size на n),
+        строка i блока содержит расстояния от вершины first_row + i.
+        Если вершина не достижима, то значение соответствующей ячейки равно inf.
+    """
+    _check_conditions(adj_matrix)
+    if block_size is None:
+        block_size = _block_size_for_budget(adj_matrix.ncols, memory_budget)
+    if block_size <= 0:
+        raise ValueError("Размер блока должен быть положительным")
+    # проверка до первого блока, чтобы вызывающий код не получил часть результата
+    if has_negative_cycle(adj_matrix):
+        raise ValueError("В графе есть цикл с отрицательным весом")
+
+    for first_row in range(0, adj_matrix.nrows, block_size):
+        sources = list(range(first_row, min(first_row + block_size, adj_matrix.nrows)))
+        yield first_row, matrix_to_dense(
+            mssp_distances(adj_matrix, sources), fill=np.inf, dtype=np.float64
+        )
+
+
+def _max_squarings(n: int) -> int:
+    """
+    Число возведений в квадрат, после которого учтены все пути и циклы из не более чем n рёбер
+    """
+    return math.ceil(math.log2(max(n, 2)))
+
+
+def _block_size_for_budget(n: int, memory_budget: Optional[int]) -> int:
+    """
+    Выбирает число строк в блоке так, чтобы блок помещался в memory_budget байт
+
+    Parameters
+    ----------
+    n: int
+       Число вершин графа
+    memory_budget: Optional[int]
+       Ограничение памяти в байтах. Если не указано, возвращается n
     """
-    for i in range(adj_matrix.ncols):
-        adj_matrix[i, i] = 0
+    if memory_budget is None:
+        return max(n, 1)
+    if memory_budget <= 0:
+        raise ValueError("Ограничение памяти должно быть положительным")
+    return max(1, min(n, memory_budget // (_BYTES_PER_BLOCK_ELEMENT * max(n, 1))))
 
 
 def _check_conditions(adjacency_matrix: pgb.Matrix):
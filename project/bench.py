@@ -0,0 +1,482 @@
+"""
+Воспроизводимые замеры производительности.
+
+Запуск: python -m project.bench sssp-dynamic --sizes 100 1000 --fractions 0.1 0.5
+"""
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import networkx as nx
+import numpy as np
+import pygraphblas as pgb
+
+from project.bulk import matrix_from_arrays
+from project.sssp import bellman_ford
+from project.task_9_draft import DynamicSSSP, MatrixDynamicSSSP, dijkstra
+
+__all__ = [
+    "GRAPH_KINDS",
+    "MATRIX_KINDS",
+    "SCENARIOS",
+    "ENGINES",
+    "generate_graph",
+    "generate_matrix",
+    "generate_updates",
+    "run_sssp_dynamic",
+    "write_results",
+    "main",
+]
+
+GRAPH_KINDS = ("barabasi-albert", "powerlaw-cluster", "community")
+MATRIX_KINDS = ("rmat", "erdos-renyi", "grid", "power-law")
+SCENARIOS = ("incremental", "decremental", "mixed")
+
+Edges = List[Tuple[int, int]]
+
+
+def generate_graph(kind: str, n: int, seed: int) -> nx.DiGraph:
+    """
+    Генерирует ориентированный граф социальной сети или сообществ с фиксированным seed.
+    Каждое неориентированное ребро превращается в пару встречных рёбер
+
+    Parameters
+    ----------
+    kind: str
+        Тип графа: "barabasi-albert", "powerlaw-cluster" или "community"
+    n: int
+        Число вершин
+    seed: int
+        Зерно генератора случайных чисел
+
+    Returns
+    -------
+    graph: DiGraph
+        Граф с вершинами 0, ..., n - 1
+    """
+    m = min(4, n - 1)
+    if kind == "barabasi-albert":
+        graph = nx.barabasi_albert_graph(n, m, seed=seed)
+    elif kind == "powerlaw-cluster":
+        graph = nx.powerlaw_cluster_graph(n, m, 0.3, seed=seed)
+    elif kind == "community":
+        communities = max(n // 50, 1)
+        sizes = [n // communities + (i < n % communities) for i in range(communities)]
+        graph = nx.random_partition_graph(
+            sizes, min(8 / max(sizes), 1), 1 / n, seed=seed
+        )
+        graph = nx.convert_node_labels_to_integers(graph)
+    else:
+        raise ValueError(
+            f"Неизвестный тип графа: {kind}, ожидался один из {GRAPH_KINDS}"
+        )
+    return nx.DiGraph(graph)
+
+
+def generate_matrix(
+    kind: str,
+    n: int,
+    seed: int,
+    avg_degree: int = 8,
+    weighted: bool = False,
+    symmetric: bool = False,
+) -> pgb.Matrix:
+    """
+    Генерирует синтетический граф сразу в виде матрицы смежности, без networkx.
+    Петли и кратные рёбра удаляются
+
+    Parameters
+    ----------
+    kind: str
+        Тип графа: "rmat" (R-MAT с параметрами Graph500), "erdos-renyi",
+        "grid" (двумерная решётка) или "power-law" (модель Чунга-Лу с показателем 2.5)
+    n: int
+        Число вершин. У решётки сторона равна округлённому вниз корню из n
+    seed: int
+        Зерно генератора случайных чисел
+    avg_degree: int
+        Среднее число исходящих рёбер вершины (кроме решётки)
+    weighted: bool
+        Если True, матрица типа FP64 с целыми весами от 1 до 10, иначе BOOL со значениями True
+    symmetric: bool
+        Если True, к каждому ребру добавляется встречное
+
+    Returns
+    -------
+    adj_matrix: Matrix
+        Матрица смежности
+    """
+    rng = np.random.default_rng(seed)
+    m = avg_degree * n
+    if kind == "rmat":
+        scale = max(int(np.ceil(np.log2(n))), 1)
+        rows = np.zeros(m, dtype=np.int64)
+        cols = np.zeros(m, dtype=np.int64)
+        for _ in range(scale):
+            # квадранты a, b, c, d = 0.57, 0.19, 0.19, 0.05
+            quadrant = rng.random(m)
+            rows = 2 * rows + (quadrant >= 0.76)
+            cols = 2 * cols + (
+                (quadrant >= 0.57) & (quadrant < 0.76) | (quadrant >= 0.95)
+            )
+        inside = (rows < n) & (cols < n)
+        rows, cols = rows[inside], cols[inside]
+    elif kind == "erdos-renyi":
+        rows, cols = rng.integers(0, n, m), rng.integers(0, n, m)
+    elif kind == "grid":
+        side = max(int(np.sqrt(n)), 1)
+        n = side * side
+        vertices = np.arange(n).reshape(side, side)
+        rows = np.concatenate([vertices[:, :-1].ravel(), vertices[:-1, :].ravel()])
+        cols = np.concatenate([vertices[:, 1:].ravel(), vertices[1:, :].ravel()])
+        symmetric = True
+    elif kind == "power-law":
+        weights = np.arange(1, n + 1) ** (-1 / (2.5 - 1))
+        weights /= weights.sum()
+        rows = rng.choice(n, m, p=weights)
+        cols = rng.choice(n, m, p=weights)
+        permutation = rng.permutation(n)
+        rows, cols = permutation[rows], permutation[cols]
+    else:
+        raise ValueError(
+            f"Неизвестный тип графа: {kind}, ожидался один из {MATRIX_KINDS}"
+        )
+
+    if symmetric:
+        rows, cols = np.concatenate([rows, cols]), np.concatenate([cols, rows])
+    loops = rows == cols
+    rows, cols = rows[~loops], cols[~loops]
+    if not weighted:
+        return matrix_from_arrays(rows, cols, True, n, n, typ=pgb.BOOL)
+    if symmetric:
+        # вес ребра зависит только от пары вершин, поэтому матрица симметрична
+        low, high = np.minimum(rows, cols), np.maximum(rows, cols)
+        values = (low * 7919 + high * 104729 + seed) % 10 + 1
+    else:
+        values = rng.integers(1, 11, len(rows))
+    return matrix_from_arrays(
+        rows, cols, values.astype(np.float64), n, n, dup_op=pgb.FP64.MIN
+    )
+
+
+def generate_updates(
+    graph: nx.DiGraph, scenario: str, fraction: float, seed: int
+) -> Tuple[nx.DiGraph, Edges, Edges]:
+    """
+    Готовит начальный граф и пакет изменений, затрагивающий долю fraction рёбер графа.
+    При одинаковых аргументах результат всегда один и тот же
+
+    Parameters
+    ----------
+    graph: DiGraph
+        Итоговый граф сценария incremental и начальный граф остальных сценариев
+    scenario: str
+        "incremental" - все изменения добавляют рёбра, "decremental" - удаляют,
+        "mixed" - половина добавляет, половина удаляет
+    fraction: float
+        Доля изменяемых рёбер, от 0 до 1
+    seed: int
+        Зерно генератора случайных чисел
+
+    Returns
+    -------
+    (initial, inserted, deleted): Tuple[DiGraph, Edges, Edges]
+        Начальный граф, добавляемые и удаляемые рёбра
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError(
+            f"Неизвестный сценарий: {scenario}, ожидался один из {SCENARIOS}"
+        )
+    if not 0 <= fraction <= 1:
+        raise ValueError("Доля изменяемых рёбер должна быть от 0 до 1")
+
+    edges = sorted(graph.edges)
+    changed = random.Random(seed).sample(edges, int(len(edges) * fraction))
+    if scenario == "incremental":
+        inserted, deleted = changed, []
+    elif scenario == "decremental":
+        inserted, deleted = [], changed
+    else:
+        inserted, deleted = changed[: len(changed) // 2], changed[len(changed) // 2 :]
+
+    initial = graph.copy()
+    initial.remove_edges_from(inserted)
+    return initial, inserted, deleted
+
+
+def _to_matrix(graph: nx.DiGraph):
+    edges = np.array(graph.edges, dtype=np.uint64).reshape(-1, 2)
+    n = graph.number_of_nodes()
+    return matrix_from_arrays(edges[:, 0], edges[:, 1], 1.0, n, n)
+
+
+def _prepare_dijkstra(initial, start_vertex) -> Callable[[Edges, Edges], list]:
+    graph = initial.copy()
+
+    def update(inserted, deleted):
+        graph.remove_edges_from(deleted)
+        graph.add_edges_from(inserted)
+        distances = dijkstra(graph, start_vertex)
+        return [distances[v] for v in sorted(graph.nodes)]
+
+    return update
+
+
+def _prepare_dynamic(
+    initial, start_vertex, recompute_threshold=None
+) -> Callable[[Edges, Edges], list]:
+    nodes = sorted(initial.nodes)
+    dynamic_sssp = DynamicSSSP(
+        initial.copy(), start_vertex, recompute_threshold=recompute_threshold
+    )
+
+    def update(inserted, deleted):
+        dynamic_sssp.apply_updates(inserted=inserted, deleted=deleted)
+        distances = dynamic_sssp.get_distances()
+        return [distances[v] for v in nodes]
+
+    return update
+
+
+def _prepare_adaptive(initial, start_vertex) -> Callable[[Edges, Edges], list]:
+    return _prepare_dynamic(initial, start_vertex, "auto")
+
+
+def _prepare_matrix_dynamic(initial, start_vertex) -> Callable[[Edges, Edges], list]:
+    dynamic_sssp = MatrixDynamicSSSP(_to_matrix(initial), start_vertex)
+
+    def update(inserted, deleted):
+        dynamic_sssp.apply_updates(inserted=inserted, deleted=deleted)
+        return dynamic_sssp.get_distances()
+
+    return update
+
+
+def _prepare_bellman_ford(initial, start_vertex) -> Callable[[Edges, Edges], list]:
+    adj_matrix = _to_matrix(initial)
+    n = adj_matrix.nrows
+
+    def update(inserted, deleted):
+        # изменения применяются к матрице так же пакетно, как в MatrixDynamicSSSP
+        if deleted:
+            edges = np.array(deleted, dtype=np.uint64).reshape(-1, 2)
+            deletions = matrix_from_arrays(
+                edges[:, 0], edges[:, 1], True, n, n, typ=pgb.BOOL
+            )
+            adj_matrix.apply(
+                pgb.FP64.IDENTITY,
+                out=adj_matrix,
+                mask=deletions.S,
+                desc=pgb.descriptor.RSC,
+            )
+        if inserted:
+            edges = np.array(inserted, dtype=np.uint64).reshape(-1, 2)
+            insertions = matrix_from_arrays(edges[:, 0], edges[:, 1], 1.0, n, n)
+            adj_matrix.eadd(insertions, pgb.FP64.SECOND, out=adj_matrix)
+        return bellman_ford(adj_matrix, start_vertex)
+
+    return update
+
+
+# engine(initial, start_vertex) готовит структуры по начальному графу без замера времени
+# и возвращает функцию update(inserted, deleted), которая применяет пакет изменений
+# и возвращает расстояния до вершин 0, ..., n - 1. У всех алгоритмов замеряется
+# именно update: применение изменений вместе с получением расстояний
+ENGINES: Dict[str, Callable[..., Callable[[Edges, Edges], list]]] = {
+    "dijkstra": _prepare_dijkstra,
+    "dynamic": _prepare_dynamic,
+    "adaptive": _prepare_adaptive,
+    "matrix-dynamic": _prepare_matrix_dynamic,
+    "bellman-ford": _prepare_bellman_ford,
+}
+
+
+def _measure(
+    engine: str, initial, inserted, deleted, start_vertex
+) -> Tuple[float, list]:
+    update = ENGINES[engine](initial, start_vertex)
+    begin = time.perf_counter()
+    distances = update(inserted, deleted)
+    return time.perf_counter() - begin, distances
+
+
+def run_sssp_dynamic(
+    kinds: Sequence[str] = GRAPH_KINDS,
+    sizes: Sequence[int] = (100, 1000, 10000),
+    fractions: Sequence[float] = (0.1, 0.2, 0.3, 0.4, 0.5),
+    scenarios: Sequence[str] = SCENARIOS,
+    engines: Sequence[str] = ("dijkstra", "dynamic", "bellman-ford"),
+    repeat: int = 3,
+    seed: int = 42,
+    start_vertex: int = 0,
+    check: bool = True,
+    log=None,
+) -> List[dict]:
+    """
+    Сравнивает полный пересчёт и динамические алгоритмы SSSP на одинаковых пакетах изменений.
+    Для каждого графа, сценария и доли изменений все алгоритмы получают одни и те же
+    начальный граф и пакет. У каждого алгоритма замеряется одно и то же:
+    применение пакета к заранее построенным структурам и получение расстояний;
+    время - минимум по repeat запускам
+
+    Parameters
+    ----------
+    kinds: Sequence[str]
+        Типы графов, см. generate_graph
+    sizes: Sequence[int]
+        Числа вершин
+    fractions: Sequence[float]
+        Доли изменяемых рёбер
+    scenarios: Sequence[str]
+        Сценарии, см. generate_updates
+    engines: Sequence[str]
+        Замеряемые алгоритмы: ключи ENGINES
+    repeat: int
+        Число повторов каждого замера
+    seed: int
+        Зерно генераторов графов и изменений
+    start_vertex: int
+        Стартовая вершина
+    check: bool
+        Проверять, что все алгоритмы вернули одинаковые расстояния
+    log:
+        Файл для вывода строк по мере получения результатов, например sys.stderr
+
+    Returns
+    -------
+    records: List[dict]
+        Результаты замеров, по одному словарю на (граф, сценарий, доля, алгоритм)
+    """
+    for engine in engines:
+        if engine not in ENGINES:
+            raise ValueError(
+                f"Неизвестный алгоритм: {engine}, ожидался один из {tuple(ENGINES)}"
+            )
+    if repeat <= 0:
+        raise ValueError("Число повторов должно быть положительным")
+
+    records = []
+    for kind in kinds:
+        for n in sizes:
+            graph = generate_graph(kind, n, seed)
+            for scenario in scenarios:
+                for fraction in fractions:
+                    initial, inserted, deleted = generate_updates(
+                        graph, scenario, fraction, seed
+                    )
+                    reference = None
+                    for engine in engines:
+                        runs = [
+                            _measure(engine, initial, inserted, deleted, start_vertex)
+                            for _ in range(repeat)
+                        ]
+                        distances = runs[0][1]
+                        if check:
+                            if reference is None:
+                                reference = distances
+                            elif distances != reference:
+                                raise RuntimeError(
+                                    f"{engine} вернул неверные расстояния: "
+                                    f"{kind}, n={n}, {scenario}, {fraction}"
+                                )
+                        record = {
+                            "kind": kind,
+                            "n": n,
+                            "edges": graph.number_of_edges(),
+                            "scenario": scenario,
+                            "fraction": fraction,
+                            "updates": len(inserted) + len(deleted),
+                            "engine": engine,
+                            "seconds": min(seconds for seconds, _ in runs),
+                        }
+                        records.append(record)
+                        if log is not None:
+                            print(_format_record(record), file=log, flush=True)
+    return records
+
+
+def write_results(records: List[dict], path: Optional[str], fmt: str = "csv"):
+    """
+    Записывает результаты замеров в CSV или JSON
+
+    Parameters
+    ----------
+    records: List[dict]
+        Результаты run_sssp_dynamic
+    path: Optional[str]
+        Путь к файлу. Если None, результаты выводятся в stdout
+    fmt: str
+        Формат: "csv" или "json"
+    """
+    if fmt not in ("csv", "json"):
+        raise ValueError(f"Неизвестный формат: {fmt}, ожидался csv или json")
+    out = sys.stdout if path is None else open(path, "w", newline="")
+    try:
+        if fmt == "json":
+            json.dump(records, out, indent=2)
+            out.write("\n")
+        elif records:
+            writer = csv.DictWriter(out, fieldnames=list(records[0]))
+            writer.writeheader()
+            writer.writerows(records)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def _format_record(record: dict) -> str:
+    return (
+        f"{record['kind']:>17} {record['n']:>7} {record['scenario']:>12} "
+        f"{record['fraction']:>5} {record['engine']:>15} {record['seconds']:>10.4f}"
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m project.bench", description="Замеры производительности"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sssp = commands.add_parser(
+        "sssp-dynamic",
+        help="Полный пересчёт SSSP против динамического обновления",
+    )
+    sssp.add_argument("--kinds", nargs="+", choices=GRAPH_KINDS, default=GRAPH_KINDS)
+    sssp.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000])
+    sssp.add_argument(
+        "--fractions", nargs="+", type=float, default=[0.1, 0.2, 0.3, 0.4, 0.5]
+    )
+    sssp.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    sssp.add_argument(
+        "--engines",
+        nargs="+",
+        choices=tuple(ENGINES),
+        default=["dijkstra", "dynamic", "bellman-ford"],
+    )
+    sssp.add_argument("--repeat", type=int, default=3)
+    sssp.add_argument("--seed", type=int, default=42)
+    sssp.add_argument("--no-check", dest="check", action="store_false")
+    sssp.add_argument("--format", choices=("csv", "json"), default="csv")
+    sssp.add_argument("--output", help="Файл результатов, по умолчанию stdout")
+    args = parser.parse_args(argv)
+
+    records = run_sssp_dynamic(
+        kinds=args.kinds,
+        sizes=args.sizes,
+        fractions=args.fractions,
+        scenarios=args.scenarios,
+        engines=args.engines,
+        repeat=args.repeat,
+        seed=args.seed,
+        check=args.check,
+        log=sys.stderr,
+    )
+    write_results(records, args.output, args.format)
+
+
+if __name__ == "__main__":
+    main()
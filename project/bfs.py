@@ -1,11 +1,32 @@
 # from pygraphblas import Matrix, types, descriptor, Vector
+from enum import Enum
+
 import pygraphblas as pgb
-from typing import List
+from typing import List, Optional, Union
+
+import numpy as np
+
+from project.bulk import check_output, vector_to_dense
+from project.runtime_config import runtime_descriptor
+
+__all__ = ["bfs", "Direction"]
+
 
-__all__ = ["bfs"]
+class Direction(Enum):
+    PUSH = 0
+    PULL = 1
+    AUTO = 2
 
 
-def bfs(adjacency_matrix: pgb.Matrix, start_vertex: int) -> List[int]:
+def bfs(
+    adjacency_matrix: pgb.Matrix,
+    start_vertex: int,
+    direction: Direction = Direction.PUSH,
+    alpha: float = 14,
+    beta: float = 24,
+    output: str = "list",
+    transposed: Optional[pgb.Matrix] = None,
+) -> Union[List[int], np.ndarray]:
     """
     Реализация алгоритма обхода ориентированного графа в ширину заданной вершины.
     Подсчитывает количество шагов за которое можно пройти из вершины до других.
@@ -16,15 +37,34 @@ def bfs(adjacency_matrix: pgb.Matrix, start_vertex: int) -> List[int]:
         Матрица смежности данного графа
     start_vertex: int
         Вершина с которой начинаем обход в ширину
+    direction: Direction
+        Направление шага обхода:
+        PUSH - фронт распространяется по исходящим рёбрам (vxm),
+        PULL - каждая непосещённая вершина проверяет, есть ли её предок во фронте
+        (mxv с транспонированной матрицей),
+        AUTO - direction-optimizing обход Бимера, выбирающий направление на каждом шаге.
+    alpha: float
+        Для AUTO: переход к PULL, когда число рёбер, исходящих из фронта,
+        больше числа ещё не просмотренных рёбер, делённого на alpha
+    beta: float
+        Для AUTO: возврат к PUSH, когда размер фронта меньше числа вершин, делённого на beta
+    output: str
+        Формат результата: "list" - список Python, "numpy" - одномерный массив int64
+    transposed: Optional[Matrix]
+        Для PULL и AUTO: транспонированная матрица смежности. Если не указана,
+        вычисляется при каждом вызове при первом шаге PULL. Вызывающий код, выполняющий много обходов
+        одного графа, может вычислить её один раз и передавать сам;
+        после изменения графа её нужно пересчитать
 
     Returns
     -------
-    steps: List[int]
+    steps: Union[List[int], np.ndarray]
         Список с числом шагов от начальной вершины до других.
         Если вершина недостижима, то будет установлено значение -1.
     """
 
     _check_conditions(adjacency_matrix, start_vertex)
+    check_output(output)
 
     res_vector = pgb.Vector.sparse(pgb.types.INT64, size=adjacency_matrix.ncols)
     curr_front = pgb.Vector.sparse(pgb.types.BOOL, size=adjacency_matrix.ncols)
@@ -32,15 +72,54 @@ def bfs(adjacency_matrix: pgb.Matrix, start_vertex: int) -> List[int]:
     res_vector[start_vertex] = 0
     curr_front[start_vertex] = True
 
+    if transposed is not None and (
+        transposed.nrows != adjacency_matrix.ncols
+        or transposed.ncols != adjacency_matrix.nrows
+    ):
+        raise ValueError("Размеры транспонированной матрицы не совпадают с исходной")
+
+    replace_complement = runtime_descriptor(pgb.descriptor.RC)
+    degrees = None
+    unexplored_edges = 0
+    if direction == Direction.AUTO:
+        degrees = adjacency_matrix.out_degree(pgb.types.INT64)
+        unexplored_edges = adjacency_matrix.nvals
+
+    pull = direction == Direction.PULL
     step_number = 1
     while curr_front.nvals != 0:
-        curr_front.vxm(
-            adjacency_matrix, mask=res_vector.S, out=curr_front, desc=pgb.descriptor.RC
-        )
+        if direction == Direction.AUTO:
+            front_edges = degrees.emult(curr_front, pgb.INT64.FIRST).reduce_int()
+            if pull:
+                pull = curr_front.nvals * beta >= adjacency_matrix.ncols
+            else:
+                pull = front_edges * alpha > unexplored_edges
+            unexplored_edges -= front_edges
+
+        if pull:
+            if transposed is None:
+                # для AUTO транспонированная матрица нужна только после первого
+                # перехода к PULL, а на графах с большим диаметром его может не быть
+                transposed = adjacency_matrix.transpose()
+            transposed.mxv(
+                curr_front, mask=res_vector.S, out=curr_front, desc=replace_complement
+            )
+        else:
+            curr_front.vxm(
+                adjacency_matrix,
+                mask=res_vector.S,
+                out=curr_front,
+                desc=replace_complement,
+            )
         res_vector.assign_scalar(step_number, mask=curr_front)
         step_number += 1
 
-    res_vector.assign_scalar(-1, mask=res_vector.S, desc=pgb.descriptor.C)
+    if output == "numpy":
+        return vector_to_dense(res_vector, fill=-1)
+
+    res_vector.assign_scalar(
+        -1, mask=res_vector.S, desc=runtime_descriptor(pgb.descriptor.C)
+    )
     return list(res_vector.vals)
 
 
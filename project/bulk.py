@@ -0,0 +1,462 @@
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pygraphblas as pgb
+
+__all__ = [
+    "OUTPUT_FORMATS",
+    "check_output",
+    "extract_vector",
+    "extract_matrix",
+    "vector_to_dense",
+    "matrix_to_dense",
+    "dense_rows",
+    "matrix_from_arrays",
+    "MatrixBuilder",
+    "matrix_from_batches",
+    "permute",
+]
+
+OUTPUT_FORMATS = ("list", "numpy")
+
+
+def extract_vector(v: pgb.Vector) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Извлекает индексы и значения разреженного вектора в массивы NumPy
+    одним вызовом GrB_Vector_extractTuples
+
+    Parameters
+    ----------
+    v: Vector
+        Разреженный вектор
+
+    Returns
+    -------
+    (indices, values): Tuple[np.ndarray, np.ndarray]
+        Индексы хранимых элементов и их значения
+    """
+    nvals = v.nvals
+    indices = np.empty(nvals, dtype=np.uint64)
+    values = np.empty(nvals, dtype=v.type._numpy_t)
+    if nvals == 0:
+        return indices, values
+
+    _nvals = pgb.ffi.new("GrB_Index[1]", [nvals])
+    _check(
+        v.type._Vector_extractTuples(
+            _index_pointer(indices),
+            _value_pointer(values, v.type),
+            _nvals,
+            v._vector[0],
+        )
+    )
+    return indices, values
+
+
+def extract_matrix(m: pgb.Matrix) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Извлекает строки, столбцы и значения разреженной матрицы в массивы NumPy
+    одним вызовом GrB_Matrix_extractTuples
+
+    Parameters
+    ----------
+    m: Matrix
+        Разреженная матрица
+
+    Returns
+    -------
+    (rows, cols, values): Tuple[np.ndarray, np.ndarray, np.ndarray]
+        Номера строк и столбцов хранимых элементов и их значения
+    """
+    nvals = m.nvals
+    rows = np.empty(nvals, dtype=np.uint64)
+    cols = np.empty(nvals, dtype=np.uint64)
+    values = np.empty(nvals, dtype=m.type._numpy_t)
+    if nvals == 0:
+        return rows, cols, values
+
+    _nvals = pgb.ffi.new("GrB_Index[1]", [nvals])
+    _check(
+        m.type._Matrix_extractTuples(
+            _index_pointer(rows),
+            _index_pointer(cols),
+            _value_pointer(values, m.type),
+            _nvals,
+            m._matrix[0],
+        )
+    )
+    return rows, cols, values
+
+
+def vector_to_dense(v: pgb.Vector, fill, dtype=None) -> np.ndarray:
+    """
+    Преобразует разреженный вектор в плотный массив NumPy
+
+    Parameters
+    ----------
+    v: Vector
+        Разреженный вектор
+    fill:
+        Значение для отсутствующих элементов
+    dtype:
+        Тип элементов результата. По умолчанию совпадает с типом вектора
+
+    Returns
+    -------
+    dense: np.ndarray
+        Массив длины v.size
+    """
+    indices, values = extract_vector(v)
+    dense = np.full(v.size, fill, dtype=dtype or v.type._numpy_t)
+    dense[indices.astype(np.intp)] = values
+    return dense
+
+
+def matrix_to_dense(m: pgb.Matrix, fill, dtype=None) -> np.ndarray:
+    """
+    Преобразует разреженную матрицу в плотный двумерный массив NumPy
+
+    Parameters
+    ----------
+    m: Matrix
+        Разреженная матрица
+    fill:
+        Значение для отсутствующих элементов
+    dtype:
+        Тип элементов результата. По умолчанию совпадает с типом матрицы
+
+    Returns
+    -------
+    dense: np.ndarray
+        Массив размера m.nrows на m.ncols
+    """
+    rows, cols, values = extract_matrix(m)
+    dense = np.full((m.nrows, m.ncols), fill, dtype=dtype or m.type._numpy_t)
+    dense[rows.astype(np.intp), cols.astype(np.intp)] = values
+    return dense
+
+
+def dense_rows(m: pgb.Matrix, fill, dtype=None) -> List[list]:
+    """
+    Преобразует разреженную матрицу в список плотных строк.
+    Все значения извлекаются за один проход, поэтому стоимость не зависит
+    от числа обращений Python -> GraphBLAS, в отличие от поэлементного get.
+
+    Parameters
+    ----------
+    m: Matrix
+        Разреженная матрица
+    fill:
+        Значение для отсутствующих элементов
+    dtype:
+        Тип элементов промежуточного массива. По умолчанию совпадает с типом матрицы
+
+    Returns
+    -------
+    rows: List[list]
+        Список из m.nrows строк длины m.ncols со значениями Python
+    """
+    return matrix_to_dense(m, fill, dtype=dtype).tolist()
+
+
+def matrix_from_arrays(
+    rows, cols, values, nrows: int, ncols: int, typ=None, dup_op=None
+) -> pgb.Matrix:
+    """
+    Строит матрицу по массивам строк, столбцов и значений
+    одним вызовом GrB_Matrix_build, без поэлементной вставки
+
+    Parameters
+    ----------
+    rows:
+        Номера строк элементов (любая последовательность, приводимая к массиву NumPy)
+    cols:
+        Номера столбцов элементов
+    values:
+        Значения элементов или одно значение для всех элементов
+    nrows: int
+        Число строк матрицы
+    ncols: int
+        Число столбцов матрицы
+    typ:
+        Тип элементов матрицы. По умолчанию определяется по типу values
+    dup_op: BinaryOp
+        Операция, объединяющая повторяющиеся элементы.
+        По умолчанию SECOND, т.е. остаётся последнее значение, как при поэлементной вставке
+
+    Returns
+    -------
+    m: Matrix
+        Построенная матрица
+    """
+    rows = np.ascontiguousarray(rows, dtype=np.uint64)
+    cols = np.ascontiguousarray(cols, dtype=np.uint64)
+    if len(rows) != len(cols):
+        raise ValueError("Массивы строк и столбцов должны иметь одинаковую длину")
+    if np.isscalar(values):
+        values = np.full(len(rows), values)
+    values = np.asarray(values)
+    if typ is None:
+        typ = pgb.types.Type._dtype_gb_map[values.dtype.type]
+    values = np.ascontiguousarray(values, dtype=typ._numpy_t)
+    if len(values) != len(rows):
+        raise ValueError("Массивы значений и индексов должны иметь одинаковую длину")
+
+    m = pgb.Matrix.sparse(typ, nrows, ncols)
+    if len(rows) == 0:
+        return m
+    dup_op = dup_op if dup_op is not None else typ.SECOND
+    _check(
+        _build_function(typ)(
+            m._matrix[0],
+            _index_pointer(rows),
+            _index_pointer(cols),
+            _value_pointer(values, typ),
+            len(rows),
+            dup_op.get_op(),
+        )
+    )
+    return m
+
+
+class MatrixBuilder:
+    """
+    Потоковое построение матрицы из пакетов рёбер. Пакеты копятся в буфере
+    массивов NumPy; когда в буфере набирается flush_size элементов, он превращается
+    в матрицу одним вызовом GrB_Matrix_build. Построенные части хранятся в стеке
+    и сливаются через eWiseAdd, когда верхняя часть становится не меньше
+    предыдущей, поэтому каждый элемент участвует в O(log(nvals / flush_size)) слияниях.
+
+    Parameters
+    ----------
+    nrows: int
+        Число строк матрицы
+    ncols: int
+        Число столбцов матрицы
+    typ:
+        Тип элементов матрицы. По умолчанию определяется по значениям первого пакета
+    dup_op: BinaryOp
+        Операция, объединяющая повторяющиеся элементы, в том числе из разных пакетов.
+        По умолчанию SECOND, т.е. остаётся последнее значение
+    flush_size: int
+        Наибольшее число элементов в буфере
+    """
+
+    def __init__(
+        self, nrows: int, ncols: int, typ=None, dup_op=None, flush_size: int = 1 << 22
+    ):
+        if nrows < 0 or ncols < 0:
+            raise ValueError("Размеры матрицы должны быть неотрицательными")
+        if flush_size <= 0:
+            raise ValueError("Размер буфера должен быть положительным")
+        self.nrows = nrows
+        self.ncols = ncols
+        self.typ = typ
+        self.dup_op = dup_op
+        self.flush_size = flush_size
+        self._buffer = []
+        self._buffered = 0
+        self._parts = []
+
+    @property
+    def pending(self) -> int:
+        """
+        Число элементов в буфере, ещё не попавших в матрицу
+        """
+        return self._buffered
+
+    def add(self, rows, cols, values=True):
+        """
+        Добавляет пакет элементов
+
+        Parameters
+        ----------
+        rows:
+            Номера строк элементов
+        cols:
+            Номера столбцов элементов
+        values:
+            Значения элементов или одно значение для всех элементов пакета
+        """
+        rows = np.asarray(rows, dtype=np.uint64)
+        cols = np.asarray(cols, dtype=np.uint64)
+        if len(rows) != len(cols):
+            raise ValueError("Массивы строк и столбцов должны иметь одинаковую длину")
+        if np.isscalar(values):
+            values = np.full(len(rows), values)
+        values = np.asarray(values)
+        if len(values) != len(rows):
+            raise ValueError(
+                "Массивы значений и индексов должны иметь одинаковую длину"
+            )
+        if len(rows) == 0:
+            return
+        if rows.max() >= self.nrows or cols.max() >= self.ncols:
+            raise ValueError("Индекс элемента выходит за размеры матрицы")
+        if self.typ is None:
+            self.typ = pgb.types.Type._dtype_gb_map[values.dtype.type]
+
+        # большой пакет попадает в буфер частями, чтобы буфер не превышал flush_size;
+        # части копируются, т.к. источник может переиспользовать свои массивы
+        begin = 0
+        while begin < len(rows):
+            end = begin + self.flush_size - self._buffered
+            self._buffer.append(
+                (
+                    rows[begin:end].copy(),
+                    cols[begin:end].copy(),
+                    values[begin:end].copy(),
+                )
+            )
+            self._buffered += len(self._buffer[-1][0])
+            if self._buffered >= self.flush_size:
+                self.flush()
+            begin = end
+
+    def flush(self):
+        """
+        Переносит буфер в матрицу
+        """
+        if not self._buffer:
+            return
+        rows, cols, values = (np.concatenate(arrays) for arrays in zip(*self._buffer))
+        self._buffer.clear()
+        self._buffered = 0
+        self._parts.append(
+            matrix_from_arrays(
+                rows, cols, values, self.nrows, self.ncols, self.typ, self.dup_op
+            )
+        )
+        while len(self._parts) > 1 and self._parts[-1].nvals >= self._parts[-2].nvals:
+            self._merge()
+
+    def build(self) -> pgb.Matrix:
+        """
+        Завершает построение
+
+        Returns
+        -------
+        m: Matrix
+            Матрица из всех добавленных элементов
+        """
+        self.flush()
+        while len(self._parts) > 1:
+            self._merge()
+        if not self._parts:
+            typ = self.typ if self.typ is not None else pgb.types.BOOL
+            return pgb.Matrix.sparse(typ, self.nrows, self.ncols)
+        return self._parts[0]
+
+    def _merge(self):
+        # более новая часть стоит вторым аргументом, как при GrB_Matrix_build
+        newer = self._parts.pop()
+        older = self._parts[-1]
+        dup_op = self.dup_op if self.dup_op is not None else self.typ.SECOND
+        older.eadd(newer, dup_op, out=older)
+
+
+def matrix_from_batches(
+    batches: Iterable[tuple],
+    nrows: int,
+    ncols: int,
+    typ=None,
+    dup_op=None,
+    flush_size: int = 1 << 22,
+) -> pgb.Matrix:
+    """
+    Строит матрицу по итератору пакетов (rows, cols) или (rows, cols, values),
+    не держа в памяти все пакеты сразу
+
+    Parameters
+    ----------
+    batches: Iterable[tuple]
+        Пакеты элементов. Пакет без значений добавляется со значением True
+    nrows: int
+        Число строк матрицы
+    ncols: int
+        Число столбцов матрицы
+    typ:
+        Тип элементов матрицы. По умолчанию определяется по значениям первого пакета
+    dup_op: BinaryOp
+        Операция, объединяющая повторяющиеся элементы. По умолчанию SECOND
+    flush_size: int
+        Наибольшее число элементов в буфере MatrixBuilder
+
+    Returns
+    -------
+    m: Matrix
+        Построенная матрица
+    """
+    builder = MatrixBuilder(nrows, ncols, typ, dup_op, flush_size)
+    for batch in batches:
+        builder.add(*batch)
+    return builder.build()
+
+
+def permute(m: pgb.Matrix, permutation) -> pgb.Matrix:
+    """
+    Перенумеровывает вершины: возвращает матрицу C = m[permutation, permutation],
+    т.е. вершина k новой матрицы - это вершина permutation[k] исходной
+
+    Parameters
+    ----------
+    m: Matrix
+        Квадратная матрица
+    permutation:
+        Перестановка номеров вершин
+
+    Returns
+    -------
+    permuted: Matrix
+        Матрица с перенумерованными вершинами
+    """
+    permutation = np.ascontiguousarray(permutation, dtype=np.uint64)
+    size = len(permutation)
+    permuted = pgb.Matrix.sparse(m.type, size, size)
+    _check(
+        pgb.lib.GrB_Matrix_extract(
+            permuted._matrix[0],
+            pgb.ffi.NULL,
+            pgb.ffi.NULL,
+            m._matrix[0],
+            _index_pointer(permutation),
+            size,
+            _index_pointer(permutation),
+            size,
+            pgb.ffi.NULL,
+        )
+    )
+    return permuted
+
+
+def check_output(output: str):
+    """
+    Проверяет, что запрошен поддерживаемый формат результата
+
+    Parameters
+    ----------
+    output: str
+        Формат результата: "list" или "numpy"
+    """
+    if output not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Неизвестный формат результата: {output}, ожидался один из {OUTPUT_FORMATS}"
+        )
+
+
+def _index_pointer(indices: np.ndarray):
+    return pgb.ffi.cast("GrB_Index *", pgb.ffi.from_buffer(indices))
+
+
+def _value_pointer(values: np.ndarray, typ):
+    return pgb.ffi.cast(f"{typ._c_type} *", pgb.ffi.from_buffer(values))
+
+
+def _build_function(typ):
+    name = f"Matrix_build_{typ._base_name}"
+    return getattr(pgb.lib, "GrB_" + name, None) or getattr(pgb.lib, "GxB_" + name)
+
+
+def _check(info):
+    if info != pgb.lib.GrB_SUCCESS:
+        raise RuntimeError(f"Ошибка GraphBLAS, код {info}")
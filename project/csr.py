@@ -0,0 +1,220 @@
+import heapq
+from typing import Hashable, List, Optional, Tuple, Union
+
+import networkx as nx
+import numpy as np
+import pygraphblas as pgb
+
+from project.bulk import extract_matrix
+
+__all__ = ["CSRGraph", "dijkstra_csr"]
+
+
+class CSRGraph:
+    """
+    Ориентированный взвешенный граф в формате CSR: исходящие рёбра вершины u
+    - это indices[indptr[u]:indptr[u + 1]] с весами weights[indptr[u]:indptr[u + 1]].
+    Вершины нумеруются числами от 0 до n - 1, исходные имена вершин хранятся в nodes.
+    Кратные рёбра допускаются, при поиске путей учитывается самое лёгкое из них.
+
+    Parameters
+    ----------
+    indptr: np.ndarray
+        Массив длины n + 1 с началами списков смежности
+    indices: np.ndarray
+        Концы рёбер
+    weights: np.ndarray
+        Веса рёбер
+    nodes: List[Hashable]
+        Имена вершин. По умолчанию вершины называются своими номерами
+    """
+
+    def __init__(
+        self,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        weights: np.ndarray,
+        nodes: Optional[List[Hashable]] = None,
+    ):
+        self.indptr = np.ascontiguousarray(indptr, dtype=np.int64)
+        self.indices = np.ascontiguousarray(indices, dtype=np.int64)
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        if len(self.indptr) == 0 or self.indptr[0] != 0:
+            raise ValueError("Массив indptr должен начинаться с 0")
+        if self.indptr[-1] != len(self.indices) or len(self.indices) != len(
+            self.weights
+        ):
+            raise ValueError("Размеры indptr, indices и weights не согласованы")
+        self.nodes = list(range(self.n)) if nodes is None else list(nodes)
+        if len(self.nodes) != self.n:
+            raise ValueError("Число имён вершин не совпадает с числом вершин")
+
+    @property
+    def n(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def nvals(self) -> int:
+        return len(self.indices)
+
+    @classmethod
+    def from_arrays(cls, rows, cols, weights, n: int, nodes=None) -> "CSRGraph":
+        """
+        Строит граф по массивам начал, концов и весов рёбер.
+        Из кратных рёбер остаётся ребро с наименьшим весом
+
+        Parameters
+        ----------
+        rows:
+            Начала рёбер
+        cols:
+            Концы рёбер
+        weights:
+            Веса рёбер или один вес для всех рёбер
+        n: int
+            Число вершин
+        nodes: List[Hashable]
+            Имена вершин
+
+        Returns
+        -------
+        graph: CSRGraph
+            Граф в формате CSR
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        weights = np.broadcast_to(np.asarray(weights, dtype=np.float64), rows.shape)
+        # сортировка по (начало, конец, вес); из кратных рёбер остаётся самое лёгкое
+        order = np.lexsort((weights, cols, rows))
+        rows, cols, weights = rows[order], cols[order], weights[order]
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+        rows, cols, weights = rows[first], cols[first], weights[first]
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return cls(indptr, cols, weights, nodes)
+
+    @classmethod
+    def from_networkx(cls, graph: nx.DiGraph, weight: str = "weight") -> "CSRGraph":
+        """
+        Преобразует граф networkx. Рёбра без атрибута weight имеют вес 1
+
+        Parameters
+        ----------
+        graph: DiGraph
+            Ориентированный граф
+        weight: str
+            Имя атрибута ребра с весом
+
+        Returns
+        -------
+        graph: CSRGraph
+            Граф в формате CSR
+        """
+        nodes = list(graph.nodes)
+        index = {v: i for i, v in enumerate(nodes)}
+        succ = graph.succ
+        # в DiGraph нет кратных рёбер, а списки смежности уже сгруппированы по началу
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(
+            np.fromiter((len(succ[u]) for u in nodes), np.int64, len(nodes)),
+            out=indptr[1:],
+        )
+        m = int(indptr[-1])
+        indices = np.fromiter((index[v] for u in nodes for v in succ[u]), np.int64, m)
+        weights = np.fromiter(
+            (a.get(weight, 1) for u in nodes for a in succ[u].values()), np.float64, m
+        )
+        return cls(indptr, indices, weights, nodes)
+
+    @classmethod
+    def from_matrix(cls, adj_matrix: pgb.Matrix) -> "CSRGraph":
+        """
+        Преобразует матрицу смежности. Значения матрицы считаются весами рёбер,
+        у булевой матрицы рёбрами считаются элементы со значением True, а их вес равен 1
+
+        Parameters
+        ----------
+        adj_matrix: Matrix
+            Квадратная матрица смежности
+
+        Returns
+        -------
+        graph: CSRGraph
+            Граф в формате CSR
+        """
+        if adj_matrix.nrows != adj_matrix.ncols:
+            raise ValueError("Матрица смежности должна быть квадратной")
+        rows, cols, values = extract_matrix(adj_matrix)
+        if adj_matrix.type == pgb.BOOL:
+            rows, cols = rows[values], cols[values]
+            values = np.ones(len(rows))
+        return cls.from_arrays(rows, cols, values, adj_matrix.nrows)
+
+
+def dijkstra_csr(
+    graph: CSRGraph, start_vertex: int, return_parents: bool = False
+) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Алгоритм Дейкстры для графа в формате CSR с неотрицательными весами.
+    Вершина, извлечённая из кучи, отмечается в массиве visited, а повторные
+    (устаревшие) записи о ней пропускаются. Рёбра вершины релаксируются
+    векторными операциями NumPy.
+
+    Parameters
+    ----------
+    graph: CSRGraph
+        Граф
+    start_vertex: int
+        Номер стартовой вершины
+    return_parents: bool
+        Если True, дополнительно возвращается дерево кратчайших путей
+
+    Returns
+    -------
+    distances: np.ndarray
+        Массив float64 расстояний, для недостижимых вершин - inf
+    parents: np.ndarray
+        Только при return_parents=True: массив int64 предков в дереве кратчайших путей,
+        -1 для стартовой и недостижимых вершин
+    """
+    if not 0 <= start_vertex < graph.n:
+        raise ValueError("Неверно указана стартовая вершина")
+    if graph.nvals > 0 and graph.weights.min() < 0:
+        raise ValueError("Веса рёбер должны быть неотрицательными")
+
+    indptr, indices, weights = graph.indptr, graph.indices, graph.weights
+    d = np.full(graph.n, np.inf)
+    parents = np.full(graph.n, -1, dtype=np.int64)
+    visited = np.zeros(graph.n, dtype=bool)
+    d[start_vertex] = 0
+    q = [(0.0, start_vertex)]
+
+    while q:
+        distance, u = heapq.heappop(q)
+        if visited[u]:
+            continue
+        visited[u] = True
+
+        begin, end = indptr[u], indptr[u + 1]
+        if begin == end:
+            continue
+        neighbours = indices[begin:end]
+        candidates = distance + weights[begin:end]
+        improved = candidates < d[neighbours]
+        if not improved.any():
+            continue
+        neighbours, candidates = neighbours[improved], candidates[improved]
+        # кратные рёбра u -> v дают повторы в neighbours: присваивание d[neighbours]
+        # оставило бы последний вес, а minimum.at - наименьший, как GrB_MIN
+        np.minimum.at(d, neighbours, candidates)
+        best = candidates == d[neighbours]
+        neighbours, candidates = neighbours[best], candidates[best]
+        parents[neighbours] = u
+        for v, dv in zip(neighbours.tolist(), candidates.tolist()):
+            heapq.heappush(q, (dv, v))
+
+    if return_parents:
+        return d, parents
+    return d
@@ -0,0 +1,89 @@
+from functools import lru_cache
+from typing import Union
+
+import pygraphblas as pgb
+
+__all__ = ["zero_diagonal", "with_zero_diagonal", "min_plus_step"]
+
+
+@lru_cache(maxsize=8)
+def zero_diagonal(typ, size: int) -> pgb.Matrix:
+    """
+    Возвращает квадратную матрицу, на главной диагонали которой стоят нули,
+    а остальные элементы отсутствуют. Матрицы кэшируются по типу и размеру,
+    поэтому результат нельзя изменять.
+
+    Parameters
+    ----------
+    typ:
+        Тип элементов матрицы
+    size: int
+        Размер матрицы
+
+    Returns
+    -------
+    diagonal: Matrix
+        Диагональная матрица из нулей
+    """
+    diagonal = pgb.Matrix.from_diag(pgb.Vector.dense(typ, size, fill=0))
+    diagonal.wait()
+    return diagonal
+
+
+def with_zero_diagonal(adj_matrix: pgb.Matrix, inplace: bool = False) -> pgb.Matrix:
+    """
+    Добавляет нули на главную диагональ матрицы одной операцией eadd
+    с кэшированной диагональной матрицей. Значения на диагонали объединяются
+    с нулями через MIN: положительная петля заменяется нулём, а отрицательная
+    остаётся, чтобы отрицательный цикл из одной вершины не пропал
+
+    Parameters
+    ----------
+    adj_matrix: Matrix
+       Матрица смежности
+    inplace: bool
+       Если True, изменяется сама матрица adj_matrix (экономит память),
+       иначе создаётся новая матрица, а adj_matrix остаётся неизменной
+
+    Returns
+    -------
+    prepared: Matrix
+        Матрица смежности с нулями на главной диагонали
+    """
+    diagonal = zero_diagonal(adj_matrix.type, adj_matrix.ncols)
+    return adj_matrix.eadd(
+        diagonal, adj_matrix.type.MIN, out=adj_matrix if inplace else None
+    )
+
+
+def min_plus_step(
+    d: Union[pgb.Vector, pgb.Matrix], adj_matrix: pgb.Matrix, inplace: bool = False
+) -> Union[pgb.Vector, pgb.Matrix]:
+    """
+    Шаг Бэлмана-Форда d = min(d, d min.+ adj_matrix): результат такой же, как у
+    d min.+ with_zero_diagonal(adj_matrix), но нулевая диагональ учитывается
+    накоплением через FP64.MIN, и копия матрицы смежности не создаётся
+
+    Parameters
+    ----------
+    d: Union[Vector, Matrix]
+        Расстояния: вектор для одной стартовой вершины или матрица k на n
+    adj_matrix: Matrix
+        Матрица смежности
+    inplace: bool
+        Если True, результат записывается в d, иначе d не изменяется
+
+    Returns
+    -------
+    relaxed: Union[Vector, Matrix]
+        Расстояния после шага
+    """
+    out = d if inplace else d.dup()
+    multiply = d.vxm if isinstance(d, pgb.Vector) else d.mxm
+    multiply(
+        adj_matrix,
+        semiring=pgb.semiring.MIN_PLUS_FP64,
+        out=out,
+        accum=pgb.FP64.MIN,
+    )
+    return out
@@ -0,0 +1,420 @@
+import json
+import os
+import pathlib
+import warnings
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+import numpy as np
+import pygraphblas as pgb
+
+from project.bulk import extract_matrix, matrix_from_arrays
+
+__all__ = [
+    "read_matrix_market",
+    "read_edge_list",
+    "load_graph",
+    "save_csr_cache",
+    "load_csr_cache",
+]
+
+PathLike = Union[str, os.PathLike]
+
+# размер блока файла, который разбирается за один вызов NumPy
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+
+_MATRIX_MARKET_TYPES = {
+    "pattern": (pgb.types.BOOL, np.int64),
+    "integer": (pgb.types.INT64, np.int64),
+    "real": (pgb.types.FP64, np.float64),
+}
+_CACHE_META = "meta.json"
+_CACHE_VERSION = 1
+# таблица пробельных символов для разбора блока по байтам
+_SPACE = np.zeros(256, dtype=bool)
+_SPACE[list(b" \t\n\r\f\v")] = True
+
+
+def read_matrix_market(
+    path: PathLike, typ=None, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> pgb.Matrix:
+    """
+    Читает разреженную матрицу в формате Matrix Market (coordinate).
+    Файл разбирается блоками по chunk_size байт средствами NumPy,
+    а матрица строится одним вызовом matrix_from_arrays
+
+    Parameters
+    ----------
+    path: PathLike
+        Путь к файлу .mtx
+    typ:
+        Тип элементов матрицы. По умолчанию BOOL для pattern, INT64 для integer
+        и FP64 для real
+    chunk_size: int
+        Размер блока в байтах
+
+    Returns
+    -------
+    adj_matrix: Matrix
+        Прочитанная матрица. Для symmetric и skew-symmetric матриц
+        восстанавливаются обе половины
+    """
+    with open(path, "rb") as f:
+        header = f.readline().decode().split()
+        if (
+            len(header) != 5
+            or header[0] != "%%MatrixMarket"
+            or header[1].lower() != "matrix"
+        ):
+            raise ValueError(f"{path}: неверный заголовок Matrix Market")
+        layout, field, symmetry = (word.lower() for word in header[2:])
+        if layout != "coordinate":
+            raise ValueError(f"{path}: поддерживается только формат coordinate")
+        if field not in _MATRIX_MARKET_TYPES:
+            raise ValueError(f"{path}: неподдерживаемый тип элементов {field}")
+        if symmetry not in ("general", "symmetric", "skew-symmetric"):
+            raise ValueError(f"{path}: неподдерживаемая симметрия {symmetry}")
+
+        line = f.readline()
+        while line and (line.startswith(b"%") or not line.strip()):
+            line = f.readline()
+        if not line:
+            raise ValueError(f"{path}: нет строки размеров")
+        nrows, ncols, nvals = (int(word) for word in line.split())
+
+        default_typ, dtype = _MATRIX_MARKET_TYPES[field]
+        columns = 2 if field == "pattern" else 3
+        rows, cols, values = _read_columns(f, columns, dtype, chunk_size, b"%")
+
+    if len(rows) != nvals:
+        raise ValueError(f"{path}: ожидалось {nvals} элементов, прочитано {len(rows)}")
+    rows -= 1
+    cols -= 1
+    if symmetry != "general":
+        off_diagonal = rows != cols
+        if values is not None:
+            mirrored = values[off_diagonal]
+            if symmetry == "skew-symmetric":
+                mirrored = -mirrored
+            values = np.concatenate([values, mirrored])
+        rows, cols = (
+            np.concatenate([rows, cols[off_diagonal]]),
+            np.concatenate([cols, rows[off_diagonal]]),
+        )
+    return _build(rows, cols, values, nrows, ncols, typ or default_typ, None)
+
+
+def read_edge_list(
+    path: PathLike,
+    n: Optional[int] = None,
+    typ=None,
+    one_based: bool = False,
+    comments: str = "#",
+    delimiter: Optional[str] = None,
+    dup_op=None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> pgb.Matrix:
+    """
+    Читает список рёбер: по одному ребру "u v" или "u v weight" в строке.
+    Число столбцов определяется по первой строке с данными,
+    во всех остальных строках должно быть столько же чисел
+
+    Parameters
+    ----------
+    path: PathLike
+        Путь к файлу
+    n: Optional[int]
+        Число вершин. По умолчанию наибольший номер вершины плюс один
+    typ:
+        Тип элементов матрицы. По умолчанию BOOL для списка без весов и FP64 для списка с весами
+    one_based: bool
+        Вершины нумеруются с единицы
+    comments: str
+        Признак строки-комментария
+    delimiter: Optional[str]
+        Разделитель чисел. По умолчанию любые пробельные символы
+    dup_op: BinaryOp
+        Операция, объединяющая повторяющиеся рёбра. По умолчанию остаётся последнее
+    chunk_size: int
+        Размер блока в байтах
+
+    Returns
+    -------
+    adj_matrix: Matrix
+        Матрица смежности
+    """
+    comment = comments.encode() if comments else None
+    separator = delimiter.encode() if delimiter else None
+    with open(path, "rb") as f:
+        start = f.tell()
+        line = f.readline()
+        while line and (not line.strip() or (comment and line.startswith(comment))):
+            start = f.tell()
+            line = f.readline()
+        if separator is not None:
+            line = line.replace(separator, b" ")
+        columns = len(line.split())
+        if line and columns not in (2, 3):
+            raise ValueError(f"{path}: в строке должно быть 2 или 3 числа")
+        f.seek(start)
+        rows, cols, values = _read_columns(
+            f, columns or 2, np.float64, chunk_size, comment, separator
+        )
+
+    rows = rows.astype(np.int64)
+    cols = cols.astype(np.int64)
+    if one_based:
+        rows -= 1
+        cols -= 1
+    if len(rows) and min(rows.min(), cols.min()) < 0:
+        raise ValueError(f"{path}: отрицательный номер вершины")
+    if n is None:
+        n = int(max(rows.max(), cols.max())) + 1 if len(rows) else 0
+    if typ is None:
+        typ = pgb.types.FP64 if columns == 3 else pgb.types.BOOL
+    return _build(rows, cols, values, n, n, typ, dup_op)
+
+
+def load_graph(
+    path: PathLike,
+    fmt: Optional[str] = None,
+    cache: bool = True,
+    cache_dir: Optional[PathLike] = None,
+    **options,
+) -> pgb.Matrix:
+    """
+    Загружает граф из файла, используя бинарный кэш CSR.
+    Если кэш есть и построен по той же версии файла с теми же параметрами,
+    массивы читаются из него через np.load(mmap_mode="r"), иначе файл разбирается,
+    а кэш перезаписывается
+
+    Parameters
+    ----------
+    path: PathLike
+        Путь к файлу
+    fmt: Optional[str]
+        "mtx" - Matrix Market, "edgelist" - список рёбер.
+        По умолчанию "mtx" для файлов .mtx, иначе "edgelist"
+    cache: bool
+        Использовать кэш
+    cache_dir: Optional[PathLike]
+        Папка кэша. По умолчанию <path>.csr рядом с файлом
+    options:
+        Параметры read_matrix_market или read_edge_list
+
+    Returns
+    -------
+    adj_matrix: Matrix
+        Матрица смежности
+    """
+    path = pathlib.Path(path)
+    if fmt is None:
+        fmt = "mtx" if path.suffix.lower() == ".mtx" else "edgelist"
+    if fmt == "mtx":
+        reader = read_matrix_market
+    elif fmt == "edgelist":
+        reader = read_edge_list
+    else:
+        raise ValueError(f"Неизвестный формат графа: {fmt}, ожидался mtx или edgelist")
+    if not cache:
+        return reader(path, **options)
+
+    cache_dir = (
+        pathlib.Path(cache_dir) if cache_dir else path.with_name(path.name + ".csr")
+    )
+    stat = path.stat()
+    source = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "format": fmt,
+        # chunk_size влияет только на способ чтения, но не на результат
+        "options": {
+            key: _option_key(value)
+            for key, value in options.items()
+            if key != "chunk_size"
+        },
+    }
+    try:
+        indptr, indices, values, meta = load_csr_cache(cache_dir)
+    except (FileNotFoundError, ValueError):
+        meta = None
+    if meta is not None and meta.get("source") == source:
+        return _from_csr(indptr, indices, values, meta)
+
+    adj_matrix = reader(path, **options)
+    save_csr_cache(adj_matrix, cache_dir, source=source)
+    return adj_matrix
+
+
+def save_csr_cache(adj_matrix: pgb.Matrix, directory: PathLike, source=None):
+    """
+    Сохраняет матрицу в папку directory в формате CSR: массивы indptr, indices
+    и values в файлах .npy и описание в meta.json
+
+    Parameters
+    ----------
+    adj_matrix: Matrix
+        Матрица
+    directory: PathLike
+        Папка кэша, создаётся при необходимости
+    source:
+        Описание исходного файла, по которому load_graph проверяет актуальность кэша
+    """
+    directory = pathlib.Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    rows, cols, values = extract_matrix(adj_matrix)
+    if len(rows) > 1 and np.any(rows[1:] < rows[:-1]):
+        order = np.lexsort((cols, rows))
+        rows, cols, values = rows[order], cols[order], values[order]
+    indptr = np.zeros(adj_matrix.nrows + 1, dtype=np.int64)
+    np.cumsum(
+        np.bincount(rows.astype(np.intp), minlength=adj_matrix.nrows),
+        out=indptr[1:],
+    )
+
+    # meta.json пишется последним: без него кэш считается отсутствующим
+    (directory / _CACHE_META).unlink(missing_ok=True)
+    np.save(directory / "indptr.npy", indptr)
+    np.save(directory / "indices.npy", cols.astype(np.int64))
+    np.save(directory / "values.npy", values)
+    meta = {
+        "version": _CACHE_VERSION,
+        "type": adj_matrix.type.__name__,
+        "nrows": adj_matrix.nrows,
+        "ncols": adj_matrix.ncols,
+        "nvals": int(len(rows)),
+        "source": source,
+    }
+    with open(directory / _CACHE_META, "w") as f:
+        json.dump(meta, f)
+
+
+def load_csr_cache(
+    directory: PathLike,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, dict]:
+    """
+    Открывает кэш, сохранённый save_csr_cache. Массивы отображаются в память
+    и не читаются с диска целиком
+
+    Parameters
+    ----------
+    directory: PathLike
+        Папка кэша
+
+    Returns
+    -------
+    (indptr, indices, values, meta): Tuple[np.ndarray, np.ndarray, np.ndarray, dict]
+        Массивы CSR и описание матрицы
+    """
+    directory = pathlib.Path(directory)
+    with open(directory / _CACHE_META) as f:
+        meta = json.load(f)
+    if meta.get("version") != _CACHE_VERSION:
+        raise ValueError(f"{directory}: неподдерживаемая версия кэша")
+    indptr = np.load(directory / "indptr.npy", mmap_mode="r")
+    indices = np.load(directory / "indices.npy", mmap_mode="r")
+    values = np.load(directory / "values.npy", mmap_mode="r")
+    if len(indptr) != meta["nrows"] + 1 or len(indices) != meta["nvals"]:
+        raise ValueError(f"{directory}: кэш повреждён")
+    return indptr, indices, values, meta
+
+
+def _from_csr(indptr, indices, values, meta) -> pgb.Matrix:
+    rows = np.repeat(np.arange(meta["nrows"], dtype=np.uint64), np.diff(indptr))
+    return matrix_from_arrays(
+        rows,
+        indices,
+        values,
+        meta["nrows"],
+        meta["ncols"],
+        typ=getattr(pgb.types, meta["type"]),
+    )
+
+
+def _build(rows, cols, values, nrows, ncols, typ, dup_op) -> pgb.Matrix:
+    if values is None or typ == pgb.types.BOOL:
+        values = True
+    if len(rows) and (rows.max() >= nrows or cols.max() >= ncols):
+        raise ValueError("Номер вершины выходит за размеры матрицы")
+    return matrix_from_arrays(rows, cols, values, nrows, ncols, typ=typ, dup_op=dup_op)
+
+
+def _read_columns(
+    f: BinaryIO,
+    columns: int,
+    dtype,
+    chunk_size: int,
+    comment: Optional[bytes],
+    separator: Optional[bytes] = None,
+) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    chunks = list(_parse_chunks(f, columns, dtype, chunk_size, comment, separator))
+    data = np.concatenate(chunks) if chunks else np.empty((0, columns), dtype=dtype)
+    rows = data[:, 0].astype(np.int64)
+    cols = data[:, 1].astype(np.int64)
+    values = data[:, 2].copy() if columns == 3 else None
+    return rows, cols, values
+
+
+def _parse_chunks(
+    f: BinaryIO,
+    columns: int,
+    dtype,
+    chunk_size: int,
+    comment: Optional[bytes],
+    separator: Optional[bytes],
+) -> Iterator[np.ndarray]:
+    # блок обрезается по последнему переводу строки, остаток переходит в следующий блок
+    tail = b""
+    while True:
+        block = f.read(chunk_size)
+        if not block:
+            break
+        block = tail + block
+        cut = block.rfind(b"\n") + 1
+        tail = block[cut:]
+        if cut > 0:
+            yield _parse_block(block[:cut], columns, dtype, comment, separator)
+    if tail.strip():
+        yield _parse_block(tail, columns, dtype, comment, separator)
+
+
+def _parse_block(
+    block: bytes,
+    columns: int,
+    dtype,
+    comment: Optional[bytes],
+    separator: Optional[bytes],
+) -> np.ndarray:
+    if comment is not None and comment in block:
+        block = b"\n".join(
+            line for line in block.splitlines() if not line.lstrip().startswith(comment)
+        )
+    if separator is not None:
+        block = block.replace(separator, b" ")
+    # на нечисловых данных np.fromstring не падает, а останавливается с предупреждением
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            numbers = np.fromstring(block, dtype=dtype, sep=" ")
+        except DeprecationWarning:
+            raise ValueError("Файл содержит нечисловые данные") from None
+    if numbers.size % columns != 0 or not _has_columns(block, columns):
+        raise ValueError(f"В каждой строке должно быть {columns} числа")
+    return numbers.reshape(-1, columns)
+
+
+def _has_columns(block: bytes, columns: int) -> bool:
+    # начала чисел находятся по байтам блока, а число начал между соседними
+    # переводами строк - двоичным поиском
+    data = np.frombuffer(block, dtype=np.uint8)
+    space = _SPACE[data]
+    starts = np.flatnonzero(~space & np.concatenate(([True], space[:-1])))
+    before_newline = np.searchsorted(starts, np.flatnonzero(data == ord("\n")))
+    counts = np.diff(before_newline, prepend=0, append=len(starts))
+    return bool(np.all((counts == 0) | (counts == columns)))
+
+
+def _option_key(value):
+    # значения параметров чтения в виде, пригодном для сравнения с meta.json
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return getattr(value, "__name__", None) or repr(value)
@@ -0,0 +1,117 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Tuple, TypeVar
+
+import pygraphblas as pgb
+
+__all__ = ["MatrixCache", "matrix_version"]
+
+T = TypeVar("T")
+
+
+def matrix_version(adj_matrix: pgb.Matrix) -> Tuple:
+    """
+    Дешёвая "версия" матрицы: тип, размеры и число хранимых значений.
+    Изменение структуры матрицы (добавление или удаление рёбер) меняет версию,
+    изменение одних только значений - нет.
+
+    Parameters
+    ----------
+    adj_matrix: Matrix
+        Матрица смежности
+
+    Returns
+    -------
+    version: Tuple
+        Кортеж (тип, число строк, число столбцов, число значений)
+    """
+    return adj_matrix.type, adj_matrix.nrows, adj_matrix.ncols, adj_matrix.nvals
+
+
+class MatrixCache:
+    """
+    Ограниченный по размеру LRU кэш величин, вычисленных по матрице
+    (транспонированная матрица, треугольные части, степени вершин и т.п.).
+
+    Объекты pygraphblas.Matrix не поддерживают слабые ссылки и атрибуты,
+    поэтому кэш хранит сильную ссылку на матрицу: это гарантирует, что id
+    матрицы не будет переиспользован, пока запись находится в кэше.
+    Запись считается устаревшей, если изменилась версия матрицы (см. matrix_version).
+    Изменение структуры, сохраняющее число рёбер (например, перенос ребра), версию
+    не меняет, поэтому после любого изменения матрицы на месте её записи нужно удалить
+    методом invalidate. Записи удерживают матрицы в памяти до вытеснения или очистки.
+
+    Операции с кэшем защищены блокировкой, так что им можно пользоваться из нескольких
+    потоков. factory выполняется вне блокировки: если два потока одновременно
+    не нашли значение, оно будет вычислено дважды, а сохранено последнее.
+
+    Parameters
+    ----------
+    maxsize: int
+        Максимальное число хранимых записей
+    """
+
+    def __init__(self, maxsize: int = 8):
+        if maxsize <= 0:
+            raise ValueError("Размер кэша должен быть положительным")
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, adj_matrix: pgb.Matrix, key: Hashable, factory: Callable[[], T]) -> T:
+        """
+        Возвращает закэшированное значение для пары (матрица, ключ),
+        вычисляя его с помощью factory, если значения нет или оно устарело.
+
+        Parameters
+        ----------
+        adj_matrix: Matrix
+            Матрица, по которой вычисляется значение
+        key: Hashable
+            Имя вычисляемой величины
+        factory: Callable[[], T]
+            Функция, вычисляющая значение
+
+        Returns
+        -------
+        value: T
+            Закэшированное или только что вычисленное значение
+        """
+        entry_key = (id(adj_matrix), key)
+        version = matrix_version(adj_matrix)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry[0] is adj_matrix and entry[1] == version:
+                self._entries.move_to_end(entry_key)
+                return entry[2]
+
+        value = factory()
+        with self._lock:
+            self._entries[entry_key] = (adj_matrix, version, value)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, adj_matrix: pgb.Matrix):
+        """
+        Удаляет из кэша все записи, относящиеся к данной матрице
+
+        Parameters
+        ----------
+        adj_matrix: Matrix
+            Матрица, записи для которой нужно удалить
+        """
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[0] == id(adj_matrix)]:
+                del self._entries[entry_key]
+
+    def clear(self):
+        """
+        Полностью очищает кэш
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,12 +1,38 @@
+from collections import deque
+
+import numpy as np
 import pygraphblas as pgb
-from typing import List, Collection, Tuple
+from typing import List, Collection, Iterator, Optional, Sequence, Tuple, Union
+
+from project.bulk import (
+    check_output,
+    dense_rows,
+    extract_matrix,
+    matrix_from_arrays,
+    matrix_to_dense,
+)
+from project.runtime_config import runtime_descriptor
+from project.shared_graph import SharedMatrixPool, run_sources_parallel
+
+__all__ = [
+    "msbfs",
+    "msbfs_batches",
+    "msbfs_levels",
+    "msbfs_bitwise",
+    "msbfs_levels_parallel",
+]
+
+# оценка числа байт на одну стартовую вершину и одну вершину графа:
+# матрицы parents и curr_front типа INT64 и плотный результат int64
+_BYTES_PER_SOURCE_VERTEX = 3 * 8
 
-__all__ = ["msbfs"]
+# число стартовых вершин, упакованных в одно слово UINT64 в msbfs_bitwise
+_SOURCES_PER_WORD = 64
 
 
 def msbfs(
-    adj_matrix: pgb.Matrix, start_vertices: Collection[int]
-) -> List[Tuple[int, List[int]]]:
+    adj_matrix: pgb.Matrix, start_vertices: Collection[int], output: str = "list"
+) -> Union[List[Tuple[int, List[int]]], np.ndarray]:
     """
     Реализация BFS от нескольких стартовых вершин для ориентированного графа
 
@@ -16,6 +42,9 @@ def msbfs(
         Матрица смежности данного графа
     start_vertices: Collection[int]
         Вершины с которой начинаем обход в ширину
+    output: str
+        Формат результата: "list" - список пар, "numpy" - двумерный массив int64,
+        i-я строка которого содержит родительские вершины для i-й стартовой вершины
 
     Returns
     -------
@@ -25,7 +54,290 @@ def msbfs(
     недостижимые вершины будут иметь значение -2.
     """
     _check_conditions_msbfs(adj_matrix, start_vertices)
+    check_output(output)
+    return _format_parents(start_vertices, _parents(adj_matrix, start_vertices), output)
+
+
+def msbfs_batches(
+    adj_matrix: pgb.Matrix,
+    start_vertices: Sequence[int],
+    batch_size: Optional[int] = None,
+    memory_budget: Optional[int] = None,
+    output: str = "list",
+    processes: Optional[int] = None,
+) -> Iterator[Tuple[int, Union[List[Tuple[int, List[int]]], np.ndarray]]]:
+    """
+    BFS от нескольких стартовых вершин, выполняемый пакетами.
+    Матрицы parents и curr_front создаются только для одного пакета,
+    а результаты пакетов возвращаются по мере готовности.
+
+    Parameters
+    ----------
+    adj_matrix: Matrix
+        Матрица смежности данного графа
+    start_vertices: Sequence[int]
+        Вершины с которой начинаем обход в ширину
+    batch_size: Optional[int]
+        Число стартовых вершин в одном пакете
+    memory_budget: Optional[int]
+        Ограничение в байтах на память под один пакет, используется для выбора
+        batch_size, если он не указан. Если не указано ни то, ни другое,
+        все вершины обрабатываются одним пакетом
+    output: str
+        Формат результата пакета, как у msbfs
+    processes: Optional[int]
+        Число процессов-обработчиков. Если не указано, пакеты обрабатываются
+        в текущем процессе. Иначе матрица смежности один раз передаётся
+        каждому процессу через разделяемую память (SharedMatrixPool), и одновременно
+        обрабатывается не больше 2 * processes пакетов. Разделяемая память
+        экономит только передачу: каждый процесс строит по ней собственную
+        полную матрицу GraphBLAS, так что памяти под граф нужно
+        в processes + 1 раз больше
+
+    Returns
+    -------
+    batches: Iterator[Tuple[int, Union[List[Tuple[int, List[int]]], np.ndarray]]]
+        Пары (номер первой вершины пакета в start_vertices, результат msbfs для пакета)
+        в порядке следования стартовых вершин
+    """
+    _check_conditions_msbfs(adj_matrix, start_vertices)
+    check_output(output)
+    if batch_size is None:
+        batch_size = _batch_size_for_budget(
+            adj_matrix.ncols, len(start_vertices), memory_budget
+        )
+    if batch_size <= 0:
+        raise ValueError("Размер пакета должен быть положительным")
+    if processes is not None and processes <= 0:
+        raise ValueError("Число процессов должно быть положительным")
+    # проверки выше выполняются при вызове, а пакеты - по мере итерации
+    return _iter_batches(adj_matrix, start_vertices, batch_size, output, processes)
+
+
+def _iter_batches(
+    adj_matrix: pgb.Matrix,
+    start_vertices: Sequence[int],
+    batch_size: int,
+    output: str,
+    processes: Optional[int],
+) -> Iterator[Tuple[int, Union[List[Tuple[int, List[int]]], np.ndarray]]]:
+    offsets = range(0, len(start_vertices), batch_size)
+    batches = (list(start_vertices[i : i + batch_size]) for i in offsets)
+
+    if processes is None:
+        for offset, batch in zip(offsets, batches):
+            yield offset, _batch_parents(adj_matrix, batch, output)
+        return
+
+    with SharedMatrixPool(adj_matrix, processes) as pool:
+        pending = deque()
+        for offset, batch in zip(offsets, batches):
+            pending.append((offset, pool.submit(_batch_parents, batch, output)))
+            if len(pending) >= 2 * processes:
+                offset, future = pending.popleft()
+                yield offset, future.result()
+        while pending:
+            offset, future = pending.popleft()
+            yield offset, future.result()
+
+
+def msbfs_levels(
+    adj_matrix: pgb.Matrix, start_vertices: Collection[int], output: str = "list"
+) -> Union[List[Tuple[int, List[int]]], np.ndarray]:
+    """
+    BFS от нескольких стартовых вершин, вычисляющий только расстояния (уровни) до вершин.
+    Фронт хранится булевой матрицей и продвигается по полукольцу ANY_PAIR,
+    которое не читает значения и останавливается на первом найденном предке,
+    поэтому шаг дешевле, чем MIN_FIRST над INT64 в msbfs.
+
+    Parameters
+    ----------
+    adj_matrix: Matrix
+        Матрица смежности данного графа. Рёбрами считаются элементы со значением True
+    start_vertices: Collection[int]
+        Вершины с которой начинаем обход в ширину
+    output: str
+        Формат результата: "list" - список пар, "numpy" - двумерный массив int64,
+        i-я строка которого содержит уровни вершин для i-й стартовой вершины
+
+    Returns
+    -------
+    Список пар вида (start_vertex, levels), где каждой стартовой вершине сопоставляется
+    список из n чисел шагов, за которые из неё можно дойти до вершин графа.
+    Если вершина недостижима, то будет установлено значение -1.
+    """
+    _check_conditions_msbfs(adj_matrix, start_vertices)
+    check_output(output)
+
+    if adj_matrix.nvals > 0 and not adj_matrix.reduce_bool(pgb.BOOL.LAND_MONOID):
+        # ANY_PAIR учитывает только структуру, поэтому рёбра со значением False убираем
+        adj_matrix = adj_matrix.select("!=", False)
+
+    levels = pgb.Matrix.sparse(
+        pgb.INT64, nrows=len(start_vertices), ncols=adj_matrix.ncols
+    )
+    curr_front = pgb.Matrix.sparse(
+        pgb.BOOL, nrows=len(start_vertices), ncols=adj_matrix.ncols
+    )
+    for row, start in enumerate(start_vertices):
+        levels[row, start] = 0
+        curr_front[row, start] = True
+
+    replace_complement = runtime_descriptor(pgb.descriptor.RC)
+    step_number = 1
+    while curr_front.nvals > 0:
+        curr_front.mxm(
+            other=adj_matrix,
+            out=curr_front,
+            semiring=pgb.BOOL.ANY_PAIR,
+            mask=levels.S,
+            desc=replace_complement,
+        )
+        levels.assign_scalar(step_number, mask=curr_front.S)
+        step_number += 1
+
+    if output == "numpy":
+        return matrix_to_dense(levels, fill=-1)
+    return list(zip(start_vertices, dense_rows(levels, fill=-1)))
+
+
+def msbfs_bitwise(
+    adj_matrix: pgb.Matrix, start_vertices: Collection[int], output: str = "list"
+) -> Union[List[Tuple[int, List[int]]], np.ndarray]:
+    """
+    Бит-параллельный BFS от нескольких стартовых вершин, вычисляющий уровни вершин.
+    Стартовые вершины упаковываются по 64 в слово UINT64: фронт и множество посещённых
+    вершин хранятся матрицами n на ceil(k / 64), а шаг обхода выполняется одним
+    умножением по полукольцу BOR_BAND сразу для всех стартовых вершин.
+    Результат совпадает с msbfs_levels, но промежуточные матрицы занимают
+    в 64 раза меньше элементов.
+
+    Parameters
+    ----------
+    adj_matrix: Matrix
+        Матрица смежности данного графа. Рёбрами считаются элементы со значением True
+    start_vertices: Collection[int]
+        Вершины с которой начинаем обход в ширину
+    output: str
+        Формат результата: "list" - список пар, "numpy" - двумерный массив int64,
+        i-я строка которого содержит уровни вершин для i-й стартовой вершины
+
+    Returns
+    -------
+    Список пар вида (start_vertex, levels), где каждой стартовой вершине сопоставляется
+    список из n чисел шагов, за которые из неё можно дойти до вершин графа.
+    Если вершина недостижима, то будет установлено значение -1.
+    """
+    _check_conditions_msbfs(adj_matrix, start_vertices)
+    check_output(output)
+
+    n = adj_matrix.ncols
+    k = len(start_vertices)
+    words = max(-(-k // _SOURCES_PER_WORD), 1)
+
+    # все биты ребра равны 1, поэтому BAND пропускает слово фронта без изменений
+    rows, cols, values = extract_matrix(adj_matrix)
+    edges = values.astype(bool)
+    bit_matrix = matrix_from_arrays(
+        rows[edges], cols[edges], np.iinfo(np.uint64).max, n, n, typ=pgb.UINT64
+    )
+
+    sources = np.arange(k, dtype=np.uint64)
+    curr_front = matrix_from_arrays(
+        np.asarray(start_vertices, dtype=np.uint64),
+        sources // _SOURCES_PER_WORD,
+        np.left_shift(np.uint64(1), sources % _SOURCES_PER_WORD),
+        n,
+        words,
+        typ=pgb.UINT64,
+        dup_op=pgb.UINT64.BOR,
+    )
+    visited = curr_front.dup()
+
+    levels = np.full((k, n), -1, dtype=np.int64)
+    levels[np.arange(k), np.asarray(start_vertices, dtype=np.intp)] = 0
+
+    transpose_first = runtime_descriptor(pgb.descriptor.T0)
+    step_number = 1
+    while curr_front.nvals > 0:
+        reached = bit_matrix.mxm(
+            curr_front, semiring=pgb.UINT64.BOR_BAND, desc=transpose_first
+        )
+        new_visited = visited.eadd(reached, pgb.UINT64.BOR)
+        curr_front = new_visited.eadd(visited, pgb.UINT64.BXOR).select("!=", 0)
+        visited = new_visited
+        _assign_bit_levels(levels, curr_front, step_number)
+        step_number += 1
+
+    if output == "numpy":
+        return levels
+    return list(zip(start_vertices, levels.tolist()))
+
+
+def msbfs_levels_parallel(
+    adj_matrix: pgb.Matrix,
+    start_vertices: Sequence[int],
+    output: str = "list",
+    processes: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> Union[List[Tuple[int, List[int]]], np.ndarray]:
+    """
+    Уровни вершин, как у msbfs_levels, вычисляемые msbfs_bitwise в пуле процессов.
+    Матрица смежности передаётся процессам через разделяемую память,
+    а уровни собираются в один плотный массив (см. run_sources_parallel).
+    Каждый процесс строит собственную полную копию матрицы в GraphBLAS
+
+    Parameters
+    ----------
+    adj_matrix: Matrix
+        Матрица смежности данного графа
+    start_vertices: Sequence[int]
+        Вершины с которой начинаем обход в ширину
+    output: str
+        Формат результата, как у msbfs_levels
+    processes: Optional[int]
+        Число процессов. По умолчанию число процессоров
+    batch_size: Optional[int]
+        Число стартовых вершин в одной задаче. Для msbfs_bitwise выгодны
+        пакеты, кратные 64
+
+    Returns
+    -------
+    То же, что возвращает msbfs_levels
+    """
+    _check_conditions_msbfs(adj_matrix, start_vertices)
+    check_output(output)
+
+    levels = run_sources_parallel(
+        adj_matrix,
+        start_vertices,
+        _bitwise_levels,
+        np.int64,
+        processes=processes,
+        batch_size=batch_size,
+    )
+    if output == "numpy":
+        return levels
+    return list(zip(start_vertices, levels.tolist()))
+
 
+def _parents(adj_matrix: pgb.Matrix, start_vertices: Collection[int]) -> pgb.Matrix:
+    """
+    Вычисляет матрицу родительских вершин для стартовых вершин без проверки входных данных
+
+    Parameters
+    ----------
+    adj_matrix: Matrix
+        Матрица смежности данного графа
+    start_vertices: Collection[int]
+        Вершины с которой начинаем обход в ширину
+
+    Returns
+    -------
+    parents: Matrix
+        Матрица INT64, i-я строка которой содержит родительские вершины для i-й стартовой вершины.
+        Стартовой вершине соответствует значение -1, недостижимые вершины отсутствуют
+    """
     parents = pgb.Matrix.sparse(
         pgb.INT64, nrows=len(start_vertices), ncols=adj_matrix.ncols
     )
@@ -36,21 +348,71 @@ def msbfs(
         parents[row, start] = -1
         curr_front[row, start] = start
 
+    replace_complement = runtime_descriptor(pgb.descriptor.RC)
     while curr_front.nvals > 0:
         curr_front.mxm(
             other=adj_matrix,
             out=curr_front,
             semiring=pgb.INT64.MIN_FIRST,
             mask=parents.S,
-            desc=pgb.descriptor.RC,
+            desc=replace_complement,
         )
         parents.assign(value=curr_front, mask=curr_front.S)
         curr_front.apply(op=pgb.INT64.POSITIONJ, out=curr_front, mask=curr_front.S)
 
-    return [
-        (start, [parents.get(row, col, default=-2) for col in range(adj_matrix.ncols)])
-        for row, start in enumerate(start_vertices)
-    ]
+    return parents
+
+
+def _format_parents(
+    start_vertices: Collection[int], parents: pgb.Matrix, output: str
+) -> Union[List[Tuple[int, List[int]]], np.ndarray]:
+    if output == "numpy":
+        return matrix_to_dense(parents, fill=-2)
+    return list(zip(start_vertices, dense_rows(parents, fill=-2)))
+
+
+def _assign_bit_levels(levels: np.ndarray, front: pgb.Matrix, step_number: int):
+    """
+    Записывает номер шага в levels для всех пар (стартовая вершина, вершина),
+    биты которых установлены во фронте msbfs_bitwise
+    """
+    vertices, words, bits = extract_matrix(front)
+    unpacked = np.unpackbits(
+        bits.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little"
+    )
+    entries, offsets = np.nonzero(unpacked)
+    sources = words[entries].astype(np.intp) * _SOURCES_PER_WORD + offsets
+    levels[sources, vertices[entries].astype(np.intp)] = step_number
+
+
+def _batch_size_for_budget(n: int, sources: int, memory_budget: Optional[int]) -> int:
+    """
+    Выбирает число стартовых вершин в пакете так, чтобы пакет помещался в memory_budget байт
+
+    Parameters
+    ----------
+    n: int
+       Число вершин графа
+    sources: int
+       Общее число стартовых вершин
+    memory_budget: Optional[int]
+       Ограничение памяти в байтах. Если не указано, все вершины помещаются в один пакет
+    """
+    if memory_budget is None:
+        return max(sources, 1)
+    if memory_budget <= 0:
+        raise ValueError("Ограничение памяти должно быть положительным")
+    return max(1, memory_budget // (_BYTES_PER_SOURCE_VERTEX * max(n, 1)))
+
+
+def _batch_parents(
+    adj_matrix: pgb.Matrix, start_vertices: List[int], output: str
+) -> Union[List[Tuple[int, List[int]]], np.ndarray]:
+    return _format_parents(start_vertices, _parents(adj_matrix, start_vertices), output)
+
+
+def _bitwise_levels(adj_matrix: pgb.Matrix, start_vertices: List[int]) -> np.ndarray:
+    return msbfs_bitwise(adj_matrix, start_vertices, output="numpy")
 
 
 def _check_conditions_msbfs(
@@ -1,11 +1,18 @@
-from typing import List, Tuple
+from typing import List, Optional, Tuple, Union
 
+import numpy as np
 import pygraphblas as pgb
 
+from project.bulk import check_output, dense_rows, matrix_to_dense
+from project.diagonal import min_plus_step
+from project.shared_graph import run_sources_parallel
+
 
 def mssp(
-    adj_matrix: pgb.Matrix, start_vertices: List[int]
-) -> List[Tuple[int, List[int]]]:
+    adj_matrix: pgb.Matrix,
+    start_vertices: List[int],
+    output: str = "list",
+) -> Union[List[Tuple[int, List[int]]], np.ndarray]:
     """
     Расширение алгоритма Бэлмана-Форда поиска кратчайших путей в графе для нескольких стартовых вершин
 
@@ -15,6 +22,9 @@ def mssp(
         Матрица смежности данного графа
     start_vertices: List[int]
         Стартовые вершины
+    output: str
+        Формат результата: "list" - список пар, "numpy" - двумерный массив float64,
+        i-я строка которого содержит расстояния от i-й стартовой вершины
 
     Raises
     ------
@@ -23,50 +33,114 @@ def mssp(
 
     Returns
     -------
-    distances: List[Tuple[int, List[int]]]
+    distances: Union[List[Tuple[int, List[int]]], np.ndarray]
         Массив пар: вершина, и массив, где для каждой вершины указано расстояние до неё из указанной.
         Если вершина не достижима, то значение соответствующей ячейки равно -1.
     """
     _check_conditions(adj_matrix, start_vertices)
-    _prepare_matrix(adj_matrix)
+    check_output(output)
+
+    d = mssp_distances(adj_matrix, start_vertices)
+    if output == "numpy":
+        return matrix_to_dense(d, fill=np.inf)
+    return list(zip(start_vertices, dense_rows(d, fill=np.inf)))
+
+
+def mssp_parallel(
+    adj_matrix: pgb.Matrix,
+    start_vertices: List[int],
+    output: str = "list",
+    processes: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> Union[List[Tuple[int, List[int]]], np.ndarray]:
+    """
+    mssp, в котором стартовые вершины делятся на пакеты, обрабатываемые в пуле процессов.
+    Матрица смежности передаётся процессам через разделяемую память,
+    а расстояния собираются в один плотный массив (см. run_sources_parallel).
+    Каждый процесс строит собственную полную копию матрицы в GraphBLAS
+
+    Parameters
+    ----------
+    adj_matrix: Matrix
+        Матрица смежности данного графа
+    start_vertices: List[int]
+        Стартовые вершины
+    output: str
+        Формат результата, как у mssp
+    processes: Optional[int]
+        Число процессов. По умолчанию число процессоров
+    batch_size: Optional[int]
+        Число стартовых вершин в одной задаче
+
+    Raises
+    ------
+    ValueError
+        Если в графе есть цикл с отрицательным весом
+
+    Returns
+    -------
+    distances: Union[List[Tuple[int, List[int]]], np.ndarray]
+        То же, что возвращает mssp
+    """
+    _check_conditions(adj_matrix, start_vertices)
+    check_output(output)
+
+    d = run_sources_parallel(
+        adj_matrix,
+        start_vertices,
+        _distance_rows,
+        np.float64,
+        processes=processes,
+        batch_size=batch_size,
+    )
+    if output == "numpy":
+        return d
+    return list(zip(start_vertices, d.tolist()))
+
 
+def mssp_distances(adj_matrix: pgb.Matrix, start_vertices: List[int]) -> pgb.Matrix:
+    """
+    Вычисляет матрицу расстояний от стартовых вершин итерациями Бэлмана-Форда,
+    останавливаясь, как только очередная итерация ничего не изменила.
+    В отличие от mssp, не проверяет аргументы и возвращает разреженную матрицу
+
+    Parameters
+    ----------
+    adj_matrix: Matrix
+       Матрица смежности. Нули на главной диагонали учитываются неявно (см. min_plus_step)
+    start_vertices: List[int]
+       Стартовые вершины
+
+    Raises
+    ------
+    ValueError
+        Если в графе есть цикл с отрицательным весом
+
+    Returns
+    -------
+    d: Matrix
+        Разреженная матрица FP64, i-я строка которой содержит расстояния от i-й стартовой вершины
+    """
     d = pgb.Matrix.sparse(
         pgb.types.FP64, nrows=len(start_vertices), ncols=adj_matrix.ncols
     )
-    start_vertex_to_row_number = {v: i for i, v in enumerate(start_vertices)}
-    for v, i in start_vertex_to_row_number.items():
+    for i, v in enumerate(start_vertices):
         d[i, v] = 0
 
     for j in range(1, adj_matrix.ncols):
-        d.mxm(adj_matrix, semiring=pgb.semiring.MIN_PLUS_FP64, out=d)
+        new_d = min_plus_step(d, adj_matrix)
+        if new_d.iseq(d):
+            return d
+        d = new_d
 
     # есть ли в графе отрицательные циклы?
-    if d.isne(d.mxm(adj_matrix, semiring=pgb.semiring.MIN_PLUS_FP64)):
+    if d.isne(min_plus_step(d, adj_matrix)):
         raise ValueError("В графе есть циклы отрицательного веса!")
-    else:
-        return [
-            (
-                i,
-                [
-                    d.get(start_vertex_to_row_number[i], j, default=float("inf"))
-                    for j in range(d.ncols)
-                ],
-            )
-            for i in start_vertices
-        ]
-
+    return d
 
-def _prepare_matrix(adj_matrix: pgb.Matrix):
-    """
-    Заполняет главную диагональ матрицы нулями
 
-    Parameters
-    ----------
-    adj_matrix: Matrix
-       Матрица смежности
-    """
-    for i in range(adj_matrix.ncols):
-        adj_matrix[i, i] = 0
+def _distance_rows(adj_matrix: pgb.Matrix, start_vertices: List[int]) -> np.ndarray:
+    return matrix_to_dense(mssp_distances(adj_matrix, start_vertices), fill=np.inf)
 
 
 def _check_conditions(adjacency_matrix: pgb.Matrix, start_vertices: List[int]):
@@ -0,0 +1,331 @@
+import functools
+import hashlib
+import inspect
+import os
+import pathlib
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple
+
+import numpy as np
+import pygraphblas as pgb
+
+from project.bulk import extract_matrix
+
+__all__ = ["graph_fingerprint", "ResultCache"]
+
+
+def graph_fingerprint(adj_matrix: pgb.Matrix) -> str:
+    """
+    Отпечаток матрицы: хэш BLAKE2b от типа, размеров и всех элементов.
+    Для вычисления все элементы извлекаются из матрицы и хэшируются,
+    поэтому время и дополнительная память пропорциональны числу элементов.
+    Совпадающие по содержимому матрицы имеют одинаковый отпечаток,
+    поэтому по нему можно искать результаты, сохранённые другим процессом
+
+    Parameters
+    ----------
+    adj_matrix: Matrix
+        Матрица смежности
+
+    Returns
+    -------
+    fingerprint: str
+        Шестнадцатеричная строка из 32 символов
+    """
+    rows, cols, values = extract_matrix(adj_matrix)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(
+        f"{adj_matrix.type.__name__}:{adj_matrix.nrows}:{adj_matrix.ncols}".encode()
+    )
+    for array in (rows, cols, values):
+        h.update(np.ascontiguousarray(array))
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    LRU кэш результатов запросов к графу (bellman_ford, mssp и т.п.).
+    Ключ записи - отпечаток матрицы (см. graph_fingerprint), имя алгоритма
+    и остальные аргументы вызова, поэтому после изменения графа старые записи
+    перестают находиться и со временем вытесняются.
+
+    Отпечаток вычисляется за проход по всем элементам матрицы только при первой
+    встрече с объектом матрицы и запоминается для последних max_graphs матриц,
+    так что попадание в кэш для уже известной матрицы не требует прохода по графу.
+    Запомненные матрицы удерживаются кэшем до вытеснения, invalidate или clear.
+    Изменение матрицы на месте кэш не отслеживает: после него нужно вызвать
+    invalidate(adj_matrix), иначе будут возвращаться результаты для старого графа.
+
+    Записи вытесняются по суммарному размеру результатов. Если задана папка spill_dir,
+    вытесненные из памяти записи сохраняются на диск и загружаются оттуда при промахе
+    в памяти; размер папки ограничен max_spill_bytes.
+
+    Parameters
+    ----------
+    max_bytes: int
+        Наибольший суммарный размер результатов в памяти
+    spill_dir: Optional[PathLike]
+        Папка для вытесненных записей. По умолчанию вытесненные записи удаляются
+    max_spill_bytes: Optional[int]
+        Наибольший суммарный размер файлов в spill_dir. По умолчанию не ограничен
+    max_graphs: int
+        Число матриц, отпечатки которых запоминаются
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        spill_dir=None,
+        max_spill_bytes: Optional[int] = None,
+        max_graphs: int = 8,
+    ):
+        if max_bytes <= 0:
+            raise ValueError("Размер кэша должен быть положительным")
+        if max_graphs <= 0:
+            raise ValueError("Число запоминаемых матриц должно быть положительным")
+        if max_spill_bytes is not None and max_spill_bytes <= 0:
+            raise ValueError("Размер папки кэша должен быть положительным")
+        self.max_bytes = max_bytes
+        self.max_spill_bytes = max_spill_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self.max_graphs = max_graphs
+        # id(матрицы) -> (матрица, отпечаток); ссылка на матрицу не даёт
+        # другому объекту получить тот же id, пока запись существует
+        self._graphs = OrderedDict()
+        self._lock = threading.RLock()
+
+        self._spill_dir = None
+        self._spilled = OrderedDict()
+        self._spilled_bytes = 0
+        if spill_dir is not None:
+            self._spill_dir = pathlib.Path(spill_dir)
+            self._spill_dir.mkdir(parents=True, exist_ok=True)
+            files = sorted(
+                self._spill_dir.glob("*.pkl"), key=lambda path: path.stat().st_mtime_ns
+            )
+            for path in files:
+                self._spilled[path.stem] = path.stat().st_size
+                self._spilled_bytes += self._spilled[path.stem]
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Суммарный размер результатов в памяти
+        """
+        return self._nbytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def wrap(self, func: Callable, name: Optional[str] = None) -> Callable:
+        """
+        Возвращает функцию с той же сигнатурой, что и func, результаты которой кэшируются.
+        Первым аргументом func должна принимать матрицу смежности. Матрицы среди
+        остальных аргументов (например, transposed у bfs) входят в ключ своими отпечатками.
+        Исключения не кэшируются, а возвращаемые значения копируются,
+        чтобы изменение результата вызывающим кодом не портило кэш
+
+        Parameters
+        ----------
+        func: Callable
+            Функция вида func(adj_matrix, ...)
+        name: Optional[str]
+            Имя алгоритма в ключе кэша. По умолчанию имя функции
+
+        Returns
+        -------
+        wrapper: Callable
+            Кэширующая обёртка
+        """
+        signature = inspect.signature(func)
+        name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = list(bound.arguments.items())
+            adj_matrix = arguments[0][1]
+            key = (
+                self.fingerprint(adj_matrix),
+                name,
+                tuple(
+                    (arg, _freeze(value, self.fingerprint))
+                    for arg, value in arguments[1:]
+                ),
+            )
+            found, value = self._lookup(key)
+            if not found:
+                value = func(*bound.args, **bound.kwargs)
+                self._store(key, value)
+            return _copy(value)
+
+        return wrapper
+
+    def fingerprint(self, adj_matrix: pgb.Matrix) -> str:
+        """
+        Отпечаток матрицы: вычисляется при первой встрече с объектом матрицы
+        и после invalidate, в остальных случаях берётся запомненный
+
+        Parameters
+        ----------
+        adj_matrix: Matrix
+            Матрица смежности
+
+        Returns
+        -------
+        fingerprint: str
+            См. graph_fingerprint
+        """
+        with self._lock:
+            entry = self._graphs.get(id(adj_matrix))
+            if entry is not None:
+                self._graphs.move_to_end(id(adj_matrix))
+                return entry[1]
+        fingerprint = graph_fingerprint(adj_matrix)
+        with self._lock:
+            self._graphs[id(adj_matrix)] = (adj_matrix, fingerprint)
+            while len(self._graphs) > self.max_graphs:
+                self._graphs.popitem(last=False)
+        return fingerprint
+
+    def invalidate(self, adj_matrix: pgb.Matrix):
+        """
+        Забывает отпечаток матрицы, следующий запрос вычислит его заново.
+        Нужно вызывать после каждого изменения матрицы на месте
+
+        Parameters
+        ----------
+        adj_matrix: Matrix
+            Изменённая матрица
+        """
+        with self._lock:
+            self._graphs.pop(id(adj_matrix), None)
+
+    def clear(self, spill: bool = False):
+        """
+        Очищает кэш в памяти и забывает отпечатки матриц
+
+        Parameters
+        ----------
+        spill: bool
+            Удалить также записи на диске
+        """
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self._graphs.clear()
+            if spill:
+                for name in list(self._spilled):
+                    self._drop_spilled(name)
+
+    def _lookup(self, key: Tuple) -> Tuple[bool, object]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[0]
+
+            if self._spill_dir is not None:
+                # файл мог записать и другой процесс, поэтому проверяется сам диск
+                name = _file_name(key)
+                path = self._spill_dir / f"{name}.pkl"
+                try:
+                    with open(path, "rb") as f:
+                        stored_key, value = pickle.load(f)
+                except (OSError, pickle.UnpicklingError, EOFError):
+                    stored_key = None
+                if stored_key == key:
+                    self.hits += 1
+                    self._touch_spilled(name, path)
+                    self._store(key, value)
+                    return True, value
+
+            self.misses += 1
+            return False, None
+
+    def _store(self, key: Tuple, value):
+        size = _sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._nbytes += size
+            while self._nbytes > self.max_bytes and self._entries:
+                evicted_key, (evicted, evicted_size) = self._entries.popitem(last=False)
+                self._nbytes -= evicted_size
+                self._spill(evicted_key, evicted)
+
+    def _spill(self, key: Tuple, value):
+        if self._spill_dir is None:
+            return
+        name = _file_name(key)
+        path = self._spill_dir / f"{name}.pkl"
+        if name not in self._spilled or not path.exists():
+            # запись через временный файл, чтобы другой процесс не прочитал файл наполовину
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        self._touch_spilled(name, path)
+        while (
+            self.max_spill_bytes is not None
+            and self._spilled_bytes > self.max_spill_bytes
+            and self._spilled
+        ):
+            self._drop_spilled(next(iter(self._spilled)))
+
+    def _touch_spilled(self, name: str, path: pathlib.Path):
+        # файл остаётся на диске и после загрузки в память и становится самым новым
+        os.utime(path)
+        if name in self._spilled:
+            self._spilled_bytes -= self._spilled.pop(name)
+        self._spilled[name] = path.stat().st_size
+        self._spilled_bytes += self._spilled[name]
+
+    def _drop_spilled(self, name: str):
+        self._spilled_bytes -= self._spilled.pop(name)
+        (self._spill_dir / f"{name}.pkl").unlink(missing_ok=True)
+
+
+def _file_name(key: Tuple) -> str:
+    return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+
+def _freeze(value, fingerprint: Callable[[pgb.Matrix], str]) -> Hashable:
+    # списки стартовых вершин и т.п. превращаются в кортежи, а матрицы - в отпечатки,
+    # у которых, в отличие от repr матрицы, стабильное имя файла на диске
+    if isinstance(value, pgb.Matrix):
+        return ("Matrix", fingerprint(value))
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(_freeze(item, fingerprint) for item in value)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _sizeof(value) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_sizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def _copy(value):
+    # копируются все списки и массивы на любой глубине, например списки
+    # расстояний внутри пар (вершина, расстояния), которые возвращает mssp
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_copy(item) for item in value)
+    return value
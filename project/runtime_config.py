@@ -0,0 +1,223 @@
+"""
+Параметры SuiteSparse:GraphBLAS: число потоков OpenMP и размер порции работы.
+
+set_runtime меняет глобальные параметры всего процесса. runtime задаёт их только
+для текущего потока (точнее, контекста contextvars): внутри блока операции
+pygraphblas без явного дескриптора получают дескриптор с полями
+GxB_DESCRIPTOR_NTHREADS и GxB_DESCRIPTOR_CHUNK, а там, где алгоритм передаёт
+свой дескриптор, его дополняет runtime_descriptor. Поэтому одновременные блоки
+из разных потоков не мешают друг другу и не трогают глобальные параметры.
+"""
+import contextlib
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, TypeVar
+
+import pygraphblas as pgb
+from pygraphblas import ffi, lib
+from pygraphblas.base import _check
+from pygraphblas.descriptor import Descriptor, current_desc
+
+__all__ = [
+    "get_runtime",
+    "set_runtime",
+    "runtime",
+    "runtime_descriptor",
+    "run_concurrently",
+]
+
+T = TypeVar("T")
+
+# параметры ближайшего блока runtime текущего контекста
+_overrides = contextvars.ContextVar("runtime_overrides", default={})
+
+# поля дескриптора, которые переносятся в дескриптор с параметрами runtime
+_DESCRIPTOR_FIELDS = (
+    lib.GrB_INP0,
+    lib.GrB_INP1,
+    lib.GrB_MASK,
+    lib.GrB_OUTP,
+    lib.GxB_AxB_METHOD,
+    lib.GxB_SORT,
+)
+
+
+def get_runtime() -> Dict[str, float]:
+    """
+    Параметры SuiteSparse:GraphBLAS, действующие в текущем потоке:
+    глобальные, переопределённые активными блоками runtime этого потока
+
+    Returns
+    -------
+    options: Dict[str, float]
+        Словарь с ключами "threads" (число потоков OpenMP на одну операцию)
+        и "chunk" (наименьший объём работы на один поток)
+    """
+    options = pgb.options_get()
+    return {
+        "threads": options["nthreads"],
+        "chunk": options["chunk"],
+        **_overrides.get(),
+    }
+
+
+def set_runtime(threads: Optional[int] = None, chunk: Optional[float] = None):
+    """
+    Задаёт глобальные параметры SuiteSparse:GraphBLAS для всего процесса.
+    Не указанные параметры не меняются. Внутри блоков runtime действуют
+    параметры блока, а новые глобальные значения - после выхода из него
+
+    Parameters
+    ----------
+    threads: Optional[int]
+        Число потоков OpenMP на одну операцию GraphBLAS
+    chunk: Optional[float]
+        Наименьший объём работы на один поток: на маленьких операциях
+        GraphBLAS использует меньше потоков, чем threads
+    """
+    _check_conditions(threads, chunk)
+    pgb.options_set(nthreads=threads, chunk=chunk)
+
+
+@contextlib.contextmanager
+def runtime(threads: Optional[int] = None, chunk: Optional[float] = None):
+    """
+    Временно меняет параметры GraphBLAS в текущем потоке, например
+    with runtime(threads=4): bfs(...). Работает и как декоратор.
+
+    Блоки вкладываются: не указанные параметры берутся из внешнего блока.
+    Другие потоки и глобальные параметры блок не затрагивает. Операции,
+    которым pygraphblas сам передаёт дескриптор (например, транспонирование
+    внутри cast), выполняются с глобальными параметрами
+
+    Parameters
+    ----------
+    threads: Optional[int]
+        Число потоков OpenMP на одну операцию GraphBLAS
+    chunk: Optional[float]
+        Наименьший объём работы на один поток
+    """
+    _check_conditions(threads, chunk)
+    overrides = dict(_overrides.get())
+    if threads is not None:
+        overrides["threads"] = threads
+    if chunk is not None:
+        overrides["chunk"] = chunk
+    token = _overrides.set(overrides)
+    try:
+        with runtime_descriptor(current_desc.get(None)):
+            yield
+    finally:
+        _overrides.reset(token)
+
+
+def runtime_descriptor(desc: Optional[Descriptor] = None) -> Optional[Descriptor]:
+    """
+    Дополняет дескриптор параметрами активного блока runtime текущего потока.
+    Нужен для операций с явным дескриптором, например desc=pgb.descriptor.RC,
+    которые не видят дескриптор блока. Вне блоков возвращает desc без изменений
+
+    Parameters
+    ----------
+    desc: Optional[Descriptor]
+        Исходный дескриптор. None - дескриптор по умолчанию
+
+    Returns
+    -------
+    desc: Optional[Descriptor]
+        Дескриптор с теми же полями и параметрами runtime
+    """
+    overrides = _overrides.get()
+    if not overrides:
+        return desc
+
+    result = Descriptor(name=desc.name if desc is not None else "runtime")
+    if desc is not None:
+        for field in _DESCRIPTOR_FIELDS:
+            if desc[field] != lib.GxB_DEFAULT:
+                result[field] = desc[field]
+    if "threads" in overrides:
+        _check(
+            lib.GxB_Desc_set(
+                result.get_desc(),
+                lib.GxB_DESCRIPTOR_NTHREADS,
+                ffi.cast("int", overrides["threads"]),
+            )
+        )
+    if "chunk" in overrides:
+        _check(
+            lib.GxB_Desc_set(
+                result.get_desc(),
+                lib.GxB_DESCRIPTOR_CHUNK,
+                ffi.cast("double", overrides["chunk"]),
+            )
+        )
+    return result
+
+
+def run_concurrently(
+    func: Callable[..., T],
+    arguments: Iterable[tuple],
+    max_workers: Optional[int] = None,
+    threads: Optional[int] = None,
+) -> List[T]:
+    """
+    Выполняет независимые запросы func(*args) в пуле потоков.
+    pygraphblas вызывает GraphBLAS через cffi, который отпускает GIL на время вызова,
+    поэтому запросы действительно выполняются параллельно. Чтобы не создавать
+    больше потоков, чем ядер, каждой операции GraphBLAS в запросах отводится
+    threads // max_workers потоков (см. runtime), остальные вызовы GraphBLAS
+    в процессе это не затрагивает.
+    func вызывается из нескольких потоков одновременно, поэтому не должна
+    изменять общие для запросов объекты, например саму матрицу смежности
+
+    Parameters
+    ----------
+    func: Callable[..., T]
+        Запрос, например bfs или bellman_ford
+    arguments: Iterable[tuple]
+        Аргументы запросов
+    max_workers: Optional[int]
+        Число потоков пула. По умолчанию min(число запросов, threads)
+    threads: Optional[int]
+        Общее число потоков. По умолчанию число процессоров
+
+    Returns
+    -------
+    results: List[T]
+        Результаты запросов в порядке аргументов
+    """
+    arguments = list(arguments)
+    if threads is None:
+        threads = os.cpu_count() or 1
+    if max_workers is None:
+        max_workers = max(1, min(len(arguments), threads))
+    if threads <= 0 or max_workers <= 0:
+        raise ValueError("Число потоков должно быть положительным")
+
+    # потоки пула не наследуют контекст вызывающего, поэтому каждый запрос
+    # выполняется в копии контекста с блоком runtime
+    with runtime(threads=max(1, threads // max_workers)):
+        context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(
+            executor.map(lambda args: context.copy().run(func, *args), arguments)
+        )
+
+
+def _check_conditions(threads: Optional[int], chunk: Optional[float]):
+    """
+    Проверяет, что число потоков и размер порции работы положительны
+
+    Parameters
+    ----------
+    threads: Optional[int]
+        Число потоков
+    chunk: Optional[float]
+        Наименьший объём работы на один поток
+    """
+    if threads is not None and threads <= 0:
+        raise ValueError("Число потоков должно быть положительным")
+    if chunk is not None and chunk <= 0:
+        raise ValueError("Размер порции работы должен быть положительным")
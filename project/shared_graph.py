@@ -0,0 +1,353 @@
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pygraphblas as pgb
+
+from project.bulk import extract_matrix, matrix_from_arrays
+
+__all__ = ["SharedArrayInfo", "SharedCSR", "SharedMatrixPool", "run_sources_parallel"]
+
+
+class SharedArrayInfo(NamedTuple):
+    """
+    Описание массива NumPy в блоке разделяемой памяти
+    """
+
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class SharedCSR:
+    """
+    Матрица в формате CSR, массивы indptr, indices и values которой лежат
+    в блоках multiprocessing.shared_memory. Процесс-владелец создаёт блоки
+    методом export, а другие процессы по описанию handle открывают их
+    методом attach и видят те же массивы без копирования.
+
+    Блоки существуют, пока владелец не вызовет close (или не выйдет из with).
+    Перед close нужно удалить все ссылки на массивы indptr, indices и values
+    и на их срезы: пока они существуют, блок закрыть нельзя и close
+    завершается с BufferError.
+
+    Parameters
+    ----------
+    handle: Tuple
+        Описание матрицы: (тип, число строк, число столбцов, indptr, indices, values)
+    owner: bool
+        Процесс создал блоки и отвечает за их удаление
+    """
+
+    def __init__(self, handle: Tuple, owner: bool = False):
+        self.handle = handle
+        self._owner = owner
+        typ, nrows, ncols, *infos = handle
+        self.typ = getattr(pgb.types, typ)
+        self.nrows = nrows
+        self.ncols = ncols
+        self._blocks = []
+        try:
+            self.indptr, self.indices, self.values = [
+                self._open(info) for info in infos
+            ]
+        except BaseException:
+            # уже открытые блоки закрываются, а владелец ещё и удаляет их
+            self.close()
+            raise
+
+    @classmethod
+    def export(cls, adj_matrix: pgb.Matrix) -> "SharedCSR":
+        """
+        Копирует матрицу в новые блоки разделяемой памяти
+
+        Parameters
+        ----------
+        adj_matrix: Matrix
+            Матрица
+
+        Returns
+        -------
+        shared: SharedCSR
+            Владелец блоков
+        """
+        rows, cols, values = extract_matrix(adj_matrix)
+        if len(rows) > 1 and np.any(rows[1:] < rows[:-1]):
+            order = np.lexsort((cols, rows))
+            rows, cols, values = rows[order], cols[order], values[order]
+        indptr = np.zeros(adj_matrix.nrows + 1, dtype=np.uint64)
+        np.cumsum(
+            np.bincount(rows.astype(np.intp), minlength=adj_matrix.nrows),
+            out=indptr[1:],
+        )
+
+        infos, blocks = [], []
+        try:
+            for array in (indptr, cols, values):
+                block, info = _create_block(array)
+                blocks.append(block)
+                infos.append(info)
+        except BaseException:
+            for block in blocks:
+                block.close()
+                block.unlink()
+            raise
+        for block in blocks:
+            block.close()
+        handle = (adj_matrix.type.__name__, adj_matrix.nrows, adj_matrix.ncols, *infos)
+        try:
+            return cls(handle, owner=True)
+        except BaseException:
+            # блоки, которые конструктор не успел открыть, удаляются здесь
+            for info in infos:
+                try:
+                    block = shared_memory.SharedMemory(name=info.name)
+                except FileNotFoundError:
+                    continue
+                block.close()
+                block.unlink()
+            raise
+
+    @classmethod
+    def attach(cls, handle: Tuple) -> "SharedCSR":
+        """
+        Открывает блоки, созданные export в другом процессе
+
+        Parameters
+        ----------
+        handle: Tuple
+            Значение SharedCSR.handle процесса-владельца
+
+        Returns
+        -------
+        shared: SharedCSR
+            Матрица, массивы которой отображены на разделяемую память
+        """
+        return cls(handle)
+
+    def to_matrix(self) -> pgb.Matrix:
+        """
+        Строит матрицу GraphBLAS по массивам CSR одним вызовом GrB_Matrix_build.
+        GraphBLAS хранит собственную копию данных, разделяемая память только читается
+
+        Returns
+        -------
+        adj_matrix: Matrix
+            Матрица
+        """
+        rows = np.repeat(
+            np.arange(self.nrows, dtype=np.uint64), np.diff(self.indptr).astype(np.intp)
+        )
+        return matrix_from_arrays(
+            rows, self.indices, self.values, self.nrows, self.ncols, typ=self.typ
+        )
+
+    def close(self):
+        """
+        Закрывает блоки в текущем процессе, а владелец ещё и удаляет их.
+        Массивы, полученные из этого объекта, должны быть к этому моменту удалены
+        """
+        self.indptr = self.indices = self.values = None
+        for block in self._blocks:
+            block.close()
+            if self._owner:
+                try:
+                    block.unlink()
+                except FileNotFoundError:
+                    # блок уже удалён, например при ошибке в другом объекте
+                    pass
+        self._blocks.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open(self, info: SharedArrayInfo) -> np.ndarray:
+        block = shared_memory.SharedMemory(name=info.name)
+        self._blocks.append(block)
+        return np.ndarray(info.shape, dtype=info.dtype, buffer=block.buf)
+
+
+class SharedMatrixPool:
+    """
+    Пул процессов для задач вида kernel(adj_matrix, *args) над одним графом.
+    Матрица один раз экспортируется в разделяемую память (SharedCSR), и каждый процесс
+    при запуске один раз строит по ней собственную полную матрицу GraphBLAS
+    (память под граф нужна в каждом процессе), так что через очередь задач
+    передаются только аргументы задач.
+
+    Пул работает, пока не вызван close (или до выхода из with).
+
+    Parameters
+    ----------
+    adj_matrix: Matrix
+        Матрица смежности
+    processes: Optional[int]
+        Число процессов. По умолчанию число процессоров
+    """
+
+    def __init__(self, adj_matrix: pgb.Matrix, processes: Optional[int] = None):
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if processes <= 0:
+            raise ValueError("Число процессов должно быть положительным")
+        self.processes = processes
+        self._shared = SharedCSR.export(adj_matrix)
+        try:
+            self._executor = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self._shared.handle,),
+            )
+        except BaseException:
+            self._shared.close()
+            raise
+
+    def submit(self, kernel: Callable, *args) -> Future:
+        """
+        Ставит в очередь задачу kernel(adj_matrix, *args)
+
+        Parameters
+        ----------
+        kernel: Callable
+            Функция уровня модуля (её передают в процессы по имени)
+        args:
+            Остальные аргументы kernel
+
+        Returns
+        -------
+        future: Future
+            Результат задачи
+        """
+        return self._executor.submit(_call_kernel, kernel, *args)
+
+    def close(self):
+        """
+        Дожидается завершения задач, останавливает процессы и удаляет разделяемую память
+        """
+        try:
+            self._executor.shutdown()
+        finally:
+            self._shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_sources_parallel(
+    adj_matrix: pgb.Matrix,
+    start_vertices: Sequence[int],
+    kernel: Callable[[pgb.Matrix, List[int]], np.ndarray],
+    dtype,
+    processes: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Запускает алгоритм от нескольких стартовых вершин в пуле SharedMatrixPool.
+    Строки результата пишутся процессами прямо в общий плотный массив
+    в разделяемой памяти, так что через очередь задач передаются
+    только номера стартовых вершин.
+
+    Parameters
+    ----------
+    adj_matrix: Matrix
+        Матрица смежности
+    start_vertices: Sequence[int]
+        Стартовые вершины
+    kernel: Callable[[Matrix, List[int]], np.ndarray]
+        Функция уровня модуля (её передают в процессы по имени), возвращающая
+        плотный массив k x n результатов для пакета из k стартовых вершин
+    dtype:
+        Тип элементов результата
+    processes: Optional[int]
+        Число процессов. По умолчанию число процессоров
+    batch_size: Optional[int]
+        Число стартовых вершин в одной задаче. По умолчанию вершины делятся
+        поровну на 4 * processes задачи
+
+    Returns
+    -------
+    result: np.ndarray
+        Массив len(start_vertices) x n, i-я строка которого - результат для i-й вершины
+    """
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if processes <= 0:
+        raise ValueError("Число процессов должно быть положительным")
+    if batch_size is None:
+        batch_size = max(1, -(-len(start_vertices) // (4 * processes)))
+    if batch_size <= 0:
+        raise ValueError("Размер пакета должен быть положительным")
+
+    shape = (len(start_vertices), adj_matrix.ncols)
+    dtype = np.dtype(dtype)
+    out_block = shared_memory.SharedMemory(
+        create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize)
+    )
+    try:
+        out_info = SharedArrayInfo(out_block.name, shape, dtype.str)
+        with SharedMatrixPool(adj_matrix, processes) as pool:
+            futures = [
+                pool.submit(
+                    _write_rows,
+                    kernel,
+                    out_info,
+                    offset,
+                    list(start_vertices[offset : offset + batch_size]),
+                )
+                for offset in range(0, len(start_vertices), batch_size)
+            ]
+            for future in futures:
+                future.result()
+        return np.ndarray(shape, dtype=dtype, buffer=out_block.buf).copy()
+    finally:
+        out_block.close()
+        out_block.unlink()
+
+
+# состояние процесса-обработчика SharedMatrixPool: матрица и открытые
+# блоки результатов run_sources_parallel
+_worker_matrix = None
+_worker_outputs = {}
+
+
+def _init_worker(handle: Tuple):
+    global _worker_matrix
+    with SharedCSR.attach(handle) as shared:
+        _worker_matrix = shared.to_matrix()
+
+
+def _call_kernel(kernel: Callable, *args):
+    return kernel(_worker_matrix, *args)
+
+
+def _write_rows(
+    adj_matrix: pgb.Matrix,
+    kernel: Callable,
+    out_info: SharedArrayInfo,
+    offset: int,
+    start_vertices: List[int],
+):
+    if out_info.name not in _worker_outputs:
+        block = shared_memory.SharedMemory(name=out_info.name)
+        out = np.ndarray(out_info.shape, dtype=out_info.dtype, buffer=block.buf)
+        _worker_outputs[out_info.name] = (block, out)
+    _, out = _worker_outputs[out_info.name]
+    out[offset : offset + len(start_vertices)] = kernel(adj_matrix, start_vertices)
+
+
+def _create_block(
+    array: np.ndarray,
+) -> Tuple[shared_memory.SharedMemory, SharedArrayInfo]:
+    # блок нулевого размера создать нельзя, поэтому выделяется хотя бы один байт
+    block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, SharedArrayInfo(block.name, array.shape, array.dtype.str)
@@ -1,7 +1,20 @@
+import math
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
 import pygraphblas as pgb
 
+from project.bulk import check_output, vector_to_dense
+from project.diagonal import min_plus_step
+
 
-def bellman_ford(adj_matrix: pgb.Matrix, start_vertex: int):
+def bellman_ford(
+    adj_matrix: pgb.Matrix,
+    start_vertex: int,
+    output: str = "list",
+    early_stop: bool = True,
+    return_iterations: bool = False,
+) -> Union[List[float], np.ndarray, Tuple[Union[List[float], np.ndarray], int]]:
     """
     Алгоритм Бэлмана-Форда поиска кратчайших путей в графе из единственной стартовой вершины.
 
@@ -11,6 +24,15 @@ def bellman_ford(adj_matrix: pgb.Matrix, start_vertex: int):
         Матрица смежности данного графа
     start_vertex: int
         Вершина с которой начинаем обход в ширину
+    output: str
+        Формат результата: "list" - список Python, "numpy" - одномерный массив float64
+    early_stop: bool
+        Остановиться, как только очередная итерация не изменила ни одного расстояния.
+        В этом случае отрицательных циклов, достижимых из стартовой вершины, нет,
+        и дополнительная проверка на них не выполняется.
+        Если False, всегда выполняется n - 1 итерация и проверка на отрицательные циклы.
+    return_iterations: bool
+        Вернуть вместе с расстояниями число выполненных итераций релаксации
 
     Raises
     ------
@@ -19,39 +41,175 @@ def bellman_ford(adj_matrix: pgb.Matrix, start_vertex: int):
 
     Returns
     -------
-    distances: List[int]
+    distances: Union[List[float], np.ndarray]
         Список, где для каждой вершины указано расстояние до неё от указанной стартовой вершины.
     Если вершина не достижима, то значение соответствующей ячейки равно -1.
+    iterations: int
+        Число выполненных итераций релаксации, возвращается только если return_iterations=True
     """
-    _check_conditions(adj_matrix, start_vertex)
-    _prepare_matrix(adj_matrix)
+    check_sssp_input(adj_matrix, start_vertex)
+    check_output(output)
 
     d = pgb.Vector.sparse(pgb.types.FP64, size=adj_matrix.ncols)
     d[start_vertex] = 0
+    iterations = 0
+    converged = False
     for j in range(1, adj_matrix.ncols):
-        d.vxm(adj_matrix, semiring=pgb.semiring.MIN_PLUS_FP64, out=d)
+        iterations += 1
+        if not early_stop:
+            min_plus_step(d, adj_matrix, inplace=True)
+            continue
+
+        new_d = min_plus_step(d, adj_matrix)
+        if new_d.iseq(d):
+            converged = True
+            break
+        d = new_d
 
     # есть ли в графе отрицательные циклы?
-    if d.isne(d.vxm(adj_matrix, semiring=pgb.semiring.MIN_PLUS_FP64)):
+    if not converged and d.isne(min_plus_step(d, adj_matrix)):
         raise ValueError("В графе есть циклы отрицательного веса!")
-    else:
-        return [d.get(i, default=float("inf")) for i in range(adj_matrix.ncols)]
 
+    distances = vector_to_dense(d, fill=np.inf)
+    if output == "list":
+        distances = distances.tolist()
+    return (distances, iterations) if return_iterations else distances
 
-def _prepare_matrix(adj_matrix: pgb.Matrix):
+
+def has_negative_cycle(adj_matrix: pgb.Matrix) -> bool:
     """
-    Заполняет главную диагональ матрицы нулями
+    Проверяет, есть ли в графе цикл отрицательного веса, достижимый из какой-либо вершины.
+    Это Бэлман-Форд от фиктивной вершины, соединённой рёбрами веса 0 со всеми вершинами:
+    расстояния стартуют с нулей у всех вершин, и цикл есть, если они меняются
+    и после n итераций
 
     Parameters
     ----------
     adj_matrix: Matrix
-       Матрица смежности
+        Квадратная матрица смежности
+
+    Returns
+    -------
+    result: bool
+        True, если в графе есть цикл отрицательного веса
+    """
+    d = pgb.Vector.dense(pgb.types.FP64, adj_matrix.ncols, fill=0)
+    for _ in range(adj_matrix.ncols):
+        new_d = min_plus_step(d, adj_matrix)
+        if new_d.iseq(d):
+            return False
+        d = new_d
+    return True
+
+
+def delta_stepping(
+    adj_matrix: pgb.Matrix,
+    start_vertex: int,
+    delta: Optional[float] = None,
+    output: str = "list",
+) -> Union[List[float], np.ndarray]:
+    """
+    Алгоритм delta-stepping поиска кратчайших путей из единственной стартовой вершины
+    в графе с неотрицательными весами рёбер.
+
+    Рёбра делятся на лёгкие (вес не больше delta) и тяжёлые. Вершины обрабатываются
+    корзинами: в i-ю корзину попадают вершины с текущим расстоянием из [i * delta, (i + 1) * delta).
+    Лёгкие рёбра корзины релаксируются, пока корзина не перестанет меняться,
+    после чего один раз релаксируются тяжёлые рёбра всех её вершин.
+    Если в графе есть рёбра отрицательного веса, вычисление передаётся bellman_ford.
+
+    Parameters
+    ----------
+    adj_matrix: Matrix
+        Матрица смежности данного графа
+    start_vertex: int
+        Вершина с которой начинаем поиск
+    delta: Optional[float]
+        Ширина корзины. Если не указана, выбирается по распределению весов
+        как отношение максимального веса к средней степени вершины
+    output: str
+        Формат результата: "list" - список Python, "numpy" - одномерный массив float64
+
+    Raises
+    ------
+    ValueError
+        Если delta не положительна или если в графе есть цикл с отрицательным весом
+
+    Returns
+    -------
+    distances: Union[List[float], np.ndarray]
+        Список, где для каждой вершины указано расстояние до неё от указанной стартовой вершины.
+        Если вершина не достижима, то значение соответствующей ячейки равно inf.
+    """
+    check_sssp_input(adj_matrix, start_vertex)
+    check_output(output)
+    if delta is not None and delta <= 0:
+        raise ValueError("Ширина корзины delta должна быть положительной")
+
+    weights = (
+        adj_matrix
+        if adj_matrix.type == pgb.types.FP64
+        else adj_matrix.cast(pgb.types.FP64)
+    )
+    if weights.select("<0").nvals > 0:
+        return bellman_ford(adj_matrix, start_vertex, output=output)
+
+    if delta is None:
+        delta = _choose_delta(weights)
+    light = weights.select("<=", delta)
+    heavy = weights.select(">", delta)
+
+    t = pgb.Vector.dense(pgb.types.FP64, adj_matrix.ncols, fill=math.inf)
+    t[start_vertex] = 0
+    lower = 0.0
+    while lower < math.inf:
+        upper = (math.floor(lower / delta) + 1) * delta
+        if upper <= lower:
+            upper = lower + delta
+
+        frontier = t.select(">=", lower).select("<", upper)
+        while frontier.nvals > 0:
+            requests = frontier.vxm(light, semiring=pgb.semiring.MIN_PLUS_FP64)
+            improved = requests.emult(t, pgb.types.FP64.LT)
+            t.assign(requests, mask=improved)
+            frontier = requests.select("<", upper, mask=improved)
+
+        bucket = t.select(">=", lower).select("<", upper)
+        requests = bucket.vxm(heavy, semiring=pgb.semiring.MIN_PLUS_FP64)
+        improved = requests.emult(t, pgb.types.FP64.LT)
+        t.assign(requests, mask=improved)
+
+        lower = t.select(">=", upper).reduce_float(pgb.types.FP64.MIN_MONOID)
+
+    distances = vector_to_dense(t, fill=np.inf)
+    return distances if output == "numpy" else distances.tolist()
+
+
+def _choose_delta(weights: pgb.Matrix) -> float:
+    """
+    Выбирает ширину корзины для delta_stepping: максимальный вес ребра,
+    делённый на среднюю степень вершины
+
+    Parameters
+    ----------
+    weights: Matrix
+       Матрица смежности с неотрицательными весами типа FP64
+
+    Returns
+    -------
+    delta: float
+        Положительная ширина корзины
     """
-    for i in range(adj_matrix.ncols):
-        adj_matrix[i, i] = 0
+    if weights.nvals == 0:
+        return 1.0
+    max_weight = weights.reduce_float(pgb.types.FP64.MAX_MONOID)
+    if max_weight <= 0:
+        return 1.0
+    average_degree = weights.nvals / weights.nrows
+    return max_weight / max(average_degree, 1.0)
 
 
-def _check_conditions(adjacency_matrix: pgb.Matrix, start_vertex: int):
+def check_sssp_input(adjacency_matrix: pgb.Matrix, start_vertex: int):
     """
     Проверяет, что матрица смежности графа квадратная,
     номер стартовый вершины находится в диапазоне от 0 до числа вершин
@@ -1,95 +1,608 @@
 import heapq
 import itertools
-from typing import Dict, Hashable
+import time
+from enum import Enum
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
 import networkx as nx
-from boltons.queueutils import HeapPriorityQueue
+import numpy as np
+import pygraphblas as pgb
 
+from project.bulk import (
+    check_output,
+    extract_matrix,
+    extract_vector,
+    matrix_from_arrays,
+    vector_to_dense,
+)
+from project.csr import CSRGraph, dijkstra_csr
+from project.runtime_config import runtime_descriptor
+from project.sssp import check_sssp_input
 
-def dijkstra(graph: nx.DiGraph, start_vertex) -> Dict[Hashable, int]:
-    if graph.number_of_nodes() == 0:
-        raise Exception("Передан граф без вершин")
-    if start_vertex not in graph.nodes:
-        raise Exception("Неверно указана стартовая вершина")
-
-    d = {v: float("inf") for v in graph.nodes}
-    d[start_vertex] = 0
-    q = [(0, start_vertex)]
-
-    while q:
-        # из ещё не посещённых вершин выбирается вершина u, имеющая минимальную метку.
-        distance, u = heapq.heappop(q)
-        # рассматриваем всевозможные маршруты, в которых u является предпоследним пунктом.
-        for v in graph.successors(u):
-            # +1 т.к. граф не взвешенный
-            if d[u] + 1 < d[v]:
-                d[v] = d[u] + 1
-                heapq.heappush(q, (d[v], v))
+Edge = Tuple[Hashable, Hashable]
+WeightedEdge = Tuple[Hashable, Hashable, float]
+
+# вес ребра, у которого нет атрибута с весом (как в networkx)
+DEFAULT_WEIGHT = 1
+
+# порог DynamicSSSP до накопления статистики: на графах из project.bench с 10^4 вершин
+# полный пересчёт выгоднее, когда изменено около 20% рёбер, а сумма степеней
+# концов изменённых рёбер примерно в 1.5 раза больше числа рёбер
+_DEFAULT_RECOMPUTE_THRESHOLD = 1.5
+
+
+def dijkstra(
+    graph: Union[nx.DiGraph, CSRGraph], start_vertex, weight: str = "weight"
+) -> Dict[Hashable, int]:
+    # граф networkx каждый раз преобразуется в CSR, поэтому для серии запусков
+    # выгоднее один раз построить CSRGraph и передавать его
+    d, _ = _shortest_path_tree(graph, start_vertex, weight)
     return d
 
 
+def _shortest_path_tree(
+    graph: Union[nx.DiGraph, CSRGraph], start_vertex, weight: str
+) -> Tuple[Dict[Hashable, int], Dict[Hashable, Optional[Hashable]]]:
+    csr = (
+        graph if isinstance(graph, CSRGraph) else CSRGraph.from_networkx(graph, weight)
+    )
+    if csr.n == 0:
+        raise Exception("Передан граф без вершин")
+    try:
+        start_index = csr.nodes.index(start_vertex)
+    except ValueError:
+        raise Exception("Неверно указана стартовая вершина") from None
+
+    # сам алгоритм работает с массивами CSR и целыми номерами вершин
+    d, parents = dijkstra_csr(csr, start_index, return_parents=True)
+    nodes = csr.nodes
+    return (
+        dict(zip(nodes, d.tolist())),
+        {v: nodes[p] if p >= 0 else None for v, p in zip(nodes, parents.tolist())},
+    )
+
+
+class UpdatePath(Enum):
+    # способ, которым DynamicSSSP обработал пакет изменений
+    DYNAMIC = 0
+    STATIC = 1
+
+
 class DynamicSSSP:
     # Алгоритм взят из статьи
     # An Incremental Algorithm for a Generalization of the Shortest-Path Problem
     # G. Ramalingam† and Thomas Reps‡
+    #
+    # Вместе с расстояниями хранится дерево кратчайших путей (parents).
+    # Удаление ребра или увеличение веса ребра, не входящего в дерево, ничего не меняет,
+    # а предшественники вершины просматриваются только тогда, когда её ребро дерева
+    # удалено или стало тяжелее. Веса рёбер берутся из атрибута weight и должны быть
+    # положительными: на этом основан порядок обработки затронутых вершин.
+    #
+    # Если пакет изменений затрагивает большую часть графа, расстояния выгоднее
+    # пересчитать заново. Объём работы динамического алгоритма оценивается размером
+    # пакета и суммой степеней концов изменённых рёбер. При recompute_threshold="auto" эта оценка
+    # переводится во время по средней скорости предыдущих динамических обновлений
+    # и сравнивается со временем последнего полного пересчёта (пока динамических
+    # обновлений не было, используется порог _DEFAULT_RECOMPUTE_THRESHOLD); при числовом
+    # recompute_threshold полный пересчёт выполняется, если оценка больше
+    # recompute_threshold * (число рёбер); при None - никогда.
 
-    def __init__(self, graph: nx.DiGraph, start_vertex: int):
+    def __init__(
+        self,
+        graph: nx.DiGraph,
+        start_vertex: int,
+        weight: str = "weight",
+        recompute_threshold: Union[float, str, None] = "auto",
+    ):
+        if not (
+            recompute_threshold is None
+            or recompute_threshold == "auto"
+            or (not isinstance(recompute_threshold, str) and recompute_threshold >= 0)
+        ):
+            raise ValueError(
+                'recompute_threshold должен быть неотрицательным числом, "auto" или None'
+            )
         self._graph: nx.DiGraph = graph
         self._start_vertex = start_vertex
-        self._modified_vertices = set()
-        self._d = dijkstra(graph, start_vertex)
+        self._weight = weight
+        self._recompute_threshold = recompute_threshold
+        for u, v, w in graph.edges(data=weight, default=DEFAULT_WEIGHT):
+            _check_weight(u, v, w)
+        self._last_update: Optional[UpdatePath] = None
+        # время последнего полного пересчёта и сглаженное время динамического
+        # обновления в пересчёте на единицу оценки работы
+        self._static_seconds = 0.0
+        self._dynamic_seconds_per_work: Optional[float] = None
+        self._d: Dict[Hashable, int] = {}
+        self._parents: Dict[Hashable, Optional[Hashable]] = {}
+        self._recompute()
+
+    @property
+    def last_update(self) -> Optional[UpdatePath]:
+        """
+        Способ обработки последнего пакета изменений или None, если изменений не было
+        """
+        return self._last_update
 
     def get_distances(self) -> Dict[Hashable, int]:
-        self._update()
         return self._d
 
-    def _update(self):
-        heap = HeapPriorityQueue(priority_key=lambda x: x)
-        rhs = {}
-        for u in self._modified_vertices:
-            rhs[u] = self._compute_rhs(u)
-            if rhs[u] != self._d[u]:
-                key = min(rhs[u], self._d[u])
-                heap.add(u, key)
+    def get_parents(self) -> Dict[Hashable, Optional[Hashable]]:
+        """
+        Возвращает дерево кратчайших путей: для каждой вершины - её предка в дереве
+        или None для стартовой и недостижимых вершин
+        """
+        return self._parents
 
-        while heap:
-            u = heap.pop()
-            if rhs[u] < self._d[u]:
-                self._d[u] = rhs[u]
-                for v in self._graph.successors(u):
-                    rhs[v] = self._compute_rhs(v)
-                    if rhs[v] != self._d[v]:
-                        key = min(rhs[v], self._d[v])
-                        heap.add(v, key)
-                    else:
-                        if v in heap._entry_map:
-                            heap.remove(v)
-            else:
-                self._d[u] = float("inf")
-                for v in itertools.chain(self._graph.successors(u), [u]):
-                    rhs[v] = self._compute_rhs(v)
-                    if rhs[v] != self._d[v]:
-                        key = min(rhs[v], self._d[v])
-                        heap.add(v, key)
-                    else:
-                        if v in heap._entry_map:
-                            heap.remove(v)
+    def add_edge(self, u, v, weight: float = DEFAULT_WEIGHT):
+        self.apply_updates(inserted=[(u, v, weight)])
 
     def remove_edge(self, u, v):
-        self._graph.remove_edge(u, v)
-        self._modified_vertices.add(v)
+        self.apply_updates(deleted=[(u, v)])
+
+    def set_edge_weight(self, u, v, weight: float):
+        self.apply_updates(reweighted=[(u, v, weight)])
+
+    def apply_updates(
+        self,
+        inserted: Iterable[Union[Edge, WeightedEdge]] = (),
+        deleted: Iterable[Edge] = (),
+        reweighted: Iterable[WeightedEdge] = (),
+    ) -> UpdatePath:
+        """
+        Применяет к графу пакет изменений и обновляет расстояния.
+        Сначала удаляются рёбра deleted, затем добавляются рёбра inserted
+        и меняются веса рёбер reweighted.
+        В зависимости от оценки объёма работы расстояния обновляются динамически
+        или пересчитываются заново.
+
+        Parameters
+        ----------
+        inserted: Iterable[Union[Edge, WeightedEdge]]
+            Добавляемые рёбра (u, v) или (u, v, weight). Добавление существующего ребра
+            меняет его вес
+        deleted: Iterable[Edge]
+            Удаляемые рёбра (u, v)
+        reweighted: Iterable[WeightedEdge]
+            Новые веса (u, v, weight) существующих рёбер
 
-    def add_edge(self, u, v):
-        self._graph.add_edge(u, v)
-        self._modified_vertices.add(v)
+        Returns
+        -------
+        path: UpdatePath
+            DYNAMIC, если расстояния обновлены динамически, STATIC - если пересчитаны
+        """
+        deleted = list(deleted)
+        changed = [
+            (edge[0], edge[1], edge[2] if len(edge) > 2 else DEFAULT_WEIGHT)
+            for edge in inserted
+        ]
+        for u, v, w in reweighted:
+            if not self._graph.has_edge(u, v):
+                raise ValueError(f"Ребро ({u}, {v}) отсутствует в графе")
+            changed.append((u, v, w))
+        for u, v, w in changed:
+            _check_weight(u, v, w)
 
-    def _compute_rhs(self, v):
-        if v == self._start_vertex:
-            return 0
+        invalidated = []
+        for u, v in deleted:
+            self._graph.remove_edge(u, v)
+            if self._parents[v] == u:
+                invalidated.append(v)
+        succ = self._graph.succ
+        for u, v, w in changed:
+            attributes = succ[u].get(v) if u in succ else None
+            if attributes is None:
+                self._graph.add_edge(u, v, **{self._weight: w})
+                for x in (u, v):
+                    if x not in self._d:
+                        self._d[x] = float("inf")
+                        self._parents[x] = None
+                continue
+            old_weight = attributes.get(self._weight, DEFAULT_WEIGHT)
+            attributes[self._weight] = w
+            if w > old_weight and self._parents[v] == u:
+                invalidated.append(v)
+
+        touched = {v for _, v in deleted}
+        touched.update(v for _, v, _ in changed)
+        work = len(deleted) + len(changed)
+        work += sum(degree for _, degree in self._graph.degree(touched))
+
+        if self._prefer_recompute(work):
+            self._recompute()
+            self._last_update = UpdatePath.STATIC
+        else:
+            begin = time.perf_counter()
+            self._repair(invalidated, changed)
+            self._record_dynamic(time.perf_counter() - begin, work)
+            self._last_update = UpdatePath.DYNAMIC
+        return self._last_update
+
+    def _prefer_recompute(self, work: int) -> bool:
+        if self._recompute_threshold is None or work == 0:
+            return False
+        if self._recompute_threshold == "auto":
+            if self._dynamic_seconds_per_work is None:
+                threshold = _DEFAULT_RECOMPUTE_THRESHOLD
+                return work > threshold * self._graph.number_of_edges()
+            return self._dynamic_seconds_per_work * work > self._static_seconds
+        return work > self._recompute_threshold * self._graph.number_of_edges()
+
+    def _record_dynamic(self, seconds: float, work: int):
+        if work == 0:
+            return
+        rate = seconds / work
+        if self._dynamic_seconds_per_work is None:
+            self._dynamic_seconds_per_work = rate
         else:
-            return (
-                min(
-                    (self._d[u] for u in self._graph.predecessors(v)),
-                    default=float("inf"),
-                )
-                + 1
+            self._dynamic_seconds_per_work = (
+                0.8 * self._dynamic_seconds_per_work + 0.2 * rate
+            )
+
+    def _recompute(self):
+        # словари обновляются на месте, чтобы результаты get_distances и get_parents
+        # оставались актуальными
+        begin = time.perf_counter()
+        d, parents = _shortest_path_tree(self._graph, self._start_vertex, self._weight)
+        self._d.clear()
+        self._d.update(d)
+        self._parents.clear()
+        self._parents.update(parents)
+        self._static_seconds = time.perf_counter() - begin
+
+    def _repair(self, invalidated, changed):
+        heap = []
+        counter = itertools.count()
+        for v in self._find_affected(invalidated):
+            # предшественники из затронутого множества ещё не имеют верных расстояний
+            for p, attributes in self._graph.pred[v].items():
+                w = attributes.get(self._weight, DEFAULT_WEIGHT)
+                if self._d[p] + w < self._d[v]:
+                    self._d[v] = self._d[p] + w
+                    self._parents[v] = p
+            if self._d[v] < float("inf"):
+                heapq.heappush(heap, (self._d[v], next(counter), v))
+
+        for u, v, _ in changed:
+            # вес берётся из графа: в пакете ребро могло встретиться несколько раз
+            w = self._edge_weight(u, v)
+            if self._d[u] + w < self._d[v]:
+                self._d[v] = self._d[u] + w
+                self._parents[v] = u
+                heapq.heappush(heap, (self._d[v], next(counter), v))
+
+        while heap:
+            distance, _, u = heapq.heappop(heap)
+            if distance > self._d[u]:
+                continue
+            for v, attributes in self._graph.succ[u].items():
+                w = attributes.get(self._weight, DEFAULT_WEIGHT)
+                if self._d[u] + w < self._d[v]:
+                    self._d[v] = self._d[u] + w
+                    self._parents[v] = u
+                    heapq.heappush(heap, (self._d[v], next(counter), v))
+
+    def _edge_weight(self, u, v):
+        return self._graph.succ[u][v].get(self._weight, DEFAULT_WEIGHT)
+
+    def _find_affected(self, invalidated):
+        # Вершины обрабатываются в порядке возрастания расстояния, поэтому у предшественника p
+        # с d[p] + w(p, v) == d[v] уже известно, затронут ли он (веса положительны).
+        # Если найден незатронутый такой предшественник, он становится новым предком v,
+        # иначе v и её потомки в дереве теряют расстояния.
+        # Возвращает затронутые вершины с расстояниями, сброшенными в inf.
+        counter = itertools.count()
+        queued = set(invalidated)
+        heap = [(self._d[v], next(counter), v) for v in queued]
+        heapq.heapify(heap)
+        affected = []
+        affected_set = set()
+        while heap:
+            distance, _, v = heapq.heappop(heap)
+            parent = next(
+                (
+                    p
+                    for p, attributes in self._graph.pred[v].items()
+                    if p not in affected_set
+                    and self._d[p] + attributes.get(self._weight, DEFAULT_WEIGHT)
+                    == distance
+                ),
+                None,
             )
+            if parent is not None:
+                self._parents[v] = parent
+                continue
+
+            affected.append(v)
+            affected_set.add(v)
+            for child in self._graph.successors(v):
+                if self._parents[child] == v and child not in queued:
+                    queued.add(child)
+                    heapq.heappush(heap, (self._d[child], next(counter), child))
+
+        for v in affected:
+            self._d[v] = float("inf")
+            self._parents[v] = None
+        return affected
+
+
+def _check_weight(u, v, w):
+    if not w > 0:
+        raise ValueError(f"Вес ребра ({u}, {v}) должен быть положительным: {w}")
+
+
+class MatrixDynamicSSSP:
+    # Вариант DynamicSSSP, который хранит граф в pgb.Matrix и не использует networkx.
+    # Изменения рёбер накапливаются в буфере и применяются пакетом при первом запросе
+    # результата (или явном вызове flush). Затронутые вершины - потомки концов удалённых
+    # или потяжелевших рёбер дерева кратчайших путей - находятся обходом дерева,
+    # а их расстояния восстанавливаются релаксацией фронта маскированным vxm.
+
+    def __init__(self, adj_matrix: pgb.Matrix, start_vertex: int):
+        check_sssp_input(adj_matrix, start_vertex)
+        weights = (
+            adj_matrix.dup()
+            if adj_matrix.type == pgb.types.FP64
+            else adj_matrix.cast(pgb.types.FP64)
+        )
+        if weights.select("<=", 0).nvals > 0:
+            raise ValueError("Веса рёбер должны быть положительными")
+
+        self._matrix = weights
+        self._start_vertex = start_vertex
+        self._n = adj_matrix.nrows
+        # (u, v) -> новый вес или None для удаления; повторное изменение ребра
+        # в буфере заменяет предыдущее
+        self._pending: Dict[Edge, Optional[float]] = {}
+
+        self._d = pgb.Vector.dense(pgb.types.FP64, self._n, fill=float("inf"))
+        self._d[start_vertex] = 0
+        self._parents = np.full(self._n, -1, dtype=np.int64)
+        front = pgb.Vector.sparse(pgb.types.FP64, self._n)
+        front[start_vertex] = 0
+        self._update_parents(self._relax(front))
+
+    @property
+    def matrix(self) -> pgb.Matrix:
+        self.flush()
+        return self._matrix
+
+    @property
+    def pending_updates(self) -> int:
+        return len(self._pending)
+
+    def get_distances(self, output: str = "list") -> Union[List[float], np.ndarray]:
+        """
+        Применяет накопленные изменения и возвращает расстояния от стартовой вершины
+
+        Parameters
+        ----------
+        output: str
+            Формат результата: "list" - список, "numpy" - массив float64
+
+        Returns
+        -------
+        distances: Union[List[float], np.ndarray]
+            Расстояния до вершин, для недостижимых вершин - inf
+        """
+        check_output(output)
+        self.flush()
+        distances = vector_to_dense(self._d, fill=np.inf)
+        return distances if output == "numpy" else distances.tolist()
+
+    def get_parents(self, output: str = "list") -> Union[List[int], np.ndarray]:
+        """
+        Применяет накопленные изменения и возвращает дерево кратчайших путей:
+        предка каждой вершины или -1 для стартовой и недостижимых вершин
+        """
+        check_output(output)
+        self.flush()
+        return self._parents.copy() if output == "numpy" else self._parents.tolist()
+
+    def add_edge(self, u: int, v: int, weight: float = DEFAULT_WEIGHT):
+        self.apply_updates(inserted=[(u, v, weight)], flush=False)
+
+    def remove_edge(self, u: int, v: int):
+        self.apply_updates(deleted=[(u, v)], flush=False)
+
+    def set_edge_weight(self, u: int, v: int, weight: float):
+        self.apply_updates(reweighted=[(u, v, weight)], flush=False)
+
+    def apply_updates(
+        self,
+        inserted: Iterable[Union[Edge, WeightedEdge]] = (),
+        deleted: Iterable[Edge] = (),
+        reweighted: Iterable[WeightedEdge] = (),
+        flush: bool = True,
+    ):
+        """
+        Добавляет изменения в буфер: сначала удаления deleted, затем вставки inserted
+        и новые веса reweighted. Удаление отсутствующего ребра ничего не делает,
+        вставка существующего меняет его вес. Как и в DynamicSSSP, рёбра reweighted
+        должны существовать в графе с учётом уже накопленных в буфере изменений
+
+        Parameters
+        ----------
+        inserted: Iterable[Union[Edge, WeightedEdge]]
+            Добавляемые рёбра (u, v) или (u, v, weight)
+        deleted: Iterable[Edge]
+            Удаляемые рёбра (u, v)
+        reweighted: Iterable[WeightedEdge]
+            Новые веса (u, v, weight) существующих рёбер
+        flush: bool
+            Если True, изменения сразу применяются к графу
+        """
+        deleted = list(deleted)
+        changed = [
+            (edge[0], edge[1], edge[2] if len(edge) > 2 else DEFAULT_WEIGHT)
+            for edge in inserted
+        ]
+        for u, v, w in reweighted:
+            self._check_edge(u, v)
+            if not self._has_edge(u, v):
+                raise ValueError(f"Ребро ({u}, {v}) отсутствует в графе")
+            changed.append((u, v, w))
+
+        for u, v in deleted:
+            self._check_edge(u, v)
+            self._pending[(u, v)] = None
+        for u, v, w in changed:
+            self._check_edge(u, v)
+            _check_weight(u, v, w)
+            self._pending[(u, v)] = float(w)
+        if flush:
+            self.flush()
+
+    def flush(self):
+        """
+        Применяет накопленные изменения к матрице и восстанавливает расстояния
+        """
+        if not self._pending:
+            return
+        edges = np.array(list(self._pending.keys()), dtype=np.uint64).reshape(-1, 2)
+        weights = np.array([np.nan if w is None else w for w in self._pending.values()])
+        self._pending = {}
+        is_deleted = np.isnan(weights)
+        rows, cols = edges[:, 0], edges[:, 1]
+
+        # старые веса изменяемых рёбер: удаление или увеличение веса ребра дерева
+        # делает его конец недействительным
+        changes = matrix_from_arrays(
+            rows, cols, True, self._n, self._n, typ=pgb.types.BOOL
+        )
+        old_rows, old_cols, old_weights = extract_matrix(
+            self._matrix.emult(changes, pgb.types.FP64.FIRST)
+        )
+        old = np.full(len(rows), np.nan)
+        old[_positions(rows, cols, old_rows, old_cols, self._n)] = old_weights
+        heavier = ~np.isnan(old) & (is_deleted | (weights > old))
+        invalidated = cols[heavier][
+            self._parents[cols[heavier].astype(np.intp)] == rows[heavier]
+        ]
+
+        if is_deleted.any():
+            deletions = matrix_from_arrays(
+                rows[is_deleted],
+                cols[is_deleted],
+                True,
+                self._n,
+                self._n,
+                typ=pgb.types.BOOL,
+            )
+            self._matrix.apply(
+                pgb.types.FP64.IDENTITY,
+                out=self._matrix,
+                mask=deletions.S,
+                desc=runtime_descriptor(pgb.descriptor.RSC),
+            )
+        insertions = matrix_from_arrays(
+            rows[~is_deleted],
+            cols[~is_deleted],
+            weights[~is_deleted],
+            self._n,
+            self._n,
+            typ=pgb.types.FP64,
+        )
+        self._matrix.eadd(insertions, pgb.types.FP64.SECOND, out=self._matrix)
+
+        affected = self._tree_descendants(invalidated)
+        self._d.assign_scalar(float("inf"), mask=affected.S)
+
+        # кандидаты: затронутые вершины через незатронутых предшественников
+        # и концы добавленных или полегчавших рёбер
+        requests = self._d.vxm(
+            self._matrix, semiring=pgb.semiring.MIN_PLUS_FP64, mask=affected.S
+        )
+        requests.eadd(
+            self._d.vxm(insertions, semiring=pgb.semiring.MIN_PLUS_FP64),
+            pgb.types.FP64.MIN,
+            out=requests,
+        )
+        improved = requests.emult(self._d, pgb.types.FP64.LT)
+        self._d.assign(requests, mask=improved)
+        front = requests.apply(pgb.types.FP64.IDENTITY, mask=improved)
+
+        changed = self._relax(front)
+        changed.assign_scalar(True, mask=affected.S)
+        self._update_parents(changed)
+
+    def _relax(self, front: pgb.Vector) -> pgb.Vector:
+        # релаксирует рёбра из вершин фронта, пока расстояния уменьшаются;
+        # возвращает множество вершин, расстояния которых изменились
+        changed = pgb.Vector.sparse(pgb.types.BOOL, self._n)
+        changed.assign_scalar(True, mask=front.S)
+        while front.nvals > 0:
+            requests = front.vxm(self._matrix, semiring=pgb.semiring.MIN_PLUS_FP64)
+            improved = requests.emult(self._d, pgb.types.FP64.LT)
+            self._d.assign(requests, mask=improved)
+            changed.assign_scalar(True, mask=improved)
+            front = requests.apply(pgb.types.FP64.IDENTITY, mask=improved)
+        return changed
+
+    def _tree_descendants(self, vertices: np.ndarray) -> pgb.Vector:
+        # все вершины поддеревьев дерева кратчайших путей с корнями в vertices
+        descendants = pgb.Vector.sparse(pgb.types.BOOL, self._n)
+        if len(vertices) == 0:
+            return descendants
+        children = np.flatnonzero(self._parents >= 0)
+        tree = matrix_from_arrays(
+            self._parents[children],
+            children,
+            True,
+            self._n,
+            self._n,
+            typ=pgb.types.BOOL,
+        )
+        front = pgb.Vector.sparse(pgb.types.BOOL, self._n)
+        front.assign_scalar(True, index=vertices.astype(np.uint64).tolist())
+        replace_complement = runtime_descriptor(pgb.descriptor.RC)
+        while front.nvals > 0:
+            descendants.assign_scalar(True, mask=front.S)
+            front.vxm(
+                tree,
+                out=front,
+                semiring=pgb.BOOL.ANY_PAIR,
+                mask=descendants.S,
+                desc=replace_complement,
+            )
+        return descendants
+
+    def _update_parents(self, vertices: pgb.Vector):
+        # предком изменившейся вершины v становится любой u с d[u] + w(u, v) == d[v];
+        # при положительных весах такие рёбра образуют дерево кратчайших путей
+        indices, _ = extract_vector(vertices)
+        if len(indices) == 0:
+            return
+        indices = indices.astype(np.intp)
+        self._parents[indices] = -1
+        d = vector_to_dense(self._d, fill=np.inf)
+        rows, cols, weights = extract_matrix(
+            self._matrix.extract_matrix(col_index=indices.tolist())
+        )
+        targets = indices[cols.astype(np.intp)]
+        tight = (d[rows.astype(np.intp)] + weights == d[targets]) & (
+            d[targets] < np.inf
+        )
+        tight &= targets != self._start_vertex
+        self._parents[targets[tight]] = rows[tight].astype(np.int64)
+
+    def _has_edge(self, u: int, v: int) -> bool:
+        # буфер изменений важнее ещё не обновлённой матрицы
+        if (u, v) in self._pending:
+            return self._pending[(u, v)] is not None
+        return self._matrix.get(u, v) is not None
+
+    def _check_edge(self, u: int, v: int):
+        if not (0 <= u < self._n and 0 <= v < self._n):
+            raise ValueError(
+                f"Вершины ребра ({u}, {v}) должны быть между 0 и {self._n - 1}"
+            )
+
+
+def _positions(rows, cols, sub_rows, sub_cols, n: int) -> np.ndarray:
+    # позиции рёбер (sub_rows, sub_cols) в списке рёбер (rows, cols) без повторов
+    keys = rows.astype(np.uint64) * np.uint64(n) + cols.astype(np.uint64)
+    order = np.argsort(keys)
+    sub_keys = sub_rows.astype(np.uint64) * np.uint64(n) + sub_cols.astype(np.uint64)
+    return order[np.searchsorted(keys, sub_keys, sorter=order)]
@@ -1,14 +1,28 @@
 from enum import Enum
 
+import numpy as np
 import pygraphblas as pgb
 
+from project.bulk import permute, vector_to_dense
+from project.matrix_cache import MatrixCache
+from project.runtime_config import runtime_descriptor
+
+# перенумерованные матрицы и их треугольные части, сохранённые при cache=True
+_cache = MatrixCache()
+
 
 class Algo(Enum):
     COHEN = 0
     SANDIA = 1
 
 
-def count_triangles_in_graph(adj_matrix: pgb.Matrix, algo=Algo.SANDIA):
+def count_triangles_in_graph(
+    adj_matrix: pgb.Matrix,
+    algo=Algo.SANDIA,
+    cache: bool = False,
+    reorder: bool = False,
+    validate: bool = True,
+):
     """
     Подсчитывает количество треугольников в неориентированном графе
 
@@ -18,23 +32,44 @@ def count_triangles_in_graph(adj_matrix: pgb.Matrix, algo=Algo.SANDIA):
         Матрица смежности неориентированного графа
     algo: Algo
         Используемый для вычислений алгоритм
+    cache: bool
+        Сохранить верхнюю и нижнюю треугольные части матрицы между вызовами,
+        чтобы повторный подсчёт для того же графа не выделял их заново.
+        Кэш удерживает саму матрицу, пока её запись не вытеснена
+        или не вызван clear_triangles_cache
+    reorder: bool
+        Перед подсчётом перенумеровать вершины по возрастанию степени.
+        Тогда у вершин-хабов оказываются наибольшие номера и короткие строки
+        в верхней треугольной части, что уменьшает объём работы на графах
+        с сильно неравномерным распределением степеней
+    validate: bool
+        Проверять ли матрицу (см. _check_conditions). Проверка выполняется при каждом вызове.
+        False - доверенный режим: матрица не проверяется вовсе
 
     Returns
     -------
     triangles_count: int
         Количество треугольников в графе
     """
-    _check_conditions(adj_matrix)
+    _validate(adj_matrix, validate)
+
+    if reorder:
+        if cache:
+            adj_matrix = _cache.get(
+                adj_matrix, "degree_ordered", lambda: _degree_ordered(adj_matrix)
+            )
+        else:
+            adj_matrix = _degree_ordered(adj_matrix)
 
     if algo == Algo.SANDIA:
-        U = _extract_upper_triangle_matrix(adj_matrix)
+        U = _extract_upper_triangle_matrix(adj_matrix, cache)
         # Будь внимателен, здесь маска U!
         m = U.mxm(U, cast=pgb.types.INT64, mask=U)
         return sum(m.vals)
 
     elif algo == Algo.COHEN:
-        U = _extract_upper_triangle_matrix(adj_matrix)
-        L = _extract_lower_triangle_matrix(adj_matrix)
+        U = _extract_upper_triangle_matrix(adj_matrix, cache)
+        L = _extract_lower_triangle_matrix(adj_matrix, cache)
         # А здесь маска - вся матрица смежности!
         m = L.mxm(U, cast=pgb.types.INT64, mask=adj_matrix)
         return sum(m.vals) // 2
@@ -42,27 +77,49 @@ def count_triangles_in_graph(adj_matrix: pgb.Matrix, algo=Algo.SANDIA):
         raise ValueError("Неизвестный алгоритм подсчета треугольников")
 
 
-def _extract_upper_triangle_matrix(adj_matrix: pgb.Matrix):
-    U = pgb.Matrix.sparse(
-        pgb.types.BOOL, nrows=adj_matrix.nrows, ncols=adj_matrix.ncols
-    )
-    for i, j, v in zip(adj_matrix.I, adj_matrix.J, adj_matrix.V):
-        if i < j:
-            U[i, j] = v
-    return U
+def _degree_ordered(adj_matrix: pgb.Matrix) -> pgb.Matrix:
+    """
+    Перенумеровывает вершины графа по возрастанию степени
 
+    Parameters
+    ----------
+    adj_matrix: Matrix
+       Матрица смежности неориентированного графа
 
-def _extract_lower_triangle_matrix(adj_matrix: pgb.Matrix):
-    L = pgb.Matrix.sparse(
-        pgb.types.BOOL, nrows=adj_matrix.nrows, ncols=adj_matrix.ncols
-    )
-    for i, j, v in zip(adj_matrix.I, adj_matrix.J, adj_matrix.V):
-        if i > j:
-            L[i, j] = v
-    return L
+    Returns
+    -------
+    permuted: Matrix
+        Матрица смежности того же графа, в которой вершина k - это вершина
+        с k-й по возрастанию степенью исходного графа
+    """
+    degrees = vector_to_dense(adj_matrix.out_degree(pgb.types.INT64), fill=0)
+    return permute(adj_matrix, np.argsort(degrees, kind="stable"))
+
+
+def _extract_upper_triangle_matrix(adj_matrix: pgb.Matrix, cache: bool = False):
+    # элементы строго выше главной диагонали, одна операция select (GxB_TRIU)
+    if cache:
+        return _cache.get(adj_matrix, "upper", lambda: adj_matrix.triu(1))
+    return adj_matrix.triu(1)
+
+
+def _extract_lower_triangle_matrix(adj_matrix: pgb.Matrix, cache: bool = False):
+    # элементы строго ниже главной диагонали, одна операция select (GxB_TRIL)
+    if cache:
+        return _cache.get(adj_matrix, "lower", lambda: adj_matrix.tril(-1))
+    return adj_matrix.tril(-1)
 
 
-def count_triangles_per_each_vertex(adj_matrix: pgb.Matrix):
+def clear_triangles_cache():
+    """
+    Очищает кэш перенумерованных матриц и треугольных частей матриц,
+    сохранённых при cache=True, и отпускает ссылки на сами матрицы.
+    Необходимо вызывать после любого изменения матрицы смежности на месте.
+    """
+    _cache.clear()
+
+
+def count_triangles_per_each_vertex(adj_matrix: pgb.Matrix, validate: bool = True):
     """
     Подсчитывает количество треугольников для каждой вершины неориентированного графа
 
@@ -70,18 +127,20 @@ def count_triangles_per_each_vertex(adj_matrix: pgb.Matrix):
     ----------
     adj_matrix: Matrix
        Матрица смежности неориентированного графа
+    validate: bool
+        Проверять ли матрицу, см. count_triangles_in_graph
 
     Returns
     -------
     triangles_per_vertex: List[int]
         Список в i-й позиции которого указано количество треугольников для вершины i
     """
-    _check_conditions(adj_matrix)
+    _validate(adj_matrix, validate)
 
     m = adj_matrix.mxm(adj_matrix, cast=pgb.types.INT64, mask=adj_matrix)
 
     # т.к. reduce_vector производит сложение по строкам, то транспонируем матрицу
-    v = m.reduce_vector(desc=pgb.descriptor.T0)
+    v = m.reduce_vector(desc=runtime_descriptor(pgb.descriptor.T0))
 
     return [x // 2 for x in _sparse_to_dense_vector(v).vals]
 
@@ -93,6 +152,21 @@ def _sparse_to_dense_vector(v: pgb.Vector):
     return v.dense(typ=pgb.types.INT64, size=v.size, fill=fill)
 
 
+def _validate(adj_matrix: pgb.Matrix, validate: bool):
+    """
+    Проверяет матрицу, если это требуется
+
+    Parameters
+    ----------
+    adj_matrix: Matrix
+       Матрица смежности
+    validate: bool
+       False - доверенный режим, проверка не выполняется
+    """
+    if validate:
+        _check_conditions(adj_matrix)
+
+
 def _check_conditions(adj_matrix: pgb.Matrix):
     """
     Проверяет, что матрица смежности графа квадратная,
@@ -112,14 +186,23 @@ def _check_conditions(adj_matrix: pgb.Matrix):
             f"Неправильный тип матрицы: Действительный: {adj_matrix.type}, но Ожидался: BOOL"
         )
 
-    if not adj_matrix.iseq(adj_matrix.transpose()):
+    if not _is_symmetric(adj_matrix):
         raise ValueError("Граф должен быть неориентированным")
 
-    # todo Рустам, лучше так или закоментированный код чуть ниже будет предпочтительней?
-    diag = adj_matrix.vector_diag()
-    for i in diag:
-        if i != 0:
-            raise ValueError("Граф не должен иметь петель")
-    # for i in range(adj_matrix.ncols):
-    #     if adj_matrix.get(i, i, 0) != 0:
-    #         raise ValueError("Граф не должен иметь петель")
+    if adj_matrix.diag().nvals != 0:
+        raise ValueError("Граф не должен иметь петель")
+
+
+def _is_symmetric(adj_matrix: pgb.Matrix) -> bool:
+    # одно транспонирование с дополнением маски значений: остаются элементы A^T
+    # там, где в A нет элемента или стоит False. Несимметричная пара (i, j)
+    # даёт в результате либо True, либо элемент вне структуры A,
+    # а у симметричной матрицы остаются только её собственные значения False
+    outside = adj_matrix.transpose(
+        mask=adj_matrix, desc=runtime_descriptor(pgb.descriptor.C)
+    )
+    if outside.nvals == 0:
+        return True
+    if outside.select("==", True).nvals != 0:
+        return False
+    return outside.emult(adj_matrix, pgb.types.BOOL.FIRST).nvals == outside.nvals
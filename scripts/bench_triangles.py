@@ -0,0 +1,73 @@
+import argparse
+import sys
+import timeit
+
+import networkx as nx
+import numpy as np
+
+import shared
+
+sys.path.insert(0, str(shared.ROOT))
+
+from project.bulk import matrix_from_arrays  # noqa: E402
+from project.triangles import Algo, count_triangles_in_graph  # noqa: E402
+
+
+def generate_graph(kind: str, n: int, seed: int):
+    if kind == "barabasi-albert":
+        graph = nx.barabasi_albert_graph(n, 8, seed=seed)
+    elif kind == "powerlaw-cluster":
+        graph = nx.powerlaw_cluster_graph(n, 8, 0.3, seed=seed)
+    elif kind == "erdos-renyi":
+        graph = nx.fast_gnp_random_graph(n, 16 / n, seed=seed)
+    else:
+        raise ValueError(f"Неизвестный тип графа: {kind}")
+
+    edges = np.array(graph.edges, dtype=np.uint64).reshape(-1, 2)
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    cols = np.concatenate([edges[:, 1], edges[:, 0]])
+    return matrix_from_arrays(rows, cols, True, nrows=n, ncols=n)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Сравнение SANDIA и COHEN с перенумерацией вершин по степени и без неё"
+    )
+    parser.add_argument(
+        "--kinds",
+        nargs="+",
+        default=["barabasi-albert", "powerlaw-cluster", "erdos-renyi"],
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(
+        f"{'graph':>18} {'n':>8} {'algo':>7} {'reorder':>8} {'triangles':>10} {'sec':>9}"
+    )
+    for kind in args.kinds:
+        for n in args.sizes:
+            adj_matrix = generate_graph(kind, n, args.seed)
+            for algo in Algo:
+                for reorder in (False, True):
+                    triangles = count_triangles_in_graph(
+                        adj_matrix, algo=algo, reorder=reorder
+                    )
+                    seconds = min(
+                        timeit.repeat(
+                            lambda: count_triangles_in_graph(
+                                adj_matrix, algo=algo, reorder=reorder
+                            ),
+                            number=1,
+                            repeat=args.repeat,
+                        )
+                    )
+                    print(
+                        f"{kind:>18} {n:>8} {algo.name:>7} {str(reorder):>8} "
+                        f"{triangles:>10} {seconds:>9.4f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import subprocess
+import sys
+
+import shared
+
+BENCHMARKS = shared.ROOT / "benchmarks"
+BASELINES = BENCHMARKS / "baselines"
+BASELINE_NAME = "baseline"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Замеры производительности алгоритмов из project/ (pytest-benchmark)"
+    )
+    parser.add_argument(
+        "--scale", choices=["small", "medium", "large"], default="small"
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Сохранить результаты как новую базовую линию",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=int,
+        default=25,
+        help="Допустимое замедление относительно базовой линии, "
+        "в процентах (от 0 до 99)",
+    )
+    parser.add_argument(
+        "--statistic",
+        choices=["min", "median"],
+        default="median",
+        help="Сравниваемая характеристика времени: в отличие от среднего, "
+        "минимум и медиана почти не зависят от единичных выбросов",
+    )
+    parser.add_argument("-k", dest="keyword", help="Запустить только подходящие замеры")
+    args = parser.parse_args()
+    if not 0 <= args.tolerance <= 99:
+        parser.error("--tolerance должен быть от 0 до 99")
+
+    shared.configure_python_path()
+    command = [
+        sys.executable,
+        "-m",
+        "pytest",
+        str(BENCHMARKS),
+        "-o",
+        "python_files=bench_*.py",
+        f"--bench-scale={args.scale}",
+        f"--benchmark-storage=file://{BASELINES}",
+        "--benchmark-sort=fullname",
+    ]
+    if args.keyword:
+        command += ["-k", args.keyword]
+    if args.save_baseline:
+        command.append(f"--benchmark-save={BASELINE_NAME}")
+    elif any(BASELINES.glob(f"*/*_{BASELINE_NAME}.json")):
+        # замедление больше допустимого завершает запуск с ошибкой
+        command += [
+            f"--benchmark-compare=*_{BASELINE_NAME}",
+            f"--benchmark-compare-fail={args.statistic}:{args.tolerance}%",
+        ]
+    else:
+        print("Базовая линия не найдена, запустите с --save-baseline")
+    sys.exit(subprocess.call(command))
+
+
+if __name__ == "__main__":
+    main()
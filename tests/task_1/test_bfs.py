@@ -1,7 +1,8 @@
+import numpy as np
 import pygraphblas as pgb
 import pytest
 
-from project.bfs import bfs
+from project.bfs import bfs, Direction
 
 from tests.utils import read_data_from_json, create_matrix_from_two_lists
 
@@ -23,6 +24,12 @@ def test_wrong_matrix_type(pgb_types):
         bfs(adjacency_matrix, 0)
 
 
+def test_wrong_output_format():
+    adjacency_matrix = pgb.Matrix.dense(pgb.BOOL, nrows=3, ncols=3)
+    with pytest.raises(ValueError):
+        bfs(adjacency_matrix, 0, output="dict")
+
+
 def test_wrong_start_vertex():
     adjacency_matrix = pgb.Matrix.dense(pgb.BOOL, nrows=3, ncols=3)
     with pytest.raises(ValueError):
@@ -64,8 +71,75 @@ def test_wrong_start_vertex():
         ),
     ),
 )
-def test_bfs_method(I, J, V, size, start, expected):
+@pytest.mark.parametrize("direction", list(Direction))
+def test_bfs_method(I, J, V, size, start, expected, direction):
     print("test_bfs_method")
     adj_m = create_matrix_from_two_lists(I, J, V, size)
-    actual = bfs(adj_m, start)
+    actual = bfs(adj_m, start, direction=direction)
     assert actual == expected
+
+    actual = bfs(adj_m, start, direction=direction, output="numpy")
+    assert isinstance(actual, np.ndarray)
+    assert actual.tolist() == expected
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_direction_optimizing_matches_push(seed):
+    size = 200
+    adj_m = pgb.Matrix.random(
+        pgb.BOOL, 1500, nrows=size, ncols=size, seed=seed, no_diagonal=True
+    ).pattern()
+    for start in range(0, size, 37):
+        expected = bfs(adj_m, start)
+        assert bfs(adj_m, start, direction=Direction.PULL) == expected
+        assert bfs(adj_m, start, direction=Direction.AUTO) == expected
+        assert bfs(adj_m, start, direction=Direction.AUTO, alpha=1, beta=4) == expected
+
+
+@pytest.mark.parametrize("direction", [Direction.PULL, Direction.AUTO])
+def test_bfs_after_edge_move(direction):
+    adj_m = pgb.Matrix.from_lists([0, 1], [1, 2], [True, True], nrows=4, ncols=4)
+    assert bfs(adj_m, 0, direction=direction) == [0, 1, 2, -1]
+    # перенос ребра не меняет число рёбер, но результат должен измениться
+    del adj_m[1, 2]
+    adj_m[1, 3] = True
+    assert bfs(adj_m, 0, direction=direction) == [0, 1, -1, 2]
+
+
+def test_bfs_explicit_transpose():
+    adj_m = pgb.Matrix.random(
+        pgb.BOOL, 300, nrows=50, ncols=50, seed=2, no_diagonal=True
+    ).pattern()
+    transposed = adj_m.transpose()
+    for start in range(0, 50, 7):
+        expected = bfs(adj_m, start)
+        for direction in (Direction.PULL, Direction.AUTO):
+            assert bfs(adj_m, start, direction, transposed=transposed) == expected
+    with pytest.raises(ValueError):
+        bfs(adj_m, 0, Direction.PULL, transposed=pgb.Matrix.sparse(pgb.BOOL, 3, 3))
+
+
+def test_bfs_auto_transposes_lazily(monkeypatch):
+    # путь 0 -> ... -> 9 и отдельная клика: рёбер клики так много, что AUTO
+    # ни разу не переходит к PULL и транспонированная матрица не нужна
+    path = [(u, u + 1) for u in range(9)]
+    clique = [(u, v) for u in range(10, 30) for v in range(10, 30) if u != v]
+    rows, cols = zip(*(path + clique))
+    adj_m = pgb.Matrix.from_lists(
+        list(rows), list(cols), [True] * len(rows), nrows=30, ncols=30
+    )
+    expected = list(range(10)) + [-1] * 20
+    calls = []
+    transpose = pgb.Matrix.transpose
+
+    def counted_transpose(self, *args, **kwargs):
+        # cast копирует матрицу через transpose с дескриптором T0
+        if "desc" not in kwargs:
+            calls.append(self)
+        return transpose(self, *args, **kwargs)
+
+    monkeypatch.setattr(pgb.Matrix, "transpose", counted_transpose)
+    assert bfs(adj_m, 0, Direction.AUTO) == expected
+    assert not calls
+    assert bfs(adj_m, 0, Direction.PULL) == expected
+    assert len(calls) == 1
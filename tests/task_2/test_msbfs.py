@@ -1,7 +1,15 @@
+import numpy as np
 import pygraphblas as pgb
 import pytest
 
-from project.msbfs import msbfs
+from project.bfs import bfs
+from project.msbfs import (
+    msbfs,
+    msbfs_batches,
+    msbfs_bitwise,
+    msbfs_levels,
+    msbfs_levels_parallel,
+)
 
 from tests.utils import read_data_from_json, create_matrix_from_two_lists
 
@@ -59,3 +67,141 @@ def test_msbfs_method(I, J, V, size, start_vertices, expected):
     adj_m = create_matrix_from_two_lists(I, J, V, size)
     actual = msbfs(adj_m, start_vertices)
     assert actual == expected
+
+    actual = msbfs(adj_m, start_vertices, output="numpy")
+    assert isinstance(actual, np.ndarray)
+    assert actual.shape == (len(start_vertices), size)
+    assert actual.tolist() == [parents for _, parents in expected]
+
+
+@pytest.mark.parametrize(
+    "I, J, V, size, start_vertices, expected",
+    read_data_from_json(
+        "test_msbfs",
+        lambda data: (
+            data["I"],
+            data["J"],
+            data["V"],
+            data["size"],
+            data["start_vertices"],
+            [(p["start_vertex"], p["parents"]) for p in data["expected"]],
+        ),
+    ),
+)
+@pytest.mark.parametrize(
+    "batch_size, memory_budget", [(1, None), (2, None), (None, None), (None, 1)]
+)
+def test_msbfs_batches(
+    I, J, V, size, start_vertices, expected, batch_size, memory_budget
+):
+    adj_m = create_matrix_from_two_lists(I, J, V, size)
+    batches = list(msbfs_batches(adj_m, start_vertices, batch_size, memory_budget))
+    assert [pair for _, batch in batches for pair in batch] == expected
+
+    offset = 0
+    for actual_offset, batch in batches:
+        assert actual_offset == offset
+        offset += len(batch)
+
+
+def test_msbfs_batches_in_processes():
+    adj_m = pgb.Matrix.random(
+        pgb.BOOL, 400, nrows=60, ncols=60, seed=7, no_diagonal=True
+    ).pattern()
+    start_vertices = list(range(0, 60, 3))
+    expected = msbfs(adj_m, start_vertices, output="numpy")
+    batches = msbfs_batches(
+        adj_m, start_vertices, batch_size=3, output="numpy", processes=2
+    )
+    actual = np.vstack([batch for _, batch in batches])
+    assert np.array_equal(actual, expected)
+
+
+def test_msbfs_levels_parallel():
+    adj_m = pgb.Matrix.random(
+        pgb.BOOL, 400, nrows=60, ncols=60, seed=11, no_diagonal=True
+    ).pattern()
+    start_vertices = list(range(0, 60, 2))
+    expected = msbfs_levels(adj_m, start_vertices)
+    actual = msbfs_levels_parallel(adj_m, start_vertices, processes=2, batch_size=8)
+    assert actual == expected
+
+
+def test_msbfs_batches_wrong_batch_size():
+    adj_m = pgb.Matrix.dense(pgb.BOOL, nrows=3, ncols=3)
+    with pytest.raises(ValueError):
+        list(msbfs_batches(adj_m, [0], batch_size=0))
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"start_vertices": [5]},
+        {"batch_size": 0},
+        {"memory_budget": 0},
+        {"output": "dict"},
+        {"processes": 0},
+    ],
+)
+def test_msbfs_batches_validates_on_call(kwargs):
+    # ошибка возникает при вызове, без перебора пакетов
+    adj_m = pgb.Matrix.dense(pgb.BOOL, nrows=3, ncols=3)
+    kwargs = {"start_vertices": [0], **kwargs}
+    with pytest.raises(ValueError):
+        msbfs_batches(adj_m, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "I, J, V, size, start_vertices",
+    read_data_from_json(
+        "test_msbfs",
+        lambda data: (
+            data["I"],
+            data["J"],
+            data["V"],
+            data["size"],
+            data["start_vertices"],
+        ),
+    ),
+)
+def test_msbfs_levels(I, J, V, size, start_vertices):
+    adj_m = create_matrix_from_two_lists(I, J, V, size)
+    expected = [(start, bfs(adj_m, start)) for start in start_vertices]
+    assert msbfs_levels(adj_m, start_vertices) == expected
+
+    actual = msbfs_levels(adj_m, start_vertices, output="numpy")
+    assert actual.tolist() == [levels for _, levels in expected]
+
+
+@pytest.mark.parametrize("levels_function", [msbfs_levels, msbfs_bitwise])
+def test_msbfs_levels_false_edges(levels_function):
+    adj_m = create_matrix_from_two_lists([0, 1], [1, 2], [True, False], 3)
+    assert levels_function(adj_m, [0, 1]) == [(0, [0, 1, -1]), (1, [-1, 0, -1])]
+
+
+@pytest.mark.parametrize(
+    "I, J, V, size, start_vertices",
+    read_data_from_json(
+        "test_msbfs",
+        lambda data: (
+            data["I"],
+            data["J"],
+            data["V"],
+            data["size"],
+            data["start_vertices"],
+        ),
+    ),
+)
+def test_msbfs_bitwise(I, J, V, size, start_vertices):
+    adj_m = create_matrix_from_two_lists(I, J, V, size)
+    assert msbfs_bitwise(adj_m, start_vertices) == msbfs_levels(adj_m, start_vertices)
+
+
+@pytest.mark.parametrize("n, sources", [(50, 1), (100, 64), (150, 130)])
+def test_msbfs_bitwise_many_sources(n, sources):
+    adj_m = pgb.Matrix.random(pgb.BOOL, 4 * n, nrows=n, ncols=n, seed=n).pattern()
+    start_vertices = [(i * 7) % n for i in range(sources)]
+    np.testing.assert_array_equal(
+        msbfs_bitwise(adj_m, start_vertices, output="numpy"),
+        msbfs_levels(adj_m, start_vertices, output="numpy"),
+    )
@@ -1,11 +1,13 @@
 from typing import List
 
+import pygraphblas as pgb
 import pytest
 
 from tests.utils import read_data_from_json, create_matrix_from_list_of_lists
 from project.triangles import (
     count_triangles_per_each_vertex,
     count_triangles_in_graph,
+    clear_triangles_cache,
     Algo,
 )
 
@@ -56,3 +58,70 @@ def test_cohen(matrix: List[List], expected: int):
     adj_m = create_matrix_from_list_of_lists(matrix)
     actual = count_triangles_in_graph(adj_m, algo=Algo.COHEN)
     assert actual == expected
+
+
+@pytest.mark.parametrize(
+    "matrix,  expected",
+    read_data_from_json(
+        "test_count_triangles_in_graph",
+        lambda data: (
+            data["matrix"],
+            data["expected"],
+        ),
+    ),
+)
+@pytest.mark.parametrize("algo", list(Algo))
+def test_degree_reordering(matrix: List[List], expected: int, algo):
+    adj_m = create_matrix_from_list_of_lists(matrix)
+    actual = count_triangles_in_graph(adj_m, algo=algo, reorder=True)
+    assert actual == expected
+
+
+@pytest.mark.parametrize("algo", list(Algo))
+def test_cached_triangle_parts(algo):
+    matrix = read_data_from_json("test_count_triangles_in_graph", lambda data: data)
+    for data in matrix:
+        adj_m = create_matrix_from_list_of_lists(data["matrix"])
+        for _ in range(2):
+            actual = count_triangles_in_graph(adj_m, algo=algo, cache=True)
+            assert actual == data["expected"]
+            actual = count_triangles_in_graph(
+                adj_m, algo=algo, cache=True, reorder=True
+            )
+            assert actual == data["expected"]
+    clear_triangles_cache()
+
+
+@pytest.mark.parametrize(
+    "I, J, V, nrows, ncols",
+    [
+        ([0, 1], [1, 0], [True, True], 2, 3),
+        ([0, 1], [1, 0], [1, 1], 3, 3),
+        ([0], [1], [True], 3, 3),
+        ([0, 1], [1, 0], [True, False], 3, 3),
+        ([0, 1, 2], [1, 0, 2], [True, True, False], 3, 3),
+    ],
+)
+def test_wrong_matrices(I, J, V, nrows, ncols):
+    adj_m = pgb.Matrix.from_lists(I, J, V, nrows=nrows, ncols=ncols)
+    with pytest.raises(ValueError):
+        count_triangles_in_graph(adj_m)
+    with pytest.raises(ValueError):
+        count_triangles_per_each_vertex(adj_m)
+
+
+def test_trusted_mode():
+    # петля в вершине 2 не мешает подсчёту, если проверка отключена
+    adj_m = create_matrix_from_list_of_lists([[0, 1, 1], [1, 0, 1], [1, 1, 1]])
+    with pytest.raises(ValueError):
+        count_triangles_in_graph(adj_m)
+    assert count_triangles_in_graph(adj_m, validate=False) == 1
+
+
+def test_validation_after_edit():
+    adj_m = create_matrix_from_list_of_lists([[0, 1, 1], [1, 0, 1], [1, 1, 0]])
+    assert count_triangles_in_graph(adj_m) == 1
+    # число элементов не меняется, но граф перестаёт быть неориентированным
+    adj_m[0, 1] = False
+    with pytest.raises(ValueError):
+        count_triangles_in_graph(adj_m)
@@ -1,6 +1,7 @@
-from project.apsp import floyd_warshall
+from project.apsp import floyd_warshall, blocked_apsp
 from typing import List
 
+import numpy as np
 import pytest
 
 from tests.utils import (
@@ -27,6 +28,46 @@ def test_apsp(I, J, V, size, expected):
     actual = floyd_warshall(adj_matrix)
     assert actual == expected
 
+    actual = floyd_warshall(adj_matrix, output="numpy")
+    assert isinstance(actual, np.ndarray)
+    assert actual.tolist() == [dists for _, dists in expected]
+
+
+@pytest.mark.parametrize(
+    "I, J, V, size, expected",
+    read_data_from_json(
+        "test_apsp",
+        lambda data: (
+            data["I"],
+            data["J"],
+            data["V"],
+            data["size"],
+            [(d["vertex"], [float(x) for x in d["dists"]]) for d in data["expected"]],
+        ),
+    ),
+)
+@pytest.mark.parametrize(
+    "block_size, memory_budget", [(1, None), (2, None), (100, None), (None, 64)]
+)
+def test_blocked_apsp(I, J, V, size, expected, block_size, memory_budget):
+    adj_matrix = create_matrix_from_two_lists(I, J, V, size)
+    blocks = list(blocked_apsp(adj_matrix, block_size, memory_budget))
+    assert [first_row for first_row, _ in blocks] == list(
+        range(0, size, blocks[0][1].shape[0])
+    )
+    actual = np.vstack([block for _, block in blocks])
+    assert actual.tolist() == [dists for _, dists in expected]
+
+
+def test_apsp_does_not_modify_matrix():
+    adj_matrix = create_matrix_from_two_lists([0, 1], [1, 2], [1.0, 2.0], 3)
+    original = adj_matrix.dup()
+    floyd_warshall(adj_matrix)
+    assert adj_matrix.iseq(original)
+
+    floyd_warshall(adj_matrix, inplace=True)
+    assert adj_matrix.get(0, 2) == 3.0
+
 
 @pytest.mark.parametrize(
     "I, J, V, size",
@@ -44,3 +85,22 @@ def test_apsp_neg_cycle(I, J, V, size):
     adj_m = create_matrix_from_two_lists(I, J, V, size)
     with pytest.raises(ValueError):
         floyd_warshall(adj_m)
+    with pytest.raises(ValueError):
+        list(blocked_apsp(adj_m, block_size=2))
+
+
+def test_blocked_apsp_neg_cycle_before_first_block():
+    # цикл 2 -> 3 -> 2 недостижим из вершин первого блока
+    adj_m = create_matrix_from_two_lists([0, 2, 3], [1, 3, 2], [1.0, 1.0, -2.0], 4)
+    blocks = blocked_apsp(adj_m, block_size=2)
+    with pytest.raises(ValueError):
+        next(blocks)
+
+
+def test_apsp_negative_self_loop():
+    # петля отрицательного веса - отрицательный цикл для обоих алгоритмов
+    adj_matrix = create_matrix_from_two_lists([0, 0], [0, 1], [-1.0, 2.0], 2)
+    with pytest.raises(ValueError):
+        floyd_warshall(adj_matrix)
+    with pytest.raises(ValueError):
+        next(blocked_apsp(adj_matrix))
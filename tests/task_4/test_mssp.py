@@ -1,12 +1,14 @@
 from typing import List
 
+import numpy as np
+import pygraphblas as pgb
 import pytest
 
 from tests.utils import (
     read_data_from_json,
     create_matrix_from_two_lists,
 )
-from project.mssp import mssp
+from project.mssp import mssp, mssp_parallel
 
 
 @pytest.mark.parametrize(
@@ -28,6 +30,17 @@ def test_mssp(I, J, V, size, start_vertices, expected):
     actual = mssp(adj_matrix, start_vertices)
     assert actual == expected
 
+    actual = mssp(adj_matrix, start_vertices, output="numpy")
+    assert isinstance(actual, np.ndarray)
+    assert actual.tolist() == [dists for _, dists in expected]
+
+
+def test_mssp_does_not_modify_matrix():
+    adj_m = create_matrix_from_two_lists([0, 1, 2], [1, 2, 2], [1.0, 2.0, 3.0], 3)
+    original = adj_m.dup()
+    mssp(adj_m, [0, 1])
+    assert adj_m.iseq(original)
+
 
 @pytest.mark.parametrize(
     "I, J, V, size",
@@ -45,3 +58,21 @@ def test_mssp_neg_cycle(I, J, V, size):
     adj_m = create_matrix_from_two_lists(I, J, V, size)
     with pytest.raises(ValueError):
         mssp(adj_m, [0, 1])
+
+
+def test_mssp_parallel():
+    adj_m = pgb.Matrix.random(pgb.FP64, 300, nrows=50, ncols=50, seed=3)
+    adj_m = adj_m.apply_second(pgb.FP64.PLUS, 1.0)
+    start_vertices = list(range(0, 50, 2))
+    expected = mssp(adj_m, start_vertices, output="numpy")
+    actual = mssp_parallel(
+        adj_m, start_vertices, output="numpy", processes=2, batch_size=4
+    )
+    assert np.array_equal(actual, expected)
+    assert mssp_parallel(adj_m, [1, 7], processes=1) == mssp(adj_m, [1, 7])
+
+
+def test_mssp_parallel_neg_cycle():
+    adj_m = create_matrix_from_two_lists([0, 1], [1, 0], [1.0, -2.0], 2)
+    with pytest.raises(ValueError):
+        mssp_parallel(adj_m, [0, 1], processes=1)
@@ -1,12 +1,14 @@
 from typing import List
 
+import numpy as np
+import pygraphblas as pgb
 import pytest
 
 from tests.utils import (
     read_data_from_json,
     create_matrix_from_two_lists,
 )
-from project.sssp import bellman_ford
+from project.sssp import bellman_ford, delta_stepping, has_negative_cycle
 
 
 @pytest.mark.parametrize(
@@ -28,6 +30,99 @@ def test_bellman_ford(I, J, V, size: int, start_vertex: int, expected: List[floa
     actual = bellman_ford(adj_m, start_vertex)
     assert actual == expected
 
+    actual = bellman_ford(adj_m, start_vertex, early_stop=False)
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    "I, J, V, size, start_vertex, expected",
+    read_data_from_json(
+        "test_sssp",
+        lambda data: (
+            data["I"],
+            data["J"],
+            data["V"],
+            data["size"],
+            data["start_vertex"],
+            [float(x) for x in data["expected"]],
+        ),
+    ),
+)
+@pytest.mark.parametrize("delta", [None, 0.1, 1.0, 100.0])
+def test_delta_stepping(I, J, V, size, start_vertex, expected, delta):
+    adj_m = create_matrix_from_two_lists(I, J, V, size)
+    actual = delta_stepping(adj_m, start_vertex, delta=delta)
+    assert actual == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_delta_stepping_matches_bellman_ford(seed):
+    adj_m = pgb.Matrix.random(
+        pgb.FP64, 600, nrows=100, ncols=100, seed=seed, no_diagonal=True
+    ).apply(pgb.FP64.ABS)
+    for start in range(0, 100, 17):
+        expected = bellman_ford(adj_m.dup(), start, output="numpy")
+        actual = delta_stepping(adj_m, start, output="numpy")
+        assert np.allclose(actual, expected)
+
+
+def test_delta_stepping_wrong_delta():
+    adj_m = create_matrix_from_two_lists([0], [1], [1.0], 2)
+    with pytest.raises(ValueError):
+        delta_stepping(adj_m, 0, delta=0)
+
+
+def test_bellman_ford_does_not_modify_matrix():
+    adj_m = create_matrix_from_two_lists([0, 1, 2], [1, 2, 2], [1.0, 2.0, 3.0], 3)
+    original = adj_m.dup()
+    bellman_ford(adj_m, 0)
+    assert adj_m.iseq(original)
+
+
+@pytest.mark.parametrize("early_stop", [True, False])
+def test_bellman_ford_negative_self_loop(early_stop):
+    adj_m = create_matrix_from_two_lists([0, 1], [1, 1], [1.0, -1.0], 2)
+    with pytest.raises(ValueError):
+        bellman_ford(adj_m, 0, early_stop=early_stop)
+
+
+def test_bellman_ford_early_stop():
+    size = 100
+    # путь 0 -> 1 -> 2 -> 3, остальные вершины изолированы
+    adj_m = create_matrix_from_two_lists([0, 1, 2], [1, 2, 3], [1.0, 2.0, 3.0], size)
+    actual, iterations = bellman_ford(adj_m, 0, return_iterations=True)
+    assert actual[:4] == [0.0, 1.0, 3.0, 6.0]
+    assert iterations == 4
+
+    actual, iterations = bellman_ford(
+        adj_m, 0, early_stop=False, return_iterations=True
+    )
+    assert actual[:4] == [0.0, 1.0, 3.0, 6.0]
+    assert iterations == size - 1
+
+
+@pytest.mark.parametrize(
+    "I, J, V, size, start_vertex, expected",
+    read_data_from_json(
+        "test_sssp",
+        lambda data: (
+            data["I"],
+            data["J"],
+            data["V"],
+            data["size"],
+            data["start_vertex"],
+            [float(x) for x in data["expected"]],
+        ),
+    ),
+)
+def test_bellman_ford_numpy_output(
+    I, J, V, size: int, start_vertex: int, expected: List[float]
+):
+    adj_m = create_matrix_from_two_lists(I, J, V, size)
+    actual = bellman_ford(adj_m, start_vertex, output="numpy")
+    assert isinstance(actual, np.ndarray)
+    assert actual.tolist() == expected
+
 
 @pytest.mark.parametrize(
     "I, J, V, size",
@@ -45,3 +140,14 @@ def test_bellman_ford_neg_cycle(I, J, V, size: int):
     adj_m = create_matrix_from_two_lists(I, J, V, size)
     with pytest.raises(ValueError):
         bellman_ford(adj_m, start_vertex=0)
+    with pytest.raises(ValueError):
+        bellman_ford(adj_m, start_vertex=0, early_stop=False)
+    with pytest.raises(ValueError):
+        delta_stepping(adj_m, start_vertex=0)
+
+
+def test_has_negative_cycle():
+    acyclic = create_matrix_from_two_lists([0, 1], [1, 2], [-1.0, -2.0], 3)
+    assert not has_negative_cycle(acyclic)
+    cyclic = create_matrix_from_two_lists([0, 1, 2], [1, 2, 1], [-1.0, 1.0, -2.0], 3)
+    assert has_negative_cycle(cyclic)
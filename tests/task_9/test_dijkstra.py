@@ -1,8 +1,15 @@
 import random
 
 import networkx as nx
+import pygraphblas as pgb
+import pytest
 from pygraphblas import Matrix
-from project.task_9_draft import dijkstra, DynamicSSSP
+from project.task_9_draft import (
+    dijkstra,
+    DynamicSSSP,
+    MatrixDynamicSSSP,
+    UpdatePath,
+)
 from project.sssp import bellman_ford
 
 
@@ -104,3 +111,276 @@ def test_dynamic_incremental():
 
             expected = dijkstra(modifiable_graph, 0)
             assert dynamic_sssp.get_distances() == expected
+
+
+def check_parents(graph: nx.DiGraph, dynamic_sssp: DynamicSSSP, start_vertex):
+    distances = dynamic_sssp.get_distances()
+    for v, parent in dynamic_sssp.get_parents().items():
+        if parent is None:
+            assert v == start_vertex or distances[v] == float("inf")
+        else:
+            assert graph.has_edge(parent, v)
+            weight = graph.edges[parent, v].get("weight", 1)
+            assert distances[v] == distances[parent] + weight
+
+
+def test_dynamic_batches():
+    rnd = random.Random(42)
+    for n, p in [(30, 0.1), (100, 0.03), (200, 0.02)]:
+        graph = nx.gnp_random_graph(n, p, seed=n, directed=True)
+        dynamic_sssp = DynamicSSSP(graph, 0)
+        for _ in range(20):
+            edges = list(graph.edges)
+            deleted = rnd.sample(edges, len(edges) // 10)
+            inserted = [
+                (u, v)
+                for u, v in (
+                    (rnd.randrange(n), rnd.randrange(n)) for _ in range(len(deleted))
+                )
+                if u != v
+            ]
+            dynamic_sssp.apply_updates(inserted=inserted, deleted=deleted)
+
+            assert dynamic_sssp.get_distances() == dijkstra(graph, 0)
+            check_parents(graph, dynamic_sssp, 0)
+
+
+def test_dynamic_batch_with_new_vertices():
+    graph = nx.DiGraph([(0, 1), (1, 2)])
+    dynamic_sssp = DynamicSSSP(graph, 0)
+    dynamic_sssp.apply_updates(inserted=[(2, 3), (0, 2)], deleted=[(1, 2)])
+    assert dynamic_sssp.get_distances() == {0: 0, 1: 1, 2: 1, 3: 2}
+    assert dynamic_sssp.get_parents() == {0: None, 1: 0, 2: 0, 3: 2}
+
+
+def expected_distances(graph: nx.DiGraph, start_vertex):
+    expected = {v: float("inf") for v in graph.nodes}
+    expected.update(nx.single_source_dijkstra_path_length(graph, start_vertex))
+    return expected
+
+
+def test_weighted_dijkstra():
+    for n, p in [(20, 0.2), (100, 0.05)]:
+        graph = nx.gnp_random_graph(n, p, seed=n, directed=True)
+        rnd = random.Random(n)
+        for u, v in graph.edges:
+            graph.edges[u, v]["weight"] = rnd.randint(1, 10)
+        for s in range(0, n, 7):
+            assert dijkstra(graph, s) == expected_distances(graph, s)
+
+
+def test_dynamic_weighted_batches():
+    rnd = random.Random(7)
+    for n, p in [(30, 0.1), (100, 0.04)]:
+        graph = nx.gnp_random_graph(n, p, seed=n, directed=True)
+        for u, v in graph.edges:
+            graph.edges[u, v]["weight"] = rnd.randint(1, 5)
+        dynamic_sssp = DynamicSSSP(graph, 0)
+        for _ in range(20):
+            edges = list(graph.edges)
+            deleted = rnd.sample(edges, len(edges) // 10)
+            reweighted = [
+                (u, v, rnd.randint(1, 5))
+                for u, v in rnd.sample(edges, len(edges) // 5)
+                if (u, v) not in deleted
+            ]
+            inserted = [
+                (rnd.randrange(n), rnd.randrange(n), rnd.randint(1, 5))
+                for _ in range(len(deleted))
+            ]
+            dynamic_sssp.apply_updates(
+                inserted=[(u, v, w) for u, v, w in inserted if u != v],
+                deleted=deleted,
+                reweighted=reweighted,
+            )
+
+            assert dynamic_sssp.get_distances() == expected_distances(graph, 0)
+            check_parents(graph, dynamic_sssp, 0)
+
+
+def test_dynamic_edge_weight_changes():
+    graph = nx.DiGraph()
+    graph.add_weighted_edges_from([(0, 1, 1), (1, 2, 1), (0, 2, 5)])
+    dynamic_sssp = DynamicSSSP(graph, 0)
+
+    dynamic_sssp.set_edge_weight(1, 2, 10)
+    assert dynamic_sssp.get_distances() == {0: 0, 1: 1, 2: 5}
+    assert dynamic_sssp.get_parents()[2] == 0
+
+    dynamic_sssp.set_edge_weight(0, 1, 0.5)
+    dynamic_sssp.set_edge_weight(1, 2, 1)
+    assert dynamic_sssp.get_distances() == {0: 0, 1: 0.5, 2: 1.5}
+    assert dynamic_sssp.get_parents()[2] == 1
+
+    dynamic_sssp.add_edge(0, 2, 1)
+    assert dynamic_sssp.get_distances() == {0: 0, 1: 0.5, 2: 1}
+
+
+@pytest.mark.parametrize("weight", [0, -1])
+def test_dynamic_wrong_weight(weight):
+    graph = nx.DiGraph([(0, 1)])
+    dynamic_sssp = DynamicSSSP(graph, 0)
+    with pytest.raises(ValueError):
+        dynamic_sssp.add_edge(1, 2, weight)
+    with pytest.raises(ValueError):
+        dynamic_sssp.set_edge_weight(0, 1, weight)
+    with pytest.raises(ValueError):
+        dynamic_sssp.set_edge_weight(1, 0, 1)
+
+
+def check_matrix_dynamic(dynamic_sssp: MatrixDynamicSSSP, start_vertex):
+    adj_matrix = dynamic_sssp.matrix
+    distances = dynamic_sssp.get_distances(output="numpy")
+    assert distances.tolist() == bellman_ford(adj_matrix, start_vertex)
+    parents = dynamic_sssp.get_parents(output="numpy")
+    for v, p in enumerate(parents.tolist()):
+        if p < 0:
+            assert v == start_vertex or distances[v] == float("inf")
+        else:
+            assert distances[v] == distances[p] + adj_matrix[p, v]
+
+
+@pytest.mark.parametrize("n", [10, 40, 100])
+def test_matrix_dynamic_batches(n):
+    rnd = random.Random(n)
+    adj_matrix = Matrix.random(
+        pgb.FP64, 3 * n, nrows=n, ncols=n, seed=n, no_diagonal=True
+    ).apply(pgb.FP64.ABS)
+    adj_matrix = adj_matrix.apply_second(pgb.FP64.PLUS, 1)
+    dynamic_sssp = MatrixDynamicSSSP(adj_matrix, 0)
+    check_matrix_dynamic(dynamic_sssp, 0)
+
+    for _ in range(15):
+        rows, cols, _ = dynamic_sssp.matrix.to_lists()
+        edges = list(zip(rows, cols))
+        deleted = rnd.sample(edges, len(edges) // 5)
+        inserted = [
+            (rnd.randrange(n), rnd.randrange(n), rnd.randint(1, 5))
+            for _ in range(n // 2)
+        ]
+        reweighted = [(u, v, rnd.randint(1, 5)) for u, v in rnd.sample(edges, n // 5)]
+        for u, v in deleted:
+            dynamic_sssp.remove_edge(u, v)
+        for u, v, w in inserted + reweighted:
+            dynamic_sssp.add_edge(u, v, w)
+        assert dynamic_sssp.pending_updates > 0
+
+        check_matrix_dynamic(dynamic_sssp, 0)
+        assert dynamic_sssp.pending_updates == 0
+
+
+def test_matrix_dynamic_matches_dynamic():
+    for i in range(1, 300):
+        graph = nx.DiGraph(nx.generators.atlas.graph_atlas(i))
+        if graph.number_of_edges() == 0:
+            continue
+        adj_matrix = Matrix.from_scipy_sparse(nx.adjacency_matrix(graph))
+        dynamic_sssp = MatrixDynamicSSSP(adj_matrix, 0)
+        edges = list(graph.edges)
+        random.shuffle(edges)
+        for u, v in edges:
+            graph.remove_edge(u, v)
+            dynamic_sssp.apply_updates(deleted=[(u, v)])
+            expected = dijkstra(graph, 0)
+            assert dynamic_sssp.get_distances() == [expected[v] for v in graph.nodes]
+
+
+def test_matrix_dynamic_buffer_order():
+    adj_matrix = Matrix.from_lists([0, 1], [1, 2], [1.0, 1.0], 3, 3)
+    dynamic_sssp = MatrixDynamicSSSP(adj_matrix, 0)
+    dynamic_sssp.remove_edge(1, 2)
+    dynamic_sssp.add_edge(1, 2, 3)
+    dynamic_sssp.remove_edge(0, 1)
+    dynamic_sssp.add_edge(0, 2, 5)
+    assert dynamic_sssp.pending_updates == 3
+    assert dynamic_sssp.get_distances() == [0, float("inf"), 5]
+    assert dynamic_sssp.get_parents() == [-1, -1, 0]
+
+    dynamic_sssp.add_edge(0, 1, 1)
+    assert dynamic_sssp.get_distances() == [0, 1, 4]
+    assert dynamic_sssp.get_parents() == [-1, 0, 1]
+
+
+def test_matrix_dynamic_wrong_input():
+    adj_matrix = Matrix.from_lists([0], [1], [-1.0], 2, 2)
+    with pytest.raises(ValueError):
+        MatrixDynamicSSSP(adj_matrix, 0)
+    dynamic_sssp = MatrixDynamicSSSP(Matrix.from_lists([0], [1], [1.0], 2, 2), 0)
+    with pytest.raises(ValueError):
+        dynamic_sssp.add_edge(0, 2)
+    with pytest.raises(ValueError):
+        dynamic_sssp.add_edge(0, 1, 0)
+    # как и у DynamicSSSP, вес можно изменить только у существующего ребра
+    with pytest.raises(ValueError):
+        dynamic_sssp.set_edge_weight(1, 0, 1)
+    dynamic_sssp.remove_edge(0, 1)
+    with pytest.raises(ValueError):
+        dynamic_sssp.set_edge_weight(0, 1, 2)
+    dynamic_sssp.add_edge(1, 0, 3)
+    dynamic_sssp.set_edge_weight(1, 0, 2)
+    assert dynamic_sssp.matrix.to_lists() == [[1], [0], [2.0]]
+
+
+@pytest.mark.parametrize(
+    "recompute_threshold, expected_paths",
+    [
+        (None, {UpdatePath.DYNAMIC}),
+        (0, {UpdatePath.STATIC}),
+    ],
+)
+def test_dynamic_recompute_threshold(recompute_threshold, expected_paths):
+    rnd = random.Random(3)
+    graph = nx.gnp_random_graph(150, 0.05, seed=3, directed=True)
+    dynamic_sssp = DynamicSSSP(graph, 0, recompute_threshold=recompute_threshold)
+    assert dynamic_sssp.last_update is None
+
+    paths = set()
+    for fraction in [0.01, 0.05, 0.5, 0.9, 0.01]:
+        edges = list(graph.edges)
+        deleted = rnd.sample(edges, int(len(edges) * fraction))
+        inserted = [(rnd.randrange(150), rnd.randrange(150)) for _ in deleted]
+        path = dynamic_sssp.apply_updates(
+            inserted=[(u, v) for u, v in inserted if u != v], deleted=deleted
+        )
+        assert path == dynamic_sssp.last_update
+        paths.add(path)
+
+        assert dynamic_sssp.get_distances() == dijkstra(graph, 0)
+        check_parents(graph, dynamic_sssp, 0)
+    assert paths <= expected_paths
+
+
+def test_dynamic_auto_threshold_path():
+    # до первого динамического обновления "auto" сравнивает объём работы
+    # с порогом по умолчанию, поэтому выбор пути не зависит от замеров времени
+    rnd = random.Random(4)
+    graph = nx.gnp_random_graph(150, 0.05, seed=4, directed=True)
+    edges = list(graph.edges)
+
+    small = DynamicSSSP(graph.copy(), 0)
+    assert small.apply_updates(deleted=edges[:1]) == UpdatePath.DYNAMIC
+    assert small.last_update == UpdatePath.DYNAMIC
+
+    large_graph = graph.copy()
+    large = DynamicSSSP(large_graph, 0)
+    deleted = rnd.sample(edges, int(len(edges) * 0.9))
+    inserted = [(u, v) for u, v in nx.gnp_random_graph(150, 0.05, seed=5).edges]
+    assert large.apply_updates(inserted=inserted, deleted=deleted) == (
+        UpdatePath.STATIC
+    )
+    assert large.last_update == UpdatePath.STATIC
+    assert large.get_distances() == dijkstra(large_graph, 0)
+
+
+def test_dynamic_recompute_keeps_result_objects():
+    graph = nx.DiGraph([(0, 1), (1, 2)])
+    dynamic_sssp = DynamicSSSP(graph, 0, recompute_threshold=0)
+    distances = dynamic_sssp.get_distances()
+    assert dynamic_sssp.apply_updates(deleted=[(1, 2)]) == UpdatePath.STATIC
+    assert distances == {0: 0, 1: 1, 2: float("inf")}
+
+
+@pytest.mark.parametrize("recompute_threshold", [-1, "never"])
+def test_dynamic_wrong_recompute_threshold(recompute_threshold):
+    with pytest.raises(ValueError):
+        DynamicSSSP(nx.DiGraph([(0, 1)]), 0, recompute_threshold=recompute_threshold)
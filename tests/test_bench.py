@@ -0,0 +1,96 @@
+import csv
+import json
+
+import pygraphblas as pgb
+import pytest
+
+from project.bench import (
+    ENGINES,
+    GRAPH_KINDS,
+    MATRIX_KINDS,
+    generate_graph,
+    generate_matrix,
+    generate_updates,
+    main,
+    run_sssp_dynamic,
+)
+
+
+@pytest.mark.parametrize("kind", GRAPH_KINDS)
+def test_generate_graph_is_reproducible(kind):
+    first, second = generate_graph(kind, 120, 1), generate_graph(kind, 120, 1)
+    assert sorted(first.nodes) == list(range(120))
+    assert sorted(first.edges) == sorted(second.edges)
+
+
+@pytest.mark.parametrize("scenario", ["incremental", "decremental", "mixed"])
+def test_generate_updates(scenario):
+    graph = generate_graph("barabasi-albert", 100, 1)
+    initial, inserted, deleted = generate_updates(graph, scenario, 0.2, 5)
+    assert generate_updates(graph, scenario, 0.2, 5)[1:] == (inserted, deleted)
+    assert len(inserted) + len(deleted) == int(graph.number_of_edges() * 0.2)
+    assert not any(initial.has_edge(u, v) for u, v in inserted)
+    assert all(initial.has_edge(u, v) for u, v in deleted)
+
+
+def test_run_sssp_dynamic():
+    records = run_sssp_dynamic(
+        kinds=["community"],
+        sizes=[60],
+        fractions=[0.1, 0.5],
+        engines=list(ENGINES),
+        repeat=1,
+    )
+    assert len(records) == 3 * 2 * len(ENGINES)
+    assert all(record["seconds"] >= 0 for record in records)
+
+
+def test_cli(tmp_path):
+    for fmt in ("csv", "json"):
+        path = tmp_path / f"results.{fmt}"
+        main(
+            [
+                "sssp-dynamic",
+                "--kinds",
+                "barabasi-albert",
+                "--sizes",
+                "50",
+                "--fractions",
+                "0.3",
+                "--scenarios",
+                "mixed",
+                "--repeat",
+                "1",
+                "--format",
+                fmt,
+                "--output",
+                str(path),
+            ]
+        )
+        with open(path) as f:
+            records = json.load(f) if fmt == "json" else list(csv.DictReader(f))
+        assert [record["engine"] for record in records] == [
+            "dijkstra",
+            "dynamic",
+            "bellman-ford",
+        ]
+
+
+def test_wrong_engine():
+    with pytest.raises(ValueError):
+        run_sssp_dynamic(engines=["unknown"])
+
+
+@pytest.mark.parametrize("kind", MATRIX_KINDS)
+@pytest.mark.parametrize("weighted", [False, True])
+def test_generate_matrix(kind, weighted):
+    adj_matrix = generate_matrix(kind, 400, 1, weighted=weighted, symmetric=True)
+    assert adj_matrix.square and adj_matrix.nrows <= 400
+    assert adj_matrix.type == (pgb.FP64 if weighted else pgb.BOOL)
+    assert adj_matrix.diag().nvals == 0
+    assert adj_matrix.iseq(adj_matrix.transpose())
+    assert adj_matrix.iseq(
+        generate_matrix(kind, 400, 1, weighted=weighted, symmetric=True)
+    )
+    if weighted:
+        assert adj_matrix.reduce_float(pgb.FP64.MIN_MONOID) >= 1
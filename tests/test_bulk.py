@@ -0,0 +1,105 @@
+import numpy as np
+import pygraphblas as pgb
+import pytest
+
+from project.bulk import (
+    dense_rows,
+    extract_matrix,
+    extract_vector,
+    MatrixBuilder,
+    matrix_from_arrays,
+    matrix_from_batches,
+    matrix_to_dense,
+    permute,
+    vector_to_dense,
+)
+
+
+@pytest.mark.parametrize("typ", [pgb.BOOL, pgb.INT64, pgb.FP64, pgb.UINT8])
+def test_extract_matrix(typ):
+    m = pgb.Matrix.from_lists([0, 1, 2, 2], [1, 2, 0, 2], [1, 1, 0, 1], typ=typ)
+    rows, cols, values = extract_matrix(m)
+    assert [rows.tolist(), cols.tolist(), values.tolist()] == m.to_lists()
+
+
+def test_extract_empty():
+    v = pgb.Vector.sparse(pgb.INT64, 5)
+    indices, values = extract_vector(v)
+    assert indices.size == 0 and values.size == 0
+    assert vector_to_dense(v, fill=-1).tolist() == [-1] * 5
+
+
+def test_vector_to_dense():
+    v = pgb.Vector.from_lists([1, 3], [2.5, -1.0], size=5)
+    actual = vector_to_dense(v, fill=np.inf)
+    assert actual.tolist() == [np.inf, 2.5, np.inf, -1.0, np.inf]
+
+
+def test_matrix_to_dense():
+    m = pgb.Matrix.from_lists([0, 2], [1, 0], [7, 9], nrows=3, ncols=2)
+    actual = matrix_to_dense(m, fill=-2)
+    assert actual.dtype == np.int64
+    assert actual.tolist() == [[-2, 7], [-2, -2], [9, -2]]
+
+
+def test_dense_rows():
+    m = pgb.Matrix.from_lists([0, 1], [1, 1], [1.5, 2.0], nrows=3, ncols=2)
+    assert dense_rows(m, fill=np.inf) == [[np.inf, 1.5], [np.inf, 2.0], [np.inf] * 2]
+
+
+def test_matrix_from_arrays():
+    m = matrix_from_arrays([0, 1, 1], [1, 2, 2], [1.5, 2.0, 3.0], nrows=3, ncols=3)
+    assert m.type == pgb.FP64
+    assert m.to_lists() == [[0, 1], [1, 2], [1.5, 3.0]]
+
+    m = matrix_from_arrays(
+        [0, 1, 1], [1, 2, 2], [1, 2, 3], nrows=3, ncols=3, dup_op=pgb.INT64.PLUS
+    )
+    assert m.to_lists() == [[0, 1], [1, 2], [1, 5]]
+
+    m = matrix_from_arrays([0, 2], [2, 0], True, nrows=3, ncols=3)
+    assert m.type == pgb.BOOL and m.nvals == 2
+
+
+def test_permute():
+    m = pgb.Matrix.from_lists([0, 1], [1, 2], [1, 2], nrows=3, ncols=3)
+    permuted = permute(m, [2, 0, 1])
+    assert permuted.to_lists() == [[1, 2], [2, 0], [1, 2]]
+
+
+@pytest.mark.parametrize("flush_size", [1, 3, 100])
+def test_matrix_from_batches(flush_size):
+    rng = np.random.default_rng(7)
+    rows = rng.integers(0, 20, 200)
+    cols = rng.integers(0, 30, 200)
+    values = rng.integers(1, 10, 200)
+    batches = [
+        (rows[i : i + 17], cols[i : i + 17], values[i : i + 17])
+        for i in range(0, 200, 17)
+    ]
+    for dup_op in (None, pgb.INT64.PLUS, pgb.INT64.FIRST):
+        expected = matrix_from_arrays(rows, cols, values, 20, 30, dup_op=dup_op)
+        m = matrix_from_batches(
+            iter(batches), 20, 30, dup_op=dup_op, flush_size=flush_size
+        )
+        assert m.type == pgb.INT64
+        assert m.iseq(expected)
+
+
+def test_matrix_builder():
+    builder = MatrixBuilder(3, 3, pgb.BOOL, flush_size=4)
+    rows = np.array([0, 1, 2])
+    builder.add(rows, [1, 2, 0])
+    assert builder.pending == 3
+    # буфер копирует пакет, поэтому источник может его переиспользовать
+    rows[:] = 2
+    builder.add([1, 1], [1, 2])
+    assert builder.pending == 1
+    builder.add([], [])
+    m = builder.build()
+    assert m.to_lists() == [[0, 1, 1, 2], [1, 1, 2, 0], [True] * 4]
+    assert MatrixBuilder(2, 2).build().nvals == 0
+    with pytest.raises(ValueError):
+        builder.add([3], [0])
+    with pytest.raises(ValueError):
+        builder.add([0, 1], [0])
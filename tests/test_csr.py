@@ -0,0 +1,91 @@
+import networkx as nx
+import numpy as np
+import pygraphblas as pgb
+import pytest
+
+from project.bulk import matrix_from_arrays
+from project.csr import CSRGraph, dijkstra_csr
+from project.sssp import bellman_ford
+from project.task_9_draft import dijkstra
+
+
+def test_from_arrays():
+    graph = CSRGraph.from_arrays([2, 0, 0, 0], [1, 2, 1, 2], [1.0, 5.0, 2.0, 3.0], 3)
+    assert graph.indptr.tolist() == [0, 2, 2, 3]
+    assert graph.indices.tolist() == [1, 2, 1]
+    # из кратных рёбер 0 -> 2 остаётся самое лёгкое
+    assert graph.weights.tolist() == [2.0, 3.0, 1.0]
+    assert graph.nodes == [0, 1, 2]
+
+
+def test_multi_edges_take_min():
+    rows, cols, weights = [0, 0, 0, 1], [1, 1, 1, 2], [3.0, 1.0, 2.0, 1.0]
+    m = matrix_from_arrays(
+        np.array(rows), np.array(cols), np.array(weights), 3, 3, dup_op=pgb.FP64.MIN
+    )
+    expected = bellman_ford(m, 0)
+    assert expected == [0, 1.0, 2.0]
+    assert dijkstra_csr(CSRGraph.from_arrays(rows, cols, weights, 3), 0).tolist() == (
+        expected
+    )
+    # граф с кратными рёбрами, переданный в конструктор как есть
+    graph = CSRGraph([0, 3, 4, 4], [1, 1, 1, 2], weights)
+    distances, parents = dijkstra_csr(graph, 0, return_parents=True)
+    assert distances.tolist() == expected
+    assert parents.tolist() == [-1, 0, 1]
+
+
+def test_from_networkx():
+    g = nx.DiGraph()
+    g.add_edge("a", "b", weight=2)
+    g.add_edge("b", "c")
+    g.add_node("d")
+    graph = CSRGraph.from_networkx(g)
+    assert graph.nodes == ["a", "b", "c", "d"]
+    assert graph.indptr.tolist() == [0, 1, 2, 2, 2]
+    assert graph.indices.tolist() == [1, 2]
+    assert graph.weights.tolist() == [2.0, 1.0]
+    assert dijkstra_csr(graph, 0).tolist() == [0, 2, 3, np.inf]
+    assert (
+        dijkstra(graph, "b")
+        == dijkstra(g, "b")
+        == {
+            "a": np.inf,
+            "b": 0,
+            "c": 1,
+            "d": np.inf,
+        }
+    )
+
+
+def test_from_bool_matrix():
+    m = pgb.Matrix.from_lists([0, 1, 2], [1, 2, 0], [True, False, True], 3, 3)
+    graph = CSRGraph.from_matrix(m)
+    assert graph.indices.tolist() == [1, 0]
+    assert graph.weights.tolist() == [1.0, 1.0]
+
+
+@pytest.mark.parametrize("n", [10, 50, 200])
+def test_dijkstra_csr_matches_bellman_ford(n):
+    m = pgb.Matrix.random(
+        pgb.INT64, 4 * n, nrows=n, ncols=n, seed=n, make_pattern=False
+    )
+    m = m.apply(pgb.INT64.ABS).select("!=", 0)
+    graph = CSRGraph.from_matrix(m)
+    for start in range(0, n, max(n // 5, 1)):
+        distances, parents = dijkstra_csr(graph, start, return_parents=True)
+        assert distances.tolist() == bellman_ford(m, start)
+
+        reached = parents >= 0
+        for v, p in zip(np.flatnonzero(reached), parents[reached]):
+            assert distances[v] == distances[p] + m[int(p), int(v)]
+
+
+def test_dijkstra_csr_wrong_input():
+    graph = CSRGraph.from_arrays([0], [1], [-1.0], 2)
+    with pytest.raises(ValueError):
+        dijkstra_csr(graph, 0)
+    with pytest.raises(ValueError):
+        dijkstra_csr(graph, 2)
+    with pytest.raises(ValueError):
+        CSRGraph([0, 2], [1], [1.0])
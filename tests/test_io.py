@@ -0,0 +1,163 @@
+import json
+import os
+
+import numpy as np
+import pygraphblas as pgb
+import pytest
+
+from project.bulk import matrix_to_dense
+from project.io import (
+    load_csr_cache,
+    load_graph,
+    read_edge_list,
+    read_matrix_market,
+    save_csr_cache,
+)
+
+
+def write(path, text):
+    path.write_text(text)
+    return path
+
+
+def test_read_matrix_market_general(tmp_path):
+    path = write(
+        tmp_path / "a.mtx",
+        "%%MatrixMarket matrix coordinate real general\n"
+        "% комментарий\n"
+        "3 4 3\n"
+        "1 2 0.5\n"
+        "3 4 2\n"
+        "2 1 -1e1\n",
+    )
+    m = read_matrix_market(path, chunk_size=7)
+    assert m.type == pgb.FP64
+    assert (m.nrows, m.ncols) == (3, 4)
+    assert m.to_lists() == [[0, 1, 2], [1, 0, 3], [0.5, -10.0, 2.0]]
+
+
+@pytest.mark.parametrize(
+    "symmetry, expected",
+    [
+        ("symmetric", [[1, 2, 0], [2, 0, 3], [0, 3, 0]]),
+        ("skew-symmetric", [[1, -2, 0], [2, 0, -3], [0, 3, 0]]),
+    ],
+)
+def test_read_matrix_market_symmetric(tmp_path, symmetry, expected):
+    path = write(
+        tmp_path / "s.mtx",
+        f"%%MatrixMarket matrix coordinate integer {symmetry}\n"
+        "3 3 3\n1 1 1\n2 1 2\n3 2 3\n",
+    )
+    m = read_matrix_market(path)
+    assert m.type == pgb.INT64
+    assert matrix_to_dense(m, fill=0).tolist() == expected
+
+
+def test_read_matrix_market_pattern(tmp_path):
+    path = write(
+        tmp_path / "p.mtx",
+        "%%MatrixMarket matrix coordinate pattern general\n2 2 2\n1 2\n2 2\n",
+    )
+    assert read_matrix_market(path).to_lists() == [[0, 1], [1, 1], [True, True]]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "%%MatrixMarket matrix array real general\n1 1\n1\n",
+        "%%MatrixMarket matrix coordinate complex general\n1 1 1\n1 1 1 0\n",
+        "%%MatrixMarket matrix coordinate real general\n2 2 2\n1 1 1\n",
+        "%%MatrixMarket matrix coordinate real general\n2 2 1\n3 1 1\n",
+        "%%MatrixMarket matrix coordinate integer general\n2 2 1\n1 x 1\n",
+        "%%MatrixMarket matrix coordinate real general\n% нет размеров\n",
+        "%%MatrixMarket matrix coordinate real general\n3 3 2\n1 2\n1 3 1 1\n",
+    ],
+)
+def test_read_matrix_market_invalid(tmp_path, text):
+    with pytest.raises(ValueError):
+        read_matrix_market(write(tmp_path / "bad.mtx", text))
+
+
+def test_read_edge_list(tmp_path):
+    path = write(tmp_path / "g.txt", "# u v\n0 1\n\n1 2\n# конец\n2 0\n2 0\n")
+    m = read_edge_list(path, chunk_size=5)
+    assert m.type == pgb.BOOL
+    assert m.nrows == m.ncols == 3
+    assert m.to_lists() == [[0, 1, 2], [1, 2, 0], [True] * 3]
+    assert read_edge_list(path, n=5).nrows == 5
+
+
+@pytest.mark.parametrize("chunk_size", [4, 1024])
+def test_read_edge_list_row_width(tmp_path, chunk_size):
+    # общее число чисел делится на 2, но строки разной длины
+    path = write(tmp_path / "g.txt", "0 1\n1 2 3\n\n  \n2 0 1\n")
+    with pytest.raises(ValueError):
+        read_edge_list(path, chunk_size=chunk_size)
+
+
+def test_read_edge_list_weighted(tmp_path):
+    path = write(tmp_path / "w.csv", "1,2,0.5\n2,3,1.5\n1,2,2\n")
+    m = read_edge_list(path, one_based=True, delimiter=",", dup_op=pgb.FP64.MIN)
+    assert m.type == pgb.FP64
+    assert m.to_lists() == [[0, 1], [1, 2], [0.5, 1.5]]
+    last = read_edge_list(path, one_based=True, delimiter=",", typ=pgb.INT64)
+    assert last.to_lists() == [[0, 1], [1, 2], [2, 1]]
+
+
+def test_read_edge_list_empty(tmp_path):
+    m = read_edge_list(write(tmp_path / "e.txt", "# пусто\n"))
+    assert (m.nrows, m.nvals) == (0, 0)
+
+
+def test_csr_cache_roundtrip(tmp_path):
+    m = pgb.Matrix.from_lists([2, 0, 0], [1, 2, 0], [3.0, 1.0, 2.0], nrows=4, ncols=3)
+    save_csr_cache(m, tmp_path / "cache")
+    indptr, indices, values, meta = load_csr_cache(tmp_path / "cache")
+    assert isinstance(indptr, np.memmap)
+    assert indptr.tolist() == [0, 2, 2, 3, 3]
+    assert indices.tolist() == [0, 2, 1]
+    assert values.tolist() == [2.0, 1.0, 3.0]
+    assert (meta["type"], meta["nrows"], meta["ncols"]) == ("FP64", 4, 3)
+
+
+def test_load_graph_uses_cache(tmp_path):
+    path = write(tmp_path / "g.txt", "0 1 1\n1 2 2\n")
+    first = load_graph(path)
+    assert (tmp_path / "g.txt.csr" / "meta.json").exists()
+    second = load_graph(path)
+    assert second.iseq(first)
+
+    # кэш не используется, если файл изменился
+    write(path, "0 1 1\n1 2 2\n2 3 3\n")
+    os.utime(path, ns=(0, 0))
+    assert load_graph(path).nvals == 3
+    assert load_graph(path).nvals == 3
+
+    # и если изменились параметры чтения
+    weighted = load_graph(path, n=5, typ=pgb.INT64)
+    assert (weighted.nrows, weighted.type) == (5, pgb.INT64)
+    assert load_graph(path, n=5, typ=pgb.INT64).iseq(weighted)
+    assert load_graph(path, cache=False).nrows == 4
+
+    # размер блока не влияет на результат и не сбрасывает кэш
+    load_graph(path, chunk_size=4)
+    with open(tmp_path / "g.txt.csr" / "meta.json") as f:
+        assert json.load(f)["source"]["options"] == {}
+
+
+def test_load_graph_mtx_cache_dir(tmp_path):
+    path = write(
+        tmp_path / "a.mtx",
+        "%%MatrixMarket matrix coordinate pattern symmetric\n3 3 2\n2 1\n3 2\n",
+    )
+    first = load_graph(path, cache_dir=tmp_path / "cache")
+    cached = load_graph(path, cache_dir=tmp_path / "cache")
+    assert cached.type == pgb.BOOL
+    assert cached.iseq(first)
+    assert cached.nvals == 4
+
+
+def test_load_graph_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        load_graph(write(tmp_path / "g.txt", "0 1\n"), fmt="graphml")
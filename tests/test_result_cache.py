@@ -0,0 +1,172 @@
+import inspect
+
+import numpy as np
+import pygraphblas as pgb
+import pytest
+
+from project.bfs import Direction, bfs
+from project.mssp import mssp
+from project.result_cache import ResultCache, graph_fingerprint
+from project.sssp import bellman_ford
+
+
+def make_graph():
+    return pgb.Matrix.from_lists(
+        [0, 0, 1, 2, 3], [1, 2, 3, 3, 4], [1.0, 4.0, 1.0, 1.0, 2.0], nrows=5, ncols=5
+    )
+
+
+def test_wrappers_keep_signatures():
+    cache = ResultCache()
+    for func in (bfs, bellman_ford, mssp):
+        assert inspect.signature(cache.wrap(func)) == inspect.signature(func)
+
+
+def test_fingerprint():
+    m = make_graph()
+    assert graph_fingerprint(m) == graph_fingerprint(make_graph())
+    assert graph_fingerprint(m) != graph_fingerprint(m.cast(pgb.INT64))
+    changed = make_graph()
+    changed[0, 1] = 2.0
+    assert graph_fingerprint(m) != graph_fingerprint(changed)
+
+
+def test_cached_results():
+    cache = ResultCache()
+    calls = []
+
+    def counted(adj_matrix, start_vertex, output="list"):
+        calls.append(start_vertex)
+        return bellman_ford(adj_matrix, start_vertex, output=output)
+
+    cached = cache.wrap(counted)
+    m = make_graph()
+    expected = bellman_ford(m, 0)
+    assert cached(m, 0) == expected
+    result = cached(make_graph(), start_vertex=0, output="list")
+    assert result == expected
+    assert calls == [0]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # изменение результата вызывающим кодом не портит кэш
+    result[0] = -1
+    assert cached(m, 0) == expected
+    assert isinstance(cached(m, 0, output="numpy"), np.ndarray)
+    assert calls == [0, 0]
+
+
+def test_graph_change_invalidates():
+    cache = ResultCache()
+    cached = cache.wrap(bellman_ford)
+    m = make_graph()
+    assert cached(m, 0)[4] == 4.0
+    # отпечаток известной матрицы не пересчитывается, пока не вызван invalidate
+    m[0, 4] = 1.0
+    assert cached(m, 0)[4] == 4.0
+    cache.invalidate(m)
+    assert cached(m, 0)[4] == 1.0
+    m[0, 4] = 0.5
+    cache.invalidate(m)
+    assert cached(m, 0)[4] == 0.5
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_fingerprint_remembered(monkeypatch):
+    cache = ResultCache(max_graphs=1)
+    first, second = make_graph(), make_graph()
+    calls = []
+    monkeypatch.setattr(
+        "project.result_cache.graph_fingerprint",
+        lambda m: calls.append(m) or graph_fingerprint(m),
+    )
+    cache.fingerprint(first)
+    cache.fingerprint(first)
+    assert len(calls) == 1
+    # запоминается только последняя матрица
+    cache.fingerprint(second)
+    cache.fingerprint(first)
+    assert len(calls) == 3
+    cache.clear()
+    cache.fingerprint(first)
+    assert len(calls) == 4
+
+
+def test_matrix_arguments():
+    cache = ResultCache()
+    cached = cache.wrap(bfs)
+    m = make_graph().pattern()
+    expected = bfs(m, 0)
+    assert cached(m, 0, Direction.PULL, transposed=m.transpose()) == expected
+    # другой объект с тем же содержимым даёт тот же ключ
+    assert cached(m, 0, Direction.PULL, transposed=m.transpose()) == expected
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cached(m, 0, Direction.PULL) == expected
+    assert cache.misses == 2
+
+
+def test_nested_results_copied():
+    cache = ResultCache()
+    cached = cache.wrap(mssp)
+    m = make_graph()
+    result = cached(m, [0])
+    result[0][1][2] = 999
+    assert cached(m, [0]) == mssp(m, [0])
+    assert cache.hits == 1
+
+
+def test_byte_size_eviction():
+    m = make_graph()
+    size = bellman_ford(m, 0, output="numpy").nbytes
+    cache = ResultCache(max_bytes=2 * size)
+    cached = cache.wrap(bellman_ford)
+    for start in range(3):
+        cached(m, start, output="numpy")
+    assert len(cache) == 2
+    assert cache.nbytes == 2 * size
+    cached(m, 0, output="numpy")
+    assert cache.misses == 4
+
+
+def test_spill_to_disk(tmp_path):
+    m = make_graph()
+    size = bellman_ford(m, 0, output="numpy").nbytes
+    cache = ResultCache(max_bytes=size, spill_dir=tmp_path)
+    cached = cache.wrap(mssp)
+    first = cached(m, [0, 1], output="numpy")
+    cached(m, [2], output="numpy")
+    assert len(list(tmp_path.glob("*.pkl"))) == 1
+    assert np.array_equal(cached(m, [0, 1], output="numpy"), first)
+    assert cache.hits == 1
+    # загруженная запись остаётся на диске
+    assert len(list(tmp_path.glob("*.pkl"))) == 2
+
+    # записи на диске переживают пересоздание кэша
+    reopened = ResultCache(spill_dir=tmp_path)
+    reopened_mssp = reopened.wrap(mssp)
+    assert np.array_equal(
+        reopened_mssp(make_graph(), [2], output="numpy"), mssp(m, [2], output="numpy")
+    )
+    assert reopened.hits == 1
+
+    cache.clear(spill=True)
+    assert len(cache) == 0
+    assert not list(tmp_path.glob("*.pkl"))
+
+
+def test_spill_size_limit(tmp_path):
+    m = make_graph()
+    cache = ResultCache(max_bytes=1, spill_dir=tmp_path, max_spill_bytes=1)
+    cached = cache.wrap(bfs)
+    cached(m.cast(pgb.BOOL), 0)
+    assert len(cache) == 0
+    assert not list(tmp_path.glob("*.pkl"))
+
+
+def test_exceptions_not_cached():
+    cache = ResultCache()
+    cached = cache.wrap(bfs)
+    with pytest.raises(ValueError):
+        cached(make_graph(), 0)
+    assert len(cache) == 0
+    with pytest.raises(ValueError):
+        ResultCache(max_bytes=0)
@@ -0,0 +1,156 @@
+import subprocess
+import sys
+import threading
+
+import pygraphblas as pgb
+import pytest
+from pygraphblas import lib
+
+import project
+from project.bfs import bfs
+from project.runtime_config import (
+    get_runtime,
+    run_concurrently,
+    runtime,
+    runtime_descriptor,
+    set_runtime,
+)
+
+
+@pytest.fixture(autouse=True)
+def restore_runtime():
+    original = get_runtime()
+    yield
+    set_runtime(**original)
+
+
+def test_package_import_is_light():
+    code = "import sys, project; assert 'pygraphblas' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+    assert "runtime" in dir(project)
+
+
+def test_runtime_restores_options():
+    before = get_runtime()
+    with project.runtime(threads=3, chunk=1024):
+        assert get_runtime() == {"threads": 3, "chunk": 1024}
+        with runtime(threads=2):
+            assert get_runtime() == {"threads": 2, "chunk": 1024}
+        assert get_runtime()["threads"] == 3
+    assert get_runtime() == before
+
+
+def test_runtime_restores_after_exception():
+    before = get_runtime()
+    with pytest.raises(KeyError):
+        with runtime(threads=2):
+            raise KeyError
+    assert get_runtime() == before
+
+
+def test_runtime_out_of_order_exit():
+    before = get_runtime()
+    first_entered, second_entered, first_exited = (threading.Event() for _ in range(3))
+    seen = {}
+
+    def first():
+        with runtime(threads=3):
+            first_entered.set()
+            second_entered.wait()
+        first_exited.set()
+
+    def second():
+        first_entered.wait()
+        with runtime(threads=5):
+            second_entered.set()
+            first_exited.wait()
+            seen["inside"] = get_runtime()["threads"]
+
+    workers = [threading.Thread(target=first), threading.Thread(target=second)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert seen["inside"] == 5
+    assert get_runtime() == before
+
+
+def test_runtime_is_per_thread():
+    global_threads = pgb.options_get()["nthreads"]
+    entered = threading.Barrier(2)
+    seen = {}
+
+    def query(threads):
+        with runtime(threads=threads):
+            entered.wait()
+            seen[threads] = get_runtime()["threads"]
+            seen[threads, "global"] = pgb.options_get()["nthreads"]
+            entered.wait()
+
+    workers = [threading.Thread(target=query, args=(n,)) for n in (3, 5)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert seen[3] == 3 and seen[5] == 5
+    assert seen[3, "global"] == seen[5, "global"] == global_threads
+    assert get_runtime()["threads"] == global_threads
+
+
+def test_runtime_descriptor():
+    rc = pgb.descriptor.RC
+    assert runtime_descriptor(rc) is rc
+    assert runtime_descriptor() is None
+    with runtime(threads=3, chunk=1024):
+        desc = runtime_descriptor(rc)
+        assert desc[lib.GxB_DESCRIPTOR_NTHREADS] == 3
+        for field in (lib.GrB_MASK, lib.GrB_OUTP, lib.GrB_INP0):
+            assert desc[field] == rc[field]
+        # операции без явного дескриптора получают дескриптор блока
+        current = pgb.descriptor.current_desc.get()
+        assert current[lib.GxB_DESCRIPTOR_NTHREADS] == 3
+    assert pgb.descriptor.current_desc.get(None) is None
+
+
+def test_runtime_decorator_and_set_runtime():
+    @runtime(threads=2)
+    def threads():
+        return get_runtime()["threads"]
+
+    set_runtime(threads=4)
+    assert threads() == 2
+    with runtime(threads=3):
+        set_runtime(threads=6)
+        assert get_runtime()["threads"] == 3
+    assert get_runtime()["threads"] == 6
+
+
+def test_run_concurrently():
+    adj_m = pgb.Matrix.random(
+        pgb.BOOL, 300, nrows=50, ncols=50, seed=5, no_diagonal=True
+    ).pattern()
+    arguments = [(adj_m, v) for v in range(10)]
+    expected = [bfs(*args) for args in arguments]
+    seen = set()
+
+    global_threads = pgb.options_get()["nthreads"]
+
+    def query(matrix, vertex):
+        seen.add(get_runtime()["threads"])
+        assert pgb.options_get()["nthreads"] == global_threads
+        return bfs(matrix, vertex)
+
+    assert run_concurrently(query, arguments, max_workers=4, threads=8) == expected
+    # каждой операции достаётся 8 // 4 потока
+    assert seen == {2}
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"threads": 0}, {"threads": -1}, {"chunk": 0}, {"chunk": -1.5}]
+)
+def test_wrong_options(kwargs):
+    with pytest.raises(ValueError):
+        set_runtime(**kwargs)
+    with pytest.raises(ValueError):
+        with runtime(**kwargs):
+            pass
@@ -0,0 +1,67 @@
+import numpy as np
+import pygraphblas as pgb
+import pytest
+from multiprocessing import shared_memory
+
+from project.bfs import bfs
+from project.shared_graph import SharedCSR, SharedMatrixPool, run_sources_parallel
+
+
+def test_shared_csr_roundtrip():
+    m = pgb.Matrix.from_lists([2, 0, 0], [1, 2, 0], [3, 1, 2], nrows=4, ncols=3)
+    with SharedCSR.export(m) as owner:
+        assert owner.indptr.tolist() == [0, 2, 2, 3, 3]
+        attached = SharedCSR.attach(owner.handle)
+        # массивы открытого блока смотрят в ту же память, что и у владельца
+        owner.values[0] = 5
+        assert attached.values.tolist() == [5, 1, 3]
+        rebuilt = attached.to_matrix()
+        attached.close()
+        assert rebuilt.type == pgb.INT64
+        assert rebuilt.to_lists() == [[0, 0, 2], [0, 2, 1], [5, 1, 3]]
+        names = [info.name for info in owner.handle[3:]]
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_shared_csr_empty():
+    m = pgb.Matrix.sparse(pgb.BOOL, 3, 3)
+    with SharedCSR.export(m) as owner:
+        assert owner.to_matrix().iseq(m)
+
+
+def test_shared_csr_failed_open():
+    m = pgb.Matrix.from_lists([0, 1], [1, 0], [1.0, 2.0])
+    with SharedCSR.export(m) as owner:
+        handle = owner.handle[:-1] + (owner.handle[-1]._replace(name="missing"),)
+        with pytest.raises(FileNotFoundError):
+            SharedCSR.attach(handle)
+        assert owner.to_matrix().iseq(m)
+        # владелец удаляет блоки, открытые до ошибки
+        with pytest.raises(FileNotFoundError):
+            SharedCSR(handle, owner=True)
+        for info in handle[3:5]:
+            with pytest.raises(FileNotFoundError):
+                shared_memory.SharedMemory(name=info.name)
+
+
+def test_shared_matrix_pool():
+    m = pgb.Matrix.from_lists([0, 1, 2], [1, 2, 0], [True] * 3, nrows=4, ncols=4)
+    with SharedMatrixPool(m, processes=2) as pool:
+        futures = [pool.submit(bfs, start) for start in range(4)]
+        assert [future.result() for future in futures] == [
+            bfs(m, start) for start in range(4)
+        ]
+    with pytest.raises(ValueError):
+        SharedMatrixPool(m, processes=0)
+
+
+def test_run_sources_parallel_validation():
+    m = pgb.Matrix.sparse(pgb.BOOL, 3, 3)
+    with pytest.raises(ValueError):
+        run_sources_parallel(m, [0], np.sum, np.int64, processes=-1)
+    with pytest.raises(ValueError):
+        run_sources_parallel(m, [0], np.sum, np.int64, processes=0)
+    with pytest.raises(ValueError):
+        run_sources_parallel(m, [0], np.sum, np.int64, processes=1, batch_size=0)
@@ -1,8 +1,12 @@
 import inspect
 import json
 import pathlib
+
+import numpy as np
 import pygraphblas as pgb
 
+from project.bulk import matrix_from_arrays
+
 
 def read_data_from_json(name, configurator):
     with pathlib.Path(inspect.stack()[1].filename) as f:
@@ -26,12 +30,5 @@ def create_matrix_from_list_of_lists(lists):
     if not all(len(ls) == len(lists) for ls in lists):
         raise ValueError("Должна быть передана квадратная матрица")
 
-    I, J = [], []
-    for i in range(n):
-        for j in range(n):
-            if lists[i][j] != 0:
-                I.append(i)
-                J.append(j)
-    nnz = len(I)
-    V = [True] * nnz
-    return pgb.Matrix.from_lists(I, J, V, nrows=n, ncols=n)
+    I, J = np.nonzero(np.asarray(lists))
+    return matrix_from_arrays(I, J, True, nrows=n, ncols=n)